@@ -1,11 +1,14 @@
 from fastapi import APIRouter
-from app.api.api_v1.endpoints import auth, users, jobs, job_logs
+from app.api.api_v1.endpoints import auth, users, jobs, job_logs, health, metrics
+from app.utils.serialization import FastJSONResponse
 
-# 创建API路由器
-api_router = APIRouter()
+# 创建API路由器，响应默认使用 orjson 编码
+api_router = APIRouter(default_response_class=FastJSONResponse)
 
 # 包含各个端点的路由
 api_router.include_router(auth.router, prefix="/auth", tags=["认证"])
 api_router.include_router(users.router, prefix="/users", tags=["用户"])
 api_router.include_router(jobs.router, prefix="/jobs", tags=["任务"])
 api_router.include_router(job_logs.router, prefix="/logs", tags=["日志"])
+api_router.include_router(health.router, prefix="/health", tags=["健康检查"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["监控"])
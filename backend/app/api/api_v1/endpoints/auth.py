@@ -8,11 +8,12 @@ from sqlalchemy.future import select
 
 from app.core.config import settings
 from app.core.deps import get_db, get_current_user
+from app.core.metrics import MetricsRoute
 from app.models.user import User
 from app.schemas.token import Token
 from app.utils.security import create_access_token, verify_password
 
-router = APIRouter()
+router = APIRouter(route_class=MetricsRoute)
 
 
 @router.post("/login", response_model=Token)
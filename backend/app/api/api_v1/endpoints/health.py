@@ -0,0 +1,42 @@
+from typing import Any
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.deps import get_db
+from app.core.metrics import MetricsRoute
+from app.db.session import async_engine
+from app.schemas.health import DatabaseHealth
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=MetricsRoute)
+
+
+@router.get("/db", response_model=DatabaseHealth)
+async def database_health(
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    检查数据库连接并返回连接池状态
+    """
+    try:
+        await db.execute(text("SELECT 1"))
+    except Exception as e:
+        # 接口不需要认证，错误信息可能包含主机、用户名等连接信息，只写入日志
+        logger.error(f"数据库健康检查失败: {e}")
+        raise HTTPException(status_code=503, detail="数据库不可用")
+    
+    pool = async_engine.pool
+    return {
+        "status": "ok",
+        "pool": {
+            "size": pool.size() if hasattr(pool, "size") else None,
+            "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+        },
+    }
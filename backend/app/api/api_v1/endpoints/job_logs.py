@@ -1,23 +1,62 @@
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Tuple
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import desc
+from sqlalchemy import and_, desc, or_
+from sqlalchemy.sql import Select
 
-from app.core.deps import get_current_user, get_db
+from app.core.deps import get_current_active_superuser, get_current_user, get_db
+from app.core.metrics import MetricsRoute
 from app.models.user import User
 from app.models.job_log import JobLog
-from app.schemas.job_log import JobLog as JobLogSchema, JobLogQuery
+from app.schemas.job_log import JobLog as JobLogSchema, JobLogQuery, JobLogPurgeResult
+from app.services.log_cleanup import delete_logs_in_chunks, purge_logs
+from app.services.log_export import EXPORT_FORMATS, export_query, stream_logs
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.serialization import json_response, serialize_rows
 
-router = APIRouter()
+router = APIRouter(route_class=MetricsRoute)
+
+
+def _apply_log_filters(
+    query: Select,
+    job_id: Optional[int] = None,
+    status: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> Select:
+    """
+    添加日志筛选条件
+    """
+    if job_id:
+        query = query.where(JobLog.job_id == job_id)
+    if status:
+        query = query.where(JobLog.status == status)
+    if start_date:
+        query = query.where(JobLog.start_time >= start_date)
+    if end_date:
+        query = query.where(JobLog.start_time <= end_date)
+    return query
+
+
+def _decode_log_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        start_time, log_id = decode_cursor(cursor, 2)
+        return datetime.fromisoformat(start_time), int(log_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="无效的游标")
 
 
 @router.get("/", response_model=List[JobLogSchema])
 async def read_job_logs(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = Query(None, description="返回该游标之后（更早）的日志"),
+    before: Optional[str] = Query(None, description="返回该游标之前（更新）的日志"),
     job_id: Optional[int] = None,
     status: Optional[str] = None,
     start_date: Optional[datetime] = None,
@@ -26,25 +65,78 @@ async def read_job_logs(
 ) -> Any:
     """
     获取任务日志列表，支持分页和筛选
+
+    按 (start_time, id) 倒序排列。传入 after/before 游标时使用键集分页，
+    否则使用 skip 偏移分页；下一页和上一页的游标通过 X-Next-Cursor、
+    X-Prev-Cursor 响应头返回
     """
-    query = select(JobLog).order_by(desc(JobLog.start_time))
+    if after and before:
+        raise HTTPException(status_code=400, detail="after 和 before 不能同时使用")
     
-    # 添加筛选条件
-    if job_id:
-        query = query.where(JobLog.job_id == job_id)
-    if status:
-        query = query.where(JobLog.status == status)
-    if start_date:
-        query = query.where(JobLog.start_time >= start_date)
-    if end_date:
-        query = query.where(JobLog.start_time <= end_date)
+    query = _apply_log_filters(select(JobLog), job_id, status, start_date, end_date)
     
     # 添加分页
-    query = query.offset(skip).limit(limit)
+    if after:
+        start_time, log_id = _decode_log_cursor(after)
+        # 单独的 start_time 范围条件让数据库从游标位置开始扫描索引，而不是从头跳过
+        query = query.where(JobLog.start_time <= start_time, or_(
+            JobLog.start_time < start_time,
+            and_(JobLog.start_time == start_time, JobLog.id < log_id),
+        )).order_by(desc(JobLog.start_time), desc(JobLog.id))
+    elif before:
+        start_time, log_id = _decode_log_cursor(before)
+        query = query.where(JobLog.start_time >= start_time, or_(
+            JobLog.start_time > start_time,
+            and_(JobLog.start_time == start_time, JobLog.id > log_id),
+        )).order_by(JobLog.start_time, JobLog.id)
+    else:
+        query = query.order_by(desc(JobLog.start_time), desc(JobLog.id)).offset(skip)
+    query = query.limit(limit)
     
     result = await db.execute(query)
     logs = result.scalars().all()
-    return logs
+    if before:
+        logs.reverse()
+    
+    if logs:
+        if len(logs) == limit or before:
+            response.headers["X-Next-Cursor"] = encode_cursor(logs[-1].start_time, logs[-1].id)
+        if after or before or skip:
+            response.headers["X-Prev-Cursor"] = encode_cursor(logs[0].start_time, logs[0].id)
+    return json_response(serialize_rows(JobLogSchema, logs), response)
+
+
+# 需要在 /{log_id} 之前声明
+@router.get("/export")
+async def export_job_logs(
+    fmt: str = Query("ndjson", alias="format", description="导出格式: ndjson/csv"),
+    gzip: bool = Query(False, description="是否以 gzip 压缩"),
+    job_id: Optional[int] = None,
+    status: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    流式导出任务日志，支持与列表相同的筛选条件
+
+    按 id 升序通过服务端游标分批读取，适合导出全部执行历史
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"不支持的导出格式: {fmt}")
+    
+    query = _apply_log_filters(export_query(), job_id, status, start_date, end_date)
+    filename = f"job_logs_{datetime.now():%Y%m%d%H%M%S}.{fmt}"
+    media_type = EXPORT_FORMATS[fmt]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    
+    return StreamingResponse(
+        stream_logs(query, fmt, compress=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get("/{log_id}", response_model=JobLogSchema)
@@ -66,6 +158,31 @@ async def read_job_log(
     return log
 
 
+@router.delete("/purge", response_model=JobLogPurgeResult)
+async def purge_job_logs(
+    *,
+    db: AsyncSession = Depends(get_db),
+    older_than_days: Optional[int] = Query(None, ge=0, description="删除早于该天数的日志"),
+    keep_last: Optional[int] = Query(None, ge=0, description="每个任务保留的最近日志条数"),
+    job_id: Optional[int] = None,
+    batch_size: Optional[int] = Query(None, gt=0, description="每批删除的行数"),
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    按保留策略批量清理任务日志
+    """
+    if older_than_days is None and keep_last is None:
+        raise HTTPException(status_code=400, detail="需要指定 older_than_days 或 keep_last")
+    
+    return await purge_logs(
+        db,
+        older_than_days=older_than_days,
+        keep_last=keep_last,
+        job_id=job_id,
+        batch_size=batch_size,
+    )
+
+
 @router.delete("/{log_id}", response_model=JobLogSchema)
 async def delete_job_log(
     *,
@@ -94,24 +211,12 @@ async def delete_job_logs(
     *,
     db: AsyncSession = Depends(get_db),
     job_id: int,
+    batch_size: Optional[int] = Query(None, gt=0, description="每批删除的行数"),
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     删除指定任务的所有日志
+
+    在数据库端分批删除，每批单独提交
     """
-    # 查询指定任务的所有日志
-    result = await db.execute(select(JobLog).where(JobLog.job_id == job_id))
-    logs = result.scalars().all()
-    
-    if not logs:
-        return 0
-    
-    # 从数据库中删除任务日志
-    count = 0
-    for log in logs:
-        await db.delete(log)
-        count += 1
-    
-    await db.commit()
-    
-    return count
+    return await delete_logs_in_chunks(db, JobLog.job_id == job_id, batch_size=batch_size)
@@ -1,29 +1,224 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Any, AsyncIterator, List, Optional, Set, Tuple, Type
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import BaseModel
+from sqlalchemy import delete, desc, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.core.config import settings
 from app.core.deps import get_current_user, get_db
+from app.core.metrics import MetricsRoute
 from app.models.user import User
 from app.models.job import Job
-from app.schemas.job import Job as JobSchema, JobCreate, JobUpdate, JobStatusUpdate, JobExecution
-from app.services.scheduler import add_job, remove_job, pause_job, resume_job, get_job
+from app.models.job_log import JobLog
+from app.models.job_queue import JobQueue
+from app.models.job_run import JobRun
+from app.schemas.job import (
+    Job as JobSchema, JobCreate, JobUpdate, JobStatusUpdate, JobBulkUpdate, JobBulkResult,
+    JobRunRecord, JobRunStatus,
+)
+from app.services.job_queue import read_queued_run
+from app.services.job_spec import job_spec_hash
+from app.services.runs import run_tracker
+from app.services.scheduler import add_job, modify_job, remove_job, pause_job, resume_job, get_job, run_job_now
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.serialization import json_response, serialize_rows
+
+router = APIRouter(route_class=MetricsRoute)
 
-router = APIRouter()
+# 任务中与调度相关的字段
+SCHEDULE_FIELDS = {
+    "name", "func", "args", "kwargs", "trigger", "trigger_args",
+    "max_instances", "misfire_grace_time", "coalesce", "executor", "timeout", "status",
+}
+
+
+def _build_job(job_in: JobCreate, user_id: int) -> Job:
+    """
+    由创建模式构造任务记录
+    """
+    return Job(
+        name=job_in.name,
+        func=job_in.func,
+        args=job_in.args,
+        kwargs=job_in.kwargs,
+        trigger=job_in.trigger,
+        trigger_args=job_in.trigger_args,
+        max_instances=job_in.max_instances,
+        misfire_grace_time=job_in.misfire_grace_time,
+        coalesce=job_in.coalesce,
+        executor=job_in.executor or "thread",
+        timeout=job_in.timeout,
+        description=job_in.description,
+        status="running",
+        created_by=user_id
+    )
+
+
+async def _schedule_job(db: AsyncSession, job: Job) -> None:
+    """
+    将任务记录添加到调度器
+    """
+    await add_job(
+        db=db,
+        job_id=job.id,
+        func=job.func,
+        trigger=job.trigger,
+        trigger_args=job.trigger_args,
+        args=job.args,
+        kwargs=job.kwargs,
+        job_name=job.name,
+        max_instances=job.max_instances,
+        misfire_grace_time=job.misfire_grace_time,
+        coalesce=job.coalesce,
+        executor=job.executor,
+        timeout=job.timeout,
+        spec_hash=job_spec_hash(job),
+    )
+
+
+async def _sync_scheduled_job(db: AsyncSession, job: Job, changed: Set[str]) -> None:
+    """
+    按变化的字段同步调度器中的任务
+    """
+    # 任务不再运行时从调度器中移除
+    if job.status != "running":
+        try:
+            await remove_job(job.id)
+        except Exception:
+            pass
+        return
+    
+    if await get_job(job.id) is None:
+        # 任务不在调度器中，添加到调度器
+        await _schedule_job(db, job)
+    elif changed & SCHEDULE_FIELDS:
+        # 任务已在调度器中，只修改变化的部分，触发器不变时不重新计算运行时间
+        if "status" in changed:
+            await resume_job(job.id)
+        trigger_changed = bool(changed & {"trigger", "trigger_args"})
+        await modify_job(
+            job_id=job.id,
+            func=job.func if "func" in changed else None,
+            trigger=job.trigger if trigger_changed else None,
+            trigger_args=job.trigger_args if trigger_changed else None,
+            args=(job.args or []) if "args" in changed else None,
+            kwargs=(job.kwargs or {}) if "kwargs" in changed else None,
+            job_name=job.name if "name" in changed else None,
+            max_instances=job.max_instances if "max_instances" in changed else None,
+            misfire_grace_time=job.misfire_grace_time if "misfire_grace_time" in changed else None,
+            coalesce=job.coalesce if "coalesce" in changed else None,
+            executor=job.executor if changed & {"executor", "func"} else None,
+            timeout=(job.timeout or 0) if "timeout" in changed else None,
+            spec_hash=job_spec_hash(job),
+        )
+
+
+# 引用任务的表，外键没有级联删除，删除任务前先删除这些行
+JOB_DEPENDENT_MODELS = (JobQueue, JobRun, JobLog)
+
+
+async def _delete_job_rows(db: AsyncSession, job_ids: List[int]) -> None:
+    """
+    删除任务及其队列、运行记录和日志，不提交
+    """
+    for model in JOB_DEPENDENT_MODELS:
+        await db.execute(
+            delete(model).where(model.job_id.in_(job_ids)).execution_options(synchronize_session=False)
+        )
+    await db.execute(delete(Job).where(Job.id.in_(job_ids)).execution_options(synchronize_session=False))
+
+
+async def _remove_scheduled_jobs(job_ids: List[int]) -> None:
+    """
+    从调度器中移除任务，在数据库删除提交后调用
+    """
+    for job_id in job_ids:
+        try:
+            await remove_job(job_id)
+        except Exception:
+            pass
+
+
+async def _read_bulk_items(request: Request) -> AsyncIterator[Any]:
+    """
+    逐条读取批量请求体
+
+    支持 JSON 数组，以及按行流式读取的 NDJSON（请求体不必整体载入内存）
+    """
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if buffer.strip():
+            yield buffer
+        return
+    
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="请求体不是有效的JSON")
+    if not isinstance(body, list):
+        raise HTTPException(status_code=400, detail="请求体必须是数组")
+    for item in body:
+        yield item
+
+
+async def _chunked(items: AsyncIterator[Any], size: int) -> AsyncIterator[List[Tuple[int, Any]]]:
+    """
+    将条目按批次分组，并附带序号
+    """
+    chunk = []
+    index = 0
+    async for item in items:
+        chunk.append((index, item))
+        index += 1
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _parse_bulk_item(item: Any, schema: Type[BaseModel]) -> BaseModel:
+    """
+    校验单个批量条目，NDJSON 行先按 JSON 解析
+    """
+    if isinstance(item, (bytes, str)):
+        item = json.loads(item)
+    if not isinstance(item, dict):
+        raise ValueError("条目必须是对象")
+    return schema(**item)
 
 
 @router.get("/", response_model=List[JobSchema])
 async def read_jobs(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = Query(None, description="返回该游标之后的任务"),
+    before: Optional[str] = Query(None, description="返回该游标之前的任务"),
     status: Optional[str] = None,
     name: Optional[str] = None,
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     获取任务列表，支持分页和筛选
+
+    按 id 升序排列。传入 after/before 游标时使用键集分页，否则使用 skip 偏移分页；
+    下一页和上一页的游标通过 X-Next-Cursor、X-Prev-Cursor 响应头返回
     """
+    if after and before:
+        raise HTTPException(status_code=400, detail="after 和 before 不能同时使用")
+    
     query = select(Job)
     
     # 添加筛选条件
@@ -33,11 +228,31 @@ async def read_jobs(
         query = query.where(Job.name.contains(name))
     
     # 添加分页
-    query = query.offset(skip).limit(limit)
+    cursor = after or before
+    if cursor:
+        try:
+            cursor_id = int(decode_cursor(cursor, 1)[0])
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="无效的游标")
+    if after:
+        query = query.where(Job.id > cursor_id).order_by(Job.id)
+    elif before:
+        query = query.where(Job.id < cursor_id).order_by(desc(Job.id))
+    else:
+        query = query.order_by(Job.id).offset(skip)
+    query = query.limit(limit)
     
     result = await db.execute(query)
     jobs = result.scalars().all()
-    return jobs
+    if before:
+        jobs.reverse()
+    
+    if jobs:
+        if len(jobs) == limit or before:
+            response.headers["X-Next-Cursor"] = encode_cursor(jobs[-1].id)
+        if after or before or skip:
+            response.headers["X-Prev-Cursor"] = encode_cursor(jobs[0].id)
+    return json_response(serialize_rows(JobSchema, jobs), response)
 
 
 @router.post("/", response_model=JobSchema)
@@ -51,20 +266,7 @@ async def create_job(
     创建新任务
     """
     # 创建任务记录
-    job = Job(
-        name=job_in.name,
-        func=job_in.func,
-        args=job_in.args,
-        kwargs=job_in.kwargs,
-        trigger=job_in.trigger,
-        trigger_args=job_in.trigger_args,
-        max_instances=job_in.max_instances,
-        misfire_grace_time=job_in.misfire_grace_time,
-        coalesce=job_in.coalesce,
-        description=job_in.description,
-        status="running",
-        created_by=current_user.id
-    )
+    job = _build_job(job_in, current_user.id)
     
     db.add(job)
     await db.commit()
@@ -72,19 +274,7 @@ async def create_job(
     
     # 添加到调度器
     try:
-        await add_job(
-            db=db,
-            job_id=job.id,
-            func=job.func,
-            trigger=job.trigger,
-            trigger_args=job.trigger_args,
-            args=job.args,
-            kwargs=job.kwargs,
-            job_name=job.name,
-            max_instances=job.max_instances,
-            misfire_grace_time=job.misfire_grace_time,
-            coalesce=job.coalesce,
-        )
+        await _schedule_job(db, job)
     except Exception as e:
         # 如果添加到调度器失败，更新任务状态
         job.status = "error"
@@ -96,6 +286,254 @@ async def create_job(
     return job
 
 
+@router.post("/bulk", response_model=List[JobBulkResult])
+async def create_jobs_bulk(
+    *,
+    db: AsyncSession = Depends(get_db),
+    request: Request,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    批量创建任务
+
+    请求体为 JobCreate 数组或 NDJSON，所有任务在一个事务中写入，逐条返回结果
+    """
+    results = []
+    scheduled = []
+    try:
+        async for chunk in _chunked(_read_bulk_items(request), settings.JOB_BULK_CHUNK_SIZE):
+            jobs = []
+            for index, item in chunk:
+                try:
+                    job_in = _parse_bulk_item(item, JobCreate)
+                except (ValueError, TypeError) as e:
+                    results.append(JobBulkResult(index=index, success=False, error=str(e)))
+                    continue
+                jobs.append((index, _build_job(job_in, current_user.id)))
+            
+            # 一批任务合并为一条多行 INSERT
+            db.add_all([job for _, job in jobs])
+            await db.flush()
+            
+            # 添加到调度器
+            for index, job in jobs:
+                try:
+                    await _schedule_job(db, job)
+                    scheduled.append(job.id)
+                    results.append(JobBulkResult(index=index, id=job.id, success=True))
+                except Exception as e:
+                    job.status = "error"
+                    results.append(JobBulkResult(index=index, id=job.id, success=False, error=str(e)))
+            
+            await db.flush()
+            db.expunge_all()
+        
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        # 事务回滚后，撤销已添加到调度器的任务
+        for job_id in scheduled:
+            try:
+                await remove_job(job_id)
+            except Exception:
+                pass
+        raise
+    
+    results.sort(key=lambda r: r.index)
+    return results
+
+
+@router.put("/bulk", response_model=List[JobBulkResult])
+async def update_jobs_bulk(
+    *,
+    db: AsyncSession = Depends(get_db),
+    request: Request,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    批量更新任务
+
+    请求体为带 id 的 JobUpdate 数组或 NDJSON，所有更新在一个事务中写入，逐条返回结果。
+    提交成功后才同步调度器，同步失败的任务标记为 error
+    """
+    results = []
+    updated = []
+    try:
+        async for chunk in _chunked(_read_bulk_items(request), settings.JOB_BULK_CHUNK_SIZE):
+            items = []
+            for index, item in chunk:
+                try:
+                    items.append((index, _parse_bulk_item(item, JobBulkUpdate)))
+                except (ValueError, TypeError) as e:
+                    results.append(JobBulkResult(index=index, success=False, error=str(e)))
+            
+            # 一次查询取出本批所有任务
+            result = await db.execute(select(Job).where(Job.id.in_([job_in.id for _, job_in in items])))
+            jobs = {job.id: job for job in result.scalars().all()}
+            
+            for index, job_in in items:
+                job = jobs.get(job_in.id)
+                if job is None:
+                    results.append(JobBulkResult(index=index, id=job_in.id, success=False, error="任务不存在"))
+                    continue
+                job_data = {k: v for k, v in job_in.dict(exclude_unset=True, exclude={"id"}).items() if v is not None}
+                changed = {key for key, value in job_data.items() if getattr(job, key) != value}
+                for key, value in job_data.items():
+                    setattr(job, key, value)
+                updated.append((index, job, changed))
+            
+            await db.flush()
+            db.expunge_all()
+        
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    
+    # 同步调度器
+    failed = []
+    for index, job, changed in updated:
+        try:
+            await _sync_scheduled_job(db, job, changed)
+            results.append(JobBulkResult(index=index, id=job.id, success=True))
+        except Exception as e:
+            failed.append(job.id)
+            results.append(JobBulkResult(index=index, id=job.id, success=False, error=str(e)))
+    
+    if failed:
+        await db.execute(
+            update(Job).where(Job.id.in_(failed)).values(status="error").execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    
+    results.sort(key=lambda r: r.index)
+    return results
+
+
+@router.delete("/bulk", response_model=List[JobBulkResult])
+async def delete_jobs_bulk(
+    *,
+    db: AsyncSession = Depends(get_db),
+    request: Request,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    批量删除任务
+
+    请求体为任务ID数组或 NDJSON，所有删除在一个事务中执行，逐条返回结果。
+    每批在一个保存点中删除，失败时逐条重试，只有删除失败的条目返回错误。
+    提交成功后才从调度器中移除任务
+    """
+    results = []
+    deleted = []
+    async for chunk in _chunked(_read_bulk_items(request), settings.JOB_BULK_CHUNK_SIZE):
+        items = []
+        for index, item in chunk:
+            try:
+                items.append((index, int(json.loads(item) if isinstance(item, (bytes, str)) else item)))
+            except (ValueError, TypeError) as e:
+                results.append(JobBulkResult(index=index, success=False, error=str(e)))
+        
+        result = await db.execute(select(Job.id).where(Job.id.in_([job_id for _, job_id in items])))
+        existing = set(result.scalars().all())
+        
+        found = []
+        for index, job_id in items:
+            if job_id not in existing:
+                results.append(JobBulkResult(index=index, id=job_id, success=False, error="任务不存在"))
+            else:
+                found.append((index, job_id))
+        if not found:
+            continue
+        
+        try:
+            async with db.begin_nested():
+                await _delete_job_rows(db, [job_id for _, job_id in found])
+            succeeded = found
+        except Exception:
+            # 整批失败时逐条删除，找出失败的条目
+            succeeded = []
+            for index, job_id in found:
+                try:
+                    async with db.begin_nested():
+                        await _delete_job_rows(db, [job_id])
+                    succeeded.append((index, job_id))
+                except Exception as e:
+                    # 数据库异常只返回驱动的错误信息，不包含 SQL
+                    error = getattr(e, "orig", None) or e
+                    results.append(JobBulkResult(index=index, id=job_id, success=False, error=str(error)))
+        
+        for index, job_id in succeeded:
+            results.append(JobBulkResult(index=index, id=job_id, success=True))
+            deleted.append(job_id)
+    
+    await db.commit()
+    
+    # 从调度器中移除任务
+    await _remove_scheduled_jobs(deleted)
+    
+    results.sort(key=lambda r: r.index)
+    return results
+
+
+@router.get("/runs/active", response_model=List[JobRunRecord])
+async def read_active_runs(
+    *,
+    db: AsyncSession = Depends(get_db),
+    job_id: Optional[int] = None,
+    limit: int = 100,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    获取排队中和执行中的运行，按计划运行时间排列
+
+    本地模式读取运行记录表中尚未结束的行，队列模式读取队列表
+    """
+    if settings.JOB_EXECUTION_MODE == "queue":
+        query = select(JobQueue).order_by(JobQueue.id)
+        if job_id is not None:
+            query = query.where(JobQueue.job_id == job_id)
+        rows = (await db.execute(query.limit(limit))).scalars().all()
+        return [
+            {
+                "run_id": row.run_id,
+                "job_id": row.job_id,
+                "status": "queued" if row.status == "queued" else "started",
+                "scheduled_time": row.scheduled_time,
+                "submitted_time": row.enqueued_at,
+                "start_time": row.claimed_at,
+            }
+            for row in rows
+        ]
+
+    query = select(JobRun).where(JobRun.status.in_(("queued", "started")))
+    if job_id is not None:
+        query = query.where(JobRun.job_id == job_id)
+    query = query.order_by(JobRun.scheduled_time, JobRun.id).limit(limit)
+    rows = (await db.execute(query)).scalars().all()
+    return [JobRunRecord.model_validate(row, from_attributes=True) for row in rows]
+
+
+@router.get("/runs/{run_id}", response_model=JobRunStatus)
+async def read_job_run(
+    *,
+    db: AsyncSession = Depends(get_db),
+    run_id: str,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    获取手动执行的状态
+
+    队列模式下由工作进程执行，状态从队列表和运行记录中读取
+    """
+    run = run_tracker.get(run_id)
+    if settings.JOB_EXECUTION_MODE == "queue" and (run is None or run["status"] == "queued"):
+        run = await read_queued_run(db, run_id) or run
+    if run is None:
+        raise HTTPException(status_code=404, detail="执行记录不存在")
+    return run
+
+
 @router.get("/{job_id}", response_model=JobSchema)
 async def read_job(
     *,
@@ -135,6 +573,8 @@ async def update_job(
     # 更新任务信息
     job_data = {k: v for k, v in job_in.dict(exclude_unset=True).items() if v is not None}
     
+    changed = {key for key, value in job_data.items() if getattr(job, key) != value}
+    
     for key, value in job_data.items():
         setattr(job, key, value)
     
@@ -142,35 +582,15 @@ async def update_job(
     await db.commit()
     await db.refresh(job)
     
-    # 如果任务已经在调度器中，先移除再添加
     try:
-        await remove_job(job_id)
-    except Exception:
-        pass
-    
-    # 如果任务状态为运行中，添加到调度器
-    if job.status == "running":
-        try:
-            await add_job(
-                db=db,
-                job_id=job.id,
-                func=job.func,
-                trigger=job.trigger,
-                trigger_args=job.trigger_args,
-                args=job.args,
-                kwargs=job.kwargs,
-                job_name=job.name,
-                max_instances=job.max_instances,
-                misfire_grace_time=job.misfire_grace_time,
-                coalesce=job.coalesce,
-            )
-        except Exception as e:
-            # 如果添加到调度器失败，更新任务状态
-            job.status = "error"
-            db.add(job)
-            await db.commit()
-            await db.refresh(job)
-            raise HTTPException(status_code=400, detail=f"添加任务到调度器失败: {str(e)}")
+        await _sync_scheduled_job(db, job, changed)
+    except Exception as e:
+        # 如果更新调度器失败，更新任务状态
+        job.status = "error"
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        raise HTTPException(status_code=400, detail=f"更新调度器中的任务失败: {str(e)}")
     
     return job
 
@@ -191,16 +611,13 @@ async def delete_job(
     if not job:
         raise HTTPException(status_code=404, detail="任务不存在")
     
-    # 从调度器中移除任务
-    try:
-        await remove_job(job_id)
-    except Exception:
-        pass
-    
-    # 从数据库中删除任务
-    await db.delete(job)
+    # 从数据库中删除任务及其日志和运行记录
+    await _delete_job_rows(db, [job_id])
     await db.commit()
     
+    # 提交成功后从调度器中移除任务
+    await _remove_scheduled_jobs([job_id])
+    
     return job
 
 
@@ -246,7 +663,7 @@ async def update_job_status(
     return job
 
 
-@router.post("/{job_id}/execute", response_model=JobSchema)
+@router.post("/{job_id}/execute", response_model=JobRunStatus, status_code=202)
 async def execute_job(
     *,
     db: AsyncSession = Depends(get_db),
@@ -255,6 +672,8 @@ async def execute_job(
 ) -> Any:
     """
     立即执行任务
+
+    任务提交给调度器的执行器后立即返回运行ID，通过 /jobs/runs/{run_id} 查询状态
     """
     result = await db.execute(select(Job).where(Job.id == job_id))
     job = result.scalars().first()
@@ -267,10 +686,9 @@ async def execute_job(
     if not scheduler_job:
         raise HTTPException(status_code=400, detail="任务未在调度器中")
     
-    # 立即执行任务
     try:
-        scheduler_job.func(*scheduler_job.args, **scheduler_job.kwargs)
+        run_id = await run_job_now(job_id)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"执行任务失败: {str(e)}")
     
-    return job
+    return run_tracker.get(run_id)
@@ -0,0 +1,19 @@
+from typing import Any
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import MetricsRoute, registry
+
+router = APIRouter(route_class=MetricsRoute)
+
+# Prometheus 文本格式的内容类型
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("", response_class=PlainTextResponse)
+async def read_metrics() -> Any:
+    """
+    以 Prometheus 文本格式输出调度器和接口的指标
+    """
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
@@ -4,12 +4,15 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.core.auth_cache import principal_cache
 from app.core.deps import get_current_active_superuser, get_db, get_current_user
+from app.core.metrics import MetricsRoute
 from app.models.user import User
 from app.schemas.user import User as UserSchema, UserCreate, UserUpdate
 from app.utils.security import get_password_hash
+from app.utils.serialization import json_response, serialize_rows
 
-router = APIRouter()
+router = APIRouter(route_class=MetricsRoute)
 
 
 @router.get("/", response_model=List[UserSchema])
@@ -24,7 +27,7 @@ async def read_users(
     """
     result = await db.execute(select(User).offset(skip).limit(limit))
     users = result.scalars().all()
-    return users
+    return json_response(serialize_rows(UserSchema, users))
 
 
 @router.post("/", response_model=UserSchema)
@@ -101,6 +104,7 @@ async def update_user_me(
     db.add(current_user)
     await db.commit()
     await db.refresh(current_user)
+    principal_cache.invalidate_user(current_user.id)
     return current_user
 
 
@@ -154,6 +158,7 @@ async def update_user(
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    principal_cache.invalidate_user(user.id)
     return user
 
 
@@ -177,4 +182,5 @@ async def delete_user(
     
     await db.delete(user)
     await db.commit()
+    principal_cache.invalidate_user(user_id)
     return user
@@ -0,0 +1,89 @@
+from typing import Any, Dict, Optional, Set, Tuple
+from collections import OrderedDict
+import threading
+import time
+
+from app.core.config import settings
+
+
+class PrincipalCache:
+    """
+    已验证用户的进程内缓存
+
+    以令牌为键，按 TTL 过期并按 LRU 淘汰；缓存的是用户字段快照而不是 ORM 对象。
+    令牌本身的过期时间早于 TTL 时以令牌为准。
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.maxsize > 0
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        获取令牌对应的用户快照，未命中或已过期时返回 None
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires_at, user_id, data = entry
+            if expires_at <= time.monotonic():
+                self._remove(token)
+                return None
+            self._entries.move_to_end(token)
+            return data
+
+    def set(self, token: str, user_id: int, data: Dict[str, Any], token_exp: Optional[float] = None) -> None:
+        """
+        缓存令牌对应的用户快照
+        """
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        expires_at = now + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, now + (token_exp - time.time()))
+
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (expires_at, user_id, data)
+            self._tokens_by_user.setdefault(user_id, set()).add(token)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int) -> None:
+        """
+        用户被修改、停用或删除后，清除其所有令牌的缓存
+        """
+        with self._lock:
+            for token in self._tokens_by_user.pop(user_id, set()):
+                self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _remove(self, token: str) -> None:
+        _, user_id, _ = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.AUTH_CACHE_MAXSIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
@@ -15,6 +15,9 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # 已验证用户缓存，TTL 为 0 时不缓存
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAXSIZE: int = 10000
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
 
     @validator("BACKEND_CORS_ORIGINS", pre=True)
@@ -39,6 +42,13 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
     POSTGRES_PORT: str
+    # 连接池配置，按 uvicorn worker 数量调整
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 500
 
     # 初始管理员账号
     FIRST_SUPERUSER: str
@@ -47,6 +57,7 @@ class Settings(BaseSettings):
 
     # APScheduler配置
     APSCHEDULER_JOBSTORES: str
+    # 执行器线程/进程数，JSON 格式，例如 {"thread": 20, "process": 4}；为 default 时使用默认值
     APSCHEDULER_EXECUTORS: str
     APSCHEDULER_JOB_DEFAULTS: Dict[str, Any]
 
@@ -56,6 +67,73 @@ class Settings(BaseSettings):
             return json.loads(v)
         return v
 
+    # 任务存储配置，APSCHEDULER_JOBSTORES 可选 default(本地SQLite)/database/memory/writebehind 或数据库URL
+    APSCHEDULER_JOBSTORE_TABLE: str = "apscheduler_jobs"
+    JOBSTORE_FLUSH_INTERVAL: float = 1.0
+
+    # 多节点协调: none(单节点)/leader(选主，只有主节点调度任务)/shard(按任务ID分片到各节点)
+    # 需要各节点共享同一个任务存储(APSCHEDULER_JOBSTORES=database 或数据库URL)
+    SCHEDULER_COORDINATION: str = "none"
+    # 节点ID，为空时使用 主机名:进程号
+    SCHEDULER_NODE_ID: Optional[str] = None
+    # 租约有效期和续约间隔(秒)，节点失联后最多 TTL + 续约间隔 秒完成切换
+    SCHEDULER_LEASE_TTL: float = 15.0
+    SCHEDULER_LEASE_RENEW_INTERVAL: float = 5.0
+
+    # 任务执行模式: local(调度器进程内执行)/queue(调度器只入队，由 python -m app.worker 启动的工作进程执行)
+    JOB_EXECUTION_MODE: str = "local"
+    # 入队批量写入的最长等待时间(秒)
+    JOB_QUEUE_ENQUEUE_INTERVAL: float = 0.05
+    # 工作进程配置
+    WORKER_CONCURRENCY: int = 10
+    WORKER_POLL_INTERVAL: float = 1.0
+    # 认领租约有效期(秒)，工作进程失联超过该时间后运行重新入队
+    WORKER_LEASE_TTL: float = 60.0
+    # 同一次运行最多被认领的次数，超过后按失败处理
+    JOB_QUEUE_MAX_ATTEMPTS: int = 3
+
+    # 启动时按规格哈希同步任务表与调度器，以及流式读取任务表的每批行数
+    JOB_SYNC_ON_STARTUP: bool = True
+    JOB_SYNC_BATCH_SIZE: int = 1000
+    # 多节点时启动同步的租约有效期(秒)，同一时间只有一个节点同步
+    JOB_SYNC_LEASE_TTL: int = 300
+
+    # 任务函数配置，白名单为空时允许导入任意模块
+    JOB_FUNCTION_ALLOWED_MODULES: List[str] = []
+    JOB_FUNCTION_WARMUP: bool = True
+
+    # 协程任务在事件循环中同时运行的最大数量
+    ASYNC_JOB_CONCURRENCY: int = 1000
+
+    # 进程池任务超时中断后仍未退出时，等待多少秒后结束子进程
+    JOB_TIMEOUT_KILL_GRACE: float = 5.0
+
+    # 内存中保留的手动执行记录数
+    JOB_RUN_HISTORY_SIZE: int = 10000
+
+    # 批量任务接口每批处理的条数
+    JOB_BULK_CHUNK_SIZE: int = 1000
+
+    # 执行日志批量写入配置
+    LOG_WRITER_BATCH_SIZE: int = 500
+    LOG_WRITER_FLUSH_INTERVAL: float = 1.0
+    LOG_WRITER_QUEUE_SIZE: int = 10000
+
+    # 日志分批删除的每批行数
+    LOG_DELETE_BATCH_SIZE: int = 5000
+
+    # 日志导出时服务端游标每批读取的行数
+    LOG_EXPORT_BATCH_SIZE: int = 1000
+
+    # 日志保留配置，启用后作为维护任务在调度器中定期执行
+    LOG_RETENTION_ENABLED: bool = False
+    LOG_RETENTION_DAYS: int = 30
+    LOG_RETENTION_KEEP_LAST: Optional[int] = None
+    LOG_RETENTION_ARCHIVE: bool = False
+    LOG_RETENTION_INTERVAL_MINUTES: int = 60
+    LOG_RETENTION_BUCKET_HOURS: int = 24
+    LOG_RETENTION_PARTITIONS_AHEAD: int = 2
+
     class Config:
         env_file = os.path.join(Path(__file__).resolve().parent.parent.parent.parent, ".env")
         case_sensitive = True
@@ -5,7 +5,9 @@ from jose import jwt, JWTError
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.core.auth_cache import principal_cache
 from app.db.session import AsyncSessionLocal
 from app.models.user import User
 from app.schemas.token import TokenPayload
@@ -24,12 +26,29 @@ async def get_db() -> Generator:
         yield session
 
 
+def _user_snapshot(user: User) -> dict:
+    return {column.key: getattr(user, column.key) for column in User.__table__.columns}
+
+
+def _user_from_snapshot(data: dict) -> User:
+    # 以游离状态还原，之后 db.add() 会按已存在的记录更新而不是插入
+    user = User(**data)
+    make_transient_to_detached(user)
+    return user
+
+
 async def get_current_user(
     db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)
 ) -> User:
     """
     获取当前用户依赖项
+
+    已验证的用户按令牌缓存，命中时不再解码令牌和查询数据库
     """
+    cached = principal_cache.get(token)
+    if cached is not None:
+        return _user_from_snapshot(cached)
+    
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[ALGORITHM]
@@ -57,6 +76,7 @@ async def get_current_user(
     if not user.is_active:
         raise HTTPException(status_code=400, detail="用户未激活")
     
+    principal_cache.set(token, user.id, _user_snapshot(user), payload.get("exp"))
     return user
 
 
@@ -0,0 +1,302 @@
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+import bisect
+import functools
+import threading
+import time
+
+from fastapi.routing import APIRoute
+
+# 默认的直方图分桶(秒)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """
+    指标基类
+
+    每个线程写入自己的分片，热路径上不加锁；只有线程第一次写入时登记分片需要加锁。
+    采集时合并所有分片。
+    """
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[Dict[LabelValues, object]] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict[LabelValues, object]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def _snapshots(self) -> List[Dict[LabelValues, object]]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        return [dict(shard) for shard in shards]
+
+    def collect(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """
+    只增计数器
+    """
+
+    type_name = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def collect(self) -> List[str]:
+        totals: Dict[LabelValues, float] = {}
+        for shard in self._snapshots():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0.0) + value
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(totals.items())
+        ]
+
+
+class Histogram(_Metric):
+    """
+    直方图，分片中保存 [各桶计数, 总和, 次数]
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        shard = self._shard()
+        entry = shard.get(labels)
+        if entry is None:
+            entry = shard[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def time(self, *labels: str) -> "_Timer":
+        return _Timer(self, labels)
+
+    def collect(self) -> List[str]:
+        merged: Dict[LabelValues, list] = {}
+        for shard in self._snapshots():
+            for labels, (counts, total, count) in shard.items():
+                entry = merged.get(labels)
+                if entry is None:
+                    entry = merged[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                entry[0] = [a + b for a, b in zip(entry[0], counts)]
+                entry[1] += total
+                entry[2] += count
+
+        lines = []
+        for labels, (counts, total, count) in sorted(merged.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: LabelValues) -> None:
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class GaugeCallback(_Metric):
+    """
+    采集时通过回调取值的仪表
+    """
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        callback: Callable[[], Iterable[Tuple[LabelValues, float]]],
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def collect(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in self.callback()
+        ]
+
+
+class MetricsRegistry:
+    """
+    进程内指标注册表
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"指标已注册: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge_callback(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        callback: Callable[[], Iterable[Tuple[LabelValues, float]]],
+    ) -> GaugeCallback:
+        return self.register(GaugeCallback(name, documentation, labelnames, callback))
+
+    def render(self) -> str:
+        """
+        按 Prometheus 文本格式输出所有指标
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# 任务运行
+JOB_RUNS = registry.counter(
+    "scheduler_job_runs_total", "Finished job runs by job and status", ("job_id", "status")
+)
+JOB_RUN_DURATION = registry.histogram(
+    "scheduler_job_run_duration_seconds", "Job run duration", ("job_id",)
+)
+JOB_LAG = registry.histogram(
+    "scheduler_job_lag_seconds", "Delay between scheduled and actual start time"
+)
+JOB_MISFIRES = registry.counter(
+    "scheduler_job_misfires_total", "Missed job runs by job", ("job_id",)
+)
+
+# 任务存储
+JOBSTORE_LATENCY = registry.histogram(
+    "scheduler_jobstore_operation_seconds", "Jobstore operation latency", ("jobstore", "operation"),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+# HTTP 接口
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+
+
+class MetricsRoute(APIRoute):
+    """
+    记录请求耗时的路由类，按路由模板而不是实际路径统计
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        method = ",".join(sorted(self.methods or ()))
+        route = self.path
+
+        async def timed_handler(request):
+            start = time.perf_counter()
+            status = "500"
+            try:
+                response = await handler(request)
+                status = str(response.status_code)
+                return response
+            except Exception as e:
+                status = str(getattr(e, "status_code", 500))
+                raise
+            finally:
+                HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, method, route, status)
+
+        return timed_handler
+
+
+def instrument(obj: object, methods: Iterable[str], histogram: Histogram, *labels: str) -> None:
+    """
+    替换对象上的方法，记录每次调用的耗时，方法名作为最后一个标签
+    """
+    def wrap(original: Callable, name: str) -> Callable:
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, *labels, name)
+        return timed
+
+    for name in methods:
+        setattr(obj, name, wrap(getattr(obj, name), name))
@@ -2,4 +2,7 @@
 from app.db.base_class import Base
 from app.models.user import User
 from app.models.job import Job
-from app.models.job_log import JobLog
+from app.models.job_log import JobLog, JobLogArchive
+from app.models.job_run import JobRun
+from app.models.scheduler_lease import SchedulerLease
+from app.models.job_queue import JobQueue
@@ -1,28 +1,10 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 from app.db.base import Base
+from app.db.session import async_engine, AsyncSessionLocal
 from app.models.user import User
 from app.utils.security import get_password_hash
 import logging
 
-# 根据配置选择数据库连接字符串
-if settings.DATABASE_TYPE == "mysql":
-    SQLALCHEMY_DATABASE_URL = f"mysql+aiomysql://{settings.MYSQL_USER}:{settings.MYSQL_PASSWORD}@{settings.MYSQL_SERVER}:{settings.MYSQL_PORT}/{settings.MYSQL_DB}"
-else:
-    SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_SERVER}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
-
-# 创建异步数据库引擎
-async_engine = create_async_engine(SQLALCHEMY_DATABASE_URL)
-
-# 创建异步会话工厂
-AsyncSessionLocal = sessionmaker(
-    autocommit=False, 
-    autoflush=False, 
-    bind=async_engine, 
-    class_=AsyncSession
-)
-
 logger = logging.getLogger(__name__)
 
 
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, JSON
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func as sql_func
 from app.db.base_class import Base
 
 
@@ -17,8 +17,10 @@ class Job(Base):
     next_run_time = Column(DateTime, nullable=True, index=True, comment="下次运行时间")
     misfire_grace_time = Column(Integer, default=60, comment="错过执行时间的宽限期")
     coalesce = Column(Integer, default=0, comment="是否合并执行")
+    timeout = Column(Integer, nullable=True, comment="执行超时(秒)")
+    executor = Column(String(20), default="thread", server_default="thread", nullable=False, comment="执行器类型")
     status = Column(String(20), default="running", comment="任务状态")
     description = Column(Text, nullable=True, comment="任务描述")
-    created_at = Column(DateTime, default=func.now(), comment="创建时间")
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), comment="更新时间")
+    created_at = Column(DateTime, default=sql_func.now(), comment="创建时间")
+    updated_at = Column(DateTime, default=sql_func.now(), onupdate=sql_func.now(), comment="更新时间")
     created_by = Column(Integer, ForeignKey("user.id"), comment="创建者ID")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Float
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Float, Index
 from sqlalchemy.sql import func
 from app.db.base_class import Base
 
@@ -7,10 +7,37 @@ class JobLog(Base):
     """
     任务日志模型
     """
-    job_id = Column(Integer, ForeignKey("job.id"), nullable=False, index=True, comment="任务ID")
+    __table_args__ = (
+        # 日志列表按 (start_time, id) 倒序，并按 job_id、status、时间范围筛选
+        Index("ix_joblog_job_id_start_time", "job_id", "start_time", "id"),
+        Index("ix_joblog_status_start_time", "status", "start_time", "id"),
+        Index("ix_joblog_start_time", "start_time", "id"),
+    )
+
+    job_id = Column(Integer, ForeignKey("job.id"), nullable=False, comment="任务ID")
     status = Column(String(20), default="success", comment="执行状态")
     start_time = Column(DateTime, default=func.now(), comment="开始时间")
     end_time = Column(DateTime, nullable=True, comment="结束时间")
     duration = Column(Float, nullable=True, comment="执行时长(秒)")
+    cpu_time = Column(Float, nullable=True, comment="CPU时间(秒)")
+    peak_rss_delta = Column(Integer, nullable=True, comment="内存峰值增量(KB)")
+    result_size = Column(Integer, nullable=True, comment="结果大小(字节)")
+    error_message = Column(Text, nullable=True, comment="错误信息")
+    output = Column(Text, nullable=True, comment="输出信息")
+
+
+class JobLogArchive(Base):
+    """
+    归档任务日志模型
+    """
+    job_id = Column(Integer, nullable=False, index=True, comment="任务ID")
+    status = Column(String(20), comment="执行状态")
+    start_time = Column(DateTime, index=True, comment="开始时间")
+    end_time = Column(DateTime, nullable=True, comment="结束时间")
+    duration = Column(Float, nullable=True, comment="执行时长(秒)")
+    cpu_time = Column(Float, nullable=True, comment="CPU时间(秒)")
+    peak_rss_delta = Column(Integer, nullable=True, comment="内存峰值增量(KB)")
+    result_size = Column(Integer, nullable=True, comment="结果大小(字节)")
     error_message = Column(Text, nullable=True, comment="错误信息")
     output = Column(Text, nullable=True, comment="输出信息")
+    archived_at = Column(DateTime, default=func.now(), comment="归档时间")
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, JSON, Index
+from app.db.base_class import Base
+
+
+class JobQueue(Base):
+    """
+    任务执行队列模型
+
+    队列模式下调度器把到期的运行写入本表，由工作进程认领执行，执行结束后删除并写入运行记录
+    """
+    __table_args__ = (
+        # 认领按 id 顺序取 queued，回收按租约到期时间取 running
+        Index("ix_jobqueue_status_id", "status", "id"),
+        Index("ix_jobqueue_status_lease_expires_at", "status", "lease_expires_at"),
+    )
+
+    job_id = Column(Integer, ForeignKey("job.id"), nullable=False, comment="任务ID")
+    run_id = Column(String(32), nullable=True, index=True, comment="手动执行的运行ID")
+    func = Column(String(255), nullable=False, comment="任务函数")
+    args = Column(JSON, nullable=True, comment="任务参数")
+    kwargs = Column(JSON, nullable=True, comment="任务关键字参数")
+    timeout = Column(Integer, nullable=True, comment="执行超时(秒)")
+    status = Column(String(20), nullable=False, default="queued", comment="队列状态: queued, running")
+    scheduled_time = Column(DateTime, nullable=True, comment="计划运行时间")
+    enqueued_at = Column(DateTime, nullable=False, comment="入队时间")
+    attempts = Column(Integer, nullable=False, default=0, comment="认领次数")
+    claimed_by = Column(String(100), nullable=True, comment="认领的工作进程ID")
+    claim_token = Column(String(32), nullable=True, comment="认领批次标识")
+    claimed_at = Column(DateTime, nullable=True, comment="认领时间")
+    lease_expires_at = Column(DateTime, nullable=True, comment="认领租约到期时间")
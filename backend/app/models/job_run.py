@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Float, Index
+from app.db.base_class import Base
+
+
+class JobRun(Base):
+    """
+    任务运行记录模型
+
+    每次调度执行一行，提交到执行器时插入，开始和结束（成功、失败、错过或超时）时更新
+    """
+    __table_args__ = (
+        Index("ix_jobrun_job_id_scheduled_time", "job_id", "scheduled_time", "id"),
+        Index("ix_jobrun_status_scheduled_time", "status", "scheduled_time", "id"),
+    )
+
+    job_id = Column(Integer, ForeignKey("job.id"), nullable=False, comment="任务ID")
+    run_id = Column(String(32), nullable=True, index=True, comment="运行ID，手动执行时与 /jobs/runs/{run_id} 相同")
+    status = Column(String(20), nullable=False, comment="运行状态")
+    scheduled_time = Column(DateTime, nullable=True, comment="计划运行时间")
+    submitted_time = Column(DateTime, nullable=True, comment="提交到执行器的时间")
+    start_time = Column(DateTime, nullable=True, comment="开始时间")
+    end_time = Column(DateTime, nullable=True, comment="结束时间")
+    queue_delay = Column(Float, nullable=True, comment="排队延迟(秒)")
+    duration = Column(Float, nullable=True, comment="执行时长(秒)")
+    error_message = Column(Text, nullable=True, comment="错误信息")
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime
+from app.db.base_class import Base
+
+
+class SchedulerLease(Base):
+    """
+    调度器租约模型
+
+    多节点部署时用于选主（name 为 leader）和登记存活节点（name 为 node:<节点ID>）
+    """
+    name = Column(String(150), unique=True, nullable=False, comment="租约名称")
+    holder = Column(String(100), nullable=False, comment="持有节点ID")
+    acquired_at = Column(DateTime, nullable=False, comment="当前节点取得租约的时间")
+    expires_at = Column(DateTime, nullable=False, index=True, comment="租约到期时间")
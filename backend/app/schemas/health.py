@@ -0,0 +1,20 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class PoolStatus(BaseModel):
+    """
+    连接池状态模式
+    """
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+
+
+class DatabaseHealth(BaseModel):
+    """
+    数据库健康状态模式
+    """
+    status: str
+    pool: PoolStatus
@@ -1,8 +1,12 @@
-from typing import Optional, Dict, Any, List, Union
-from pydantic import BaseModel
+from typing import Optional, Dict, Any, List, Literal, Union
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 
+# 任务执行器类型
+JobExecutorType = Literal["thread", "process", "asyncio"]
+
+
 # 共享属性
 class JobBase(BaseModel):
     """
@@ -17,6 +21,8 @@ class JobBase(BaseModel):
     max_instances: Optional[int] = 1
     misfire_grace_time: Optional[int] = 60
     coalesce: Optional[bool] = False
+    executor: Optional[JobExecutorType] = "thread"
+    timeout: Optional[int] = Field(None, ge=0)  # 执行超时(秒)，为空或 0 时不限制
     description: Optional[str] = None
 
 
@@ -42,10 +48,20 @@ class JobUpdate(BaseModel):
     max_instances: Optional[int] = None
     misfire_grace_time: Optional[int] = None
     coalesce: Optional[bool] = None
+    executor: Optional[JobExecutorType] = None
+    timeout: Optional[int] = Field(None, ge=0)
     description: Optional[str] = None
     status: Optional[str] = None
 
 
+# 批量更新任务时的属性
+class JobBulkUpdate(JobUpdate):
+    """
+    批量更新任务的模式
+    """
+    id: int
+
+
 # 数据库中的任务属性
 class JobInDBBase(JobBase):
     """
@@ -84,3 +100,42 @@ class JobExecution(BaseModel):
     执行任务的模式
     """
     job_id: int
+
+
+# 手动执行状态
+class JobRunStatus(BaseModel):
+    """
+    手动执行的状态
+    """
+    run_id: str
+    job_id: int
+    status: str  # queued, running, finished, failed, missed
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration: Optional[float] = None
+    error: Optional[str] = None
+
+
+# 进行中的运行
+class JobRunRecord(BaseModel):
+    """
+    进行中的运行，本地模式来自运行记录表，队列模式来自队列表
+    """
+    run_id: Optional[str] = None
+    job_id: int
+    status: str  # queued, started
+    scheduled_time: Optional[datetime] = None
+    submitted_time: Optional[datetime] = None
+    start_time: Optional[datetime] = None
+
+
+# 批量操作结果
+class JobBulkResult(BaseModel):
+    """
+    批量操作中单个条目的结果
+    """
+    index: int
+    id: Optional[int] = None
+    success: bool
+    error: Optional[str] = None
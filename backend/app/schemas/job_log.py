@@ -13,6 +13,9 @@ class JobLogBase(BaseModel):
     start_time: datetime
     end_time: Optional[datetime] = None
     duration: Optional[float] = None
+    cpu_time: Optional[float] = None
+    peak_rss_delta: Optional[int] = None
+    result_size: Optional[int] = None
     error_message: Optional[str] = None
     output: Optional[str] = None
 
@@ -53,3 +56,13 @@ class JobLogQuery(BaseModel):
     status: Optional[str] = None
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
+
+
+# 日志清理结果
+class JobLogPurgeResult(BaseModel):
+    """
+    日志清理结果
+    """
+    deleted_by_age: int
+    deleted_by_count: int
+    total: int
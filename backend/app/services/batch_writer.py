@@ -0,0 +1,178 @@
+from typing import Any, Dict, List, Optional, Type
+import asyncio
+import concurrent.futures
+import logging
+import threading
+
+from sqlalchemy import insert
+from sqlalchemy.future import select
+
+from app.db.session import AsyncSessionLocal
+from app.models.job import Job
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 停止信号
+_STOP = object()
+
+
+class BatchWriter:
+    """
+    批量写入器
+
+    待写入的行先进入有界异步队列，由后台刷新任务按批量大小或时间间隔
+    合并为一条多行 INSERT 提交。队列满时写入方等待，形成背压。
+    """
+
+    def __init__(
+        self,
+        model: Type[Any],
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 10000,
+        put_timeout: float = 5.0,
+    ) -> None:
+        self.model = model
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.put_timeout = put_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """
+        在当前事件循环中启动刷新任务
+        """
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = self._loop.create_task(self._run())
+
+    async def put(self, row: Dict[str, Any]) -> None:
+        """
+        写入一行，队列满时等待
+        """
+        if not self.running:
+            self.start()
+        await self._queue.put(row)
+
+    def put_threadsafe(self, row: Dict[str, Any]) -> None:
+        """
+        从调度器工作线程中写入一行
+
+        最多阻塞 put_timeout 秒；超时后不再等待，但该行仍会在事件循环空闲时入队
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            raise RuntimeError(f"{self.model.__tablename__} 写入器未启动")
+
+        with self._pending_lock:
+            self._pending += 1
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is loop:
+            # 在事件循环线程中调用（例如调度器事件回调），不能阻塞等待
+            loop.create_task(self._put_pending(row))
+            return
+
+        future = asyncio.run_coroutine_threadsafe(self._put_pending(row), loop)
+        try:
+            future.result(self.put_timeout)
+        except concurrent.futures.TimeoutError:
+            logger.warning(f"{self.model.__tablename__} 写入队列繁忙，跳过等待")
+
+    async def _put_pending(self, row: Dict[str, Any]) -> None:
+        try:
+            await self.put(row)
+        finally:
+            with self._pending_lock:
+                self._pending -= 1
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """
+        停止刷新任务，写完队列中剩余的行
+        """
+        if not self.running:
+            return
+
+        # 等待来自工作线程、尚未入队的行
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self._pending and loop.time() < deadline:
+            await asyncio.sleep(0.01)
+
+        await self._queue.put(_STOP)
+        try:
+            await asyncio.wait_for(self._task, max(deadline - loop.time(), 0.1))
+        except asyncio.TimeoutError:
+            logger.error(f"{self.model.__tablename__} 写入器停止超时，剩余 {self._queue.qsize()} 行未写入")
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, rows: List[Dict[str, Any]]) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                rows = await self._drop_orphans(session, rows)
+                if not rows:
+                    return
+                await session.execute(insert(self.model), rows)
+                await session.commit()
+        except Exception as e:
+            logger.error(f"批量写入 {self.model.__tablename__} 失败({len(rows)} 行): {e}")
+
+    async def _drop_orphans(self, session, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        丢弃引用了不存在任务的行，一批只查询一次
+        """
+        if not hasattr(self.model, "job_id"):
+            return rows
+
+        job_ids = {row["job_id"] for row in rows}
+        result = await session.execute(select(Job.id).where(Job.id.in_(job_ids)))
+        existing = set(result.scalars().all())
+        if len(existing) == len(job_ids):
+            return rows
+
+        for job_id in job_ids - existing:
+            logger.error(f"任务不存在: {job_id}")
+        return [row for row in rows if row["job_id"] in existing]
@@ -0,0 +1,330 @@
+from typing import AsyncIterator, Callable, Dict, List, Optional
+import asyncio
+import contextlib
+import hashlib
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, case, delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.scheduler_lease import SchedulerLease
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+COORDINATION_MODES = ("none", "leader", "shard")
+
+# 选主租约名称
+LEADER_LEASE = "leader"
+# 节点登记租约的名称前缀
+NODE_LEASE_PREFIX = "node:"
+# 启动时任务同步的互斥租约名称
+SYNC_LEASE = "sync"
+
+
+def default_node_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _rendezvous_score(node_id: str, job_id: str) -> bytes:
+    # 不能使用内置 hash()，各进程的字符串哈希种子不同
+    return hashlib.blake2b(f"{node_id}\0{job_id}".encode("utf-8"), digest_size=8).digest()
+
+
+class SchedulerCoordinator:
+    """
+    多节点调度协调
+
+    每个节点通过主数据库中的租约表定期续约:
+    leader: 所有节点竞争同一个租约，只有持有者从共享任务存储中取到期任务
+    shard: 每个节点登记自己的租约，按存活节点做最高随机权重(rendezvous)哈希，
+    每个节点只取分给自己的到期任务，节点增减时只迁移受影响的任务
+
+    租约在本地按单调时钟判断是否过期，续约失败时节点在 TTL 内自动停止调度，
+    其他节点在租约到期后的下一次续约时接管。各节点的系统时钟需要同步。
+    手动执行的任务保存在各节点自己的内存存储中，不受协调影响。
+    """
+
+    # 分片模式下存在已到期但不属于本节点的任务时，重新检查的间隔(秒)
+    OVERDUE_POLL_INTERVAL = 0.5
+
+    def __init__(
+        self,
+        mode: str = "none",
+        node_id: Optional[str] = None,
+        lease_ttl: float = 15.0,
+        renew_interval: float = 5.0,
+        session_factory: Callable = AsyncSessionLocal,
+    ) -> None:
+        if mode not in COORDINATION_MODES:
+            raise ValueError(f"不支持的协调模式: {mode}")
+        if renew_interval >= lease_ttl:
+            raise ValueError("续约间隔必须小于租约有效期")
+        self.mode = mode
+        self.node_id = node_id or default_node_id()
+        self.lease_ttl = lease_ttl
+        self.renew_interval = renew_interval
+        self.session_factory = session_factory
+
+        # 本地租约有效期(单调时钟)
+        self._valid_until = 0.0
+        self._is_leader = False
+        self._members: List[str] = []
+        # 任务ID -> 是否属于本节点，成员变化时清空
+        self._owned: Dict[str, bool] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[Callable[[], None]] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "none"
+
+    @property
+    def active(self) -> bool:
+        """
+        本节点当前是否参与调度
+        """
+        if not self.enabled:
+            return True
+        if time.monotonic() >= self._valid_until:
+            return False
+        return self._is_leader if self.mode == "leader" else self.node_id in self._members
+
+    @property
+    def members(self) -> List[str]:
+        return list(self._members)
+
+    def owns(self, job_id: str) -> bool:
+        """
+        任务是否由本节点调度
+        """
+        if not self.active:
+            return False
+        if self.mode != "shard":
+            return True
+        owned = self._owned.get(job_id)
+        if owned is None:
+            owner = max(self._members, key=lambda member: _rendezvous_score(member, job_id))
+            owned = self._owned[job_id] = owner == self.node_id
+        return owned
+
+    def guard(self, jobstore) -> None:
+        """
+        替换共享任务存储的到期任务查询，只返回本节点负责的任务
+        """
+        get_due_jobs = jobstore.get_due_jobs
+        get_next_run_time = jobstore.get_next_run_time
+
+        def guarded_get_due_jobs(now):
+            return [job for job in get_due_jobs(now) if self.owns(job.id)]
+
+        def guarded_get_next_run_time():
+            if not self.active:
+                # 等到取得租约后再唤醒调度器
+                return None
+            next_run_time = get_next_run_time()
+            if self.mode == "shard" and next_run_time is not None:
+                now = datetime.now(next_run_time.tzinfo)
+                if next_run_time <= now:
+                    # 最早的到期任务属于其他节点，稍后再检查，避免调度器空转
+                    return now + timedelta(seconds=self.OVERDUE_POLL_INTERVAL)
+            return next_run_time
+
+        jobstore.get_due_jobs = guarded_get_due_jobs
+        jobstore.get_next_run_time = guarded_get_next_run_time
+
+    async def start(self, wakeup: Optional[Callable[[], None]] = None) -> None:
+        """
+        先完成一次续约再启动后台续约任务，调度器启动时即可知道本节点的角色
+        """
+        if not self.enabled or self._task is not None:
+            return
+        await self.heartbeat()
+        self._wakeup = wakeup
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"调度协调已启动: 模式 {self.mode}，节点 {self.node_id}")
+
+    async def stop(self) -> None:
+        """
+        停止续约并释放租约，其他节点在下一次续约时即可接管
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        was_active = self.active
+        self._valid_until = 0.0
+        self._is_leader = False
+        self._members = []
+        self._owned = {}
+        try:
+            await self._release(was_active)
+        except Exception as e:
+            logger.error(f"释放调度租约时出错: {e}")
+
+    @contextlib.asynccontextmanager
+    async def exclusive(self, name: str, ttl: float) -> AsyncIterator[bool]:
+        """
+        在节点间互斥执行一段操作，取得租约时为 True，结束后释放租约
+
+        租约由其他节点持有时为 False，调用方应跳过该操作；未启用协调时总是 True。
+        ttl 应大于操作的最长耗时，持有节点异常退出后租约在 ttl 后过期
+        """
+        if not self.enabled:
+            yield True
+            return
+        acquired = await self._acquire(name, datetime.now(), ttl)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                try:
+                    await self._expire(name)
+                except Exception as e:
+                    logger.error(f"释放租约 {name} 时出错: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.renew_interval)
+            try:
+                await self.heartbeat()
+            except Exception as e:
+                logger.error(f"调度租约续约失败: {e}")
+
+    async def heartbeat(self) -> None:
+        """
+        续约一次并刷新本节点的角色
+        """
+        started = time.monotonic()
+        now = datetime.now()
+        was_active = self.active
+
+        if self.mode == "leader":
+            is_leader = await self._acquire(LEADER_LEASE, now)
+            if is_leader != self._is_leader:
+                logger.info(f"节点 {self.node_id} {'成为' if is_leader else '不再是'}主节点")
+            self._is_leader = is_leader
+            self._valid_until = started + self.lease_ttl if is_leader else 0.0
+        else:
+            registered = await self._acquire(f"{NODE_LEASE_PREFIX}{self.node_id}", now)
+            members = await self._live_members(now) if registered else []
+            if members != self._members:
+                logger.info(f"调度节点变化: {', '.join(members) or '无'}")
+                self._members = members
+                self._owned = {}
+            self._valid_until = started + self.lease_ttl if registered else 0.0
+
+        # 取得租约后立即调度，同时让调度器看到其他节点新增的任务
+        if self._wakeup is not None and (self.active or was_active):
+            self._wakeup()
+
+    async def _acquire(self, name: str, now: datetime, ttl: Optional[float] = None) -> bool:
+        """
+        取得或续约租约，租约由其他节点持有且未过期时返回 False
+        """
+        expires_at = now + timedelta(seconds=ttl or self.lease_ttl)
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(SchedulerLease)
+                .where(
+                    SchedulerLease.name == name,
+                    or_(SchedulerLease.holder == self.node_id, SchedulerLease.expires_at < now),
+                )
+                .values(
+                    holder=self.node_id,
+                    # 续约时保留取得时间，重新取得（包括本节点的租约已过期）时更新
+                    acquired_at=case(
+                        (and_(SchedulerLease.holder == self.node_id, SchedulerLease.expires_at >= now), SchedulerLease.acquired_at),
+                        else_=now,
+                    ),
+                    expires_at=expires_at,
+                )
+            )
+            if result.rowcount:
+                await db.commit()
+                return True
+
+            exists = await db.scalar(select(SchedulerLease.id).where(SchedulerLease.name == name))
+            if exists is not None:
+                await db.rollback()
+                return False
+            db.add(SchedulerLease(name=name, holder=self.node_id, acquired_at=now, expires_at=expires_at))
+            try:
+                await db.commit()
+            except IntegrityError:
+                # 其他节点同时创建了租约
+                await db.rollback()
+                return False
+            return True
+
+    async def _live_members(self, now: datetime) -> List[str]:
+        """
+        参与分片的存活节点
+
+        节点登记满一个续约周期后才参与分片（包括本节点自己），此时其他节点都已看到它。
+        任务迁移期间宁可短暂无人调度（到期任务在接管后按错过执行策略补执行），也不重复执行
+        """
+        settled = now - timedelta(seconds=self.renew_interval)
+        async with self.session_factory() as db:
+            # 清理早已过期的节点登记
+            await db.execute(
+                delete(SchedulerLease).where(
+                    SchedulerLease.name.like(f"{NODE_LEASE_PREFIX}%"),
+                    SchedulerLease.expires_at < now - timedelta(seconds=self.lease_ttl),
+                )
+            )
+            result = await db.execute(
+                select(SchedulerLease.holder)
+                .where(
+                    SchedulerLease.name.like(f"{NODE_LEASE_PREFIX}%"),
+                    SchedulerLease.expires_at > now,
+                    SchedulerLease.acquired_at <= settled,
+                )
+                .order_by(SchedulerLease.holder)
+            )
+            members = list(result.scalars().all())
+            await db.commit()
+        return members
+
+    async def _expire(self, name: str) -> None:
+        """
+        使本节点持有的租约立即过期
+        """
+        async with self.session_factory() as db:
+            await db.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == name, SchedulerLease.holder == self.node_id)
+                .values(expires_at=datetime.now() - timedelta(seconds=1))
+            )
+            await db.commit()
+
+    async def _release(self, was_active: bool) -> None:
+        if self.mode == "leader":
+            await self._expire(LEADER_LEASE)
+        else:
+            async with self.session_factory() as db:
+                await db.execute(
+                    delete(SchedulerLease).where(SchedulerLease.name == f"{NODE_LEASE_PREFIX}{self.node_id}")
+                )
+                await db.commit()
+        if was_active:
+            logger.info(f"节点 {self.node_id} 已释放调度租约")
+
+
+coordinator = SchedulerCoordinator(
+    mode=settings.SCHEDULER_COORDINATION,
+    node_id=settings.SCHEDULER_NODE_ID,
+    lease_ttl=settings.SCHEDULER_LEASE_TTL,
+    renew_interval=settings.SCHEDULER_LEASE_RENEW_INTERVAL,
+)
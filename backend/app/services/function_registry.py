@@ -0,0 +1,94 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from types import ModuleType
+import importlib
+import logging
+import sys
+
+from app.core.config import settings
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+class FunctionRegistry:
+    """
+    任务函数注册表
+
+    点分路径只解析一次并缓存可调用对象；模块被重新加载或替换后缓存自动失效。
+    配置了模块白名单时，只允许导入白名单内的模块。
+    """
+
+    def __init__(self, allowed_modules: Optional[List[str]] = None) -> None:
+        self.allowed_modules = list(allowed_modules or [])
+        self._cache: Dict[str, Tuple[ModuleType, str, Callable]] = {}
+
+    def is_allowed(self, module_path: str) -> bool:
+        """
+        检查模块是否在白名单内，未配置白名单时全部允许
+        """
+        if not self.allowed_modules:
+            return True
+        return any(
+            module_path == allowed or module_path.startswith(allowed + ".")
+            for allowed in self.allowed_modules
+        )
+
+    def resolve(self, func_path: str) -> Callable:
+        """
+        获取函数，命中缓存时不再导入
+        """
+        entry = self._cache.get(func_path)
+        if entry is not None:
+            module, func_name, func = entry
+            # importlib.reload 会重新绑定模块属性，模块替换则改变 sys.modules 中的对象
+            if sys.modules.get(module.__name__) is module and module.__dict__.get(func_name) is func:
+                return func
+        return self._load(func_path)
+
+    def _load(self, func_path: str) -> Callable:
+        try:
+            module_path, func_name = func_path.rsplit('.', 1)
+        except ValueError:
+            raise ValueError(f"无效的函数路径: {func_path}")
+
+        if not self.is_allowed(module_path):
+            raise ValueError(f"模块不在允许列表中: {module_path}")
+
+        try:
+            module = importlib.import_module(module_path)
+            func = getattr(module, func_name)
+        except (ImportError, AttributeError) as e:
+            logger.error(f"导入函数失败: {e}")
+            raise ValueError(f"无法导入函数: {func_path}")
+
+        if not callable(func):
+            raise ValueError(f"不是可调用对象: {func_path}")
+
+        self._cache[func_path] = (module, func_name, func)
+        return func
+
+    def invalidate(self, func_path: Optional[str] = None) -> None:
+        """
+        清除指定函数或全部缓存
+        """
+        if func_path is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(func_path, None)
+
+    def warm(self, func_paths: Iterable[str]) -> Dict[str, str]:
+        """
+        预先解析一批函数，返回解析失败的函数及原因
+        """
+        errors = {}
+        for func_path in set(func_paths):
+            try:
+                self.resolve(func_path)
+            except ValueError as e:
+                errors[func_path] = str(e)
+        if errors:
+            logger.warning(f"预加载任务函数失败: {errors}")
+        return errors
+
+
+function_registry = FunctionRegistry(settings.JOB_FUNCTION_ALLOWED_MODULES)
@@ -0,0 +1,441 @@
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import inspect
+import logging
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, delete, insert, update
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.job import Job
+from app.models.job_queue import JobQueue
+from app.models.job_run import JobRun
+from app.services.batch_writer import BatchWriter
+from app.services.function_registry import function_registry
+from app.services.job_runner import (
+    JobTimeoutError, ProcessExecutionError, _make_record, job_log_writer, record_execution, run_job, run_job_async,
+    run_job_in_process,
+)
+from app.services.run_recorder import RunRecorder, run_recorder
+from app.services.runs import current_scheduled_run, local_time
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 入队批量写入器，短间隔合并同一时刻到期的运行
+job_queue_writer = BatchWriter(
+    JobQueue,
+    batch_size=settings.LOG_WRITER_BATCH_SIZE,
+    flush_interval=settings.JOB_QUEUE_ENQUEUE_INTERVAL,
+    max_queue_size=settings.LOG_WRITER_QUEUE_SIZE,
+)
+
+# 手动执行时传给入队包装器的运行ID参数名
+RUN_ID_KWARG = "run_id"
+
+
+async def enqueue_job(
+    job_id: int,
+    func_path: str,
+    args: Optional[List] = None,
+    kwargs: Optional[Dict] = None,
+    timeout: Optional[float] = None,
+    spec_hash: Optional[str] = None,
+    run_id: Optional[str] = None,
+) -> None:
+    """
+    队列模式下的执行包装器
+
+    在调度器的事件循环中运行，只把本次运行写入队列表，由工作进程认领执行；
+    计划运行时间取调度器本次运行的时间，排队延迟由此计算
+    """
+    now = datetime.now()
+    run = current_scheduled_run()
+    await job_queue_writer.put({
+        "job_id": job_id,
+        "run_id": run_id,
+        "func": func_path,
+        "args": args or [],
+        "kwargs": kwargs or {},
+        "timeout": timeout,
+        "status": "queued",
+        "scheduled_time": local_time(run[1]) if run is not None else now,
+        "enqueued_at": now,
+        "attempts": 0,
+    })
+
+
+async def read_queued_run(db, run_id: str) -> Optional[Dict[str, Any]]:
+    """
+    队列模式下按运行ID查询手动执行的状态，格式与 RunTracker 相同
+    """
+    row = (await db.execute(select(JobQueue).where(JobQueue.run_id == run_id))).scalars().first()
+    if row is not None:
+        return {
+            "run_id": run_id,
+            "job_id": row.job_id,
+            "status": "queued" if row.status == "queued" else "running",
+            "submitted_at": row.enqueued_at,
+            "started_at": row.claimed_at,
+            "finished_at": None,
+            "duration": None,
+            "error": None,
+        }
+
+    run = (await db.execute(select(JobRun).where(JobRun.run_id == run_id))).scalars().first()
+    if run is None:
+        return None
+    return {
+        "run_id": run_id,
+        "job_id": run.job_id,
+        "status": {"succeeded": "finished", "missed": "missed"}.get(run.status, "failed"),
+        "submitted_at": run.submitted_time or run.scheduled_time,
+        "started_at": run.start_time,
+        "finished_at": run.end_time,
+        "duration": run.duration,
+        "error": run.error_message,
+    }
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class QueueWorker:
+    """
+    队列工作进程
+
+    认领: PostgreSQL/MySQL 使用 SELECT ... FOR UPDATE SKIP LOCKED，多个工作进程互不阻塞；
+    SQLite 不支持行锁，用一条 UPDATE 按认领批次标识写入（SQLite 的写入本身是串行的）。
+    认领后在 WORKER_LEASE_TTL 内定期续约，工作进程失联时由其他工作进程把运行重新入队，
+    因此同一次运行至少执行一次，可能重复执行。
+
+    同步函数在线程池中运行，协程函数在事件循环中运行，执行器为 process 的任务在进程池中运行。
+    执行日志和运行记录与调度器进程内执行时相同。
+    """
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        concurrency: int = 10,
+        poll_interval: float = 1.0,
+        lease_ttl: float = 60.0,
+        max_attempts: int = 3,
+        process_workers: int = 0,
+        session_factory: Callable = AsyncSessionLocal,
+    ) -> None:
+        self.worker_id = worker_id or default_worker_id()
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_ttl = lease_ttl
+        self.max_attempts = max_attempts
+        self.process_workers = process_workers or min(concurrency, os.cpu_count() or 1)
+        self.session_factory = session_factory
+
+        self._running: Dict[int, asyncio.Task] = {}
+        self._finished: List[Dict[str, Any]] = []
+        self._next_requeue = 0.0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    def stop(self) -> None:
+        """
+        请求停止：不再认领新的运行，等待执行中的运行结束
+        """
+        if self._stopping is not None:
+            self._stopping.set()
+            self._wakeup.set()
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._thread_pool = ThreadPoolExecutor(self.concurrency, thread_name_prefix="job-worker")
+        # 运行记录由队列行生成，不需要跟踪调度器事件
+        run_recorder.enabled = False
+        job_log_writer.start()
+        heartbeat = asyncio.create_task(self._heartbeat())
+        logger.info(f"工作进程 {self.worker_id} 已启动，并发数 {self.concurrency}")
+
+        try:
+            while not self._stopping.is_set():
+                claimed = 0
+                try:
+                    if loop.time() >= self._next_requeue:
+                        self._next_requeue = loop.time() + self.lease_ttl / 3
+                        await self._requeue_expired()
+                    free = self.concurrency - len(self._running)
+                    if free > 0:
+                        for row in await self._claim(free):
+                            self._running[row["id"]] = asyncio.create_task(self._execute(row))
+                            claimed += 1
+                    await self._flush_finished()
+                except Exception as e:
+                    logger.error(f"处理任务队列时出错: {e}")
+
+                if claimed and len(self._running) < self.concurrency:
+                    # 队列中可能还有待认领的运行
+                    continue
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            if self._running:
+                logger.info(f"等待 {len(self._running)} 个执行中的运行结束")
+                await asyncio.gather(*self._running.values(), return_exceptions=True)
+            await self._flush_finished()
+        finally:
+            heartbeat.cancel()
+            self._thread_pool.shutdown(wait=False)
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=False)
+            await job_log_writer.stop()
+            logger.info(f"工作进程 {self.worker_id} 已停止")
+
+    async def _claim(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        认领最多 limit 个排队中的运行
+        """
+        now = datetime.now()
+        token = uuid.uuid4().hex
+        claim = {
+            "status": "running",
+            "claimed_by": self.worker_id,
+            "claim_token": token,
+            "claimed_at": now,
+            "lease_expires_at": now + timedelta(seconds=self.lease_ttl),
+            "attempts": JobQueue.attempts + 1,
+        }
+        queued = select(JobQueue.id).where(JobQueue.status == "queued").order_by(JobQueue.id).limit(limit)
+
+        async with self.session_factory() as db:
+            if db.bind.dialect.name == "sqlite":
+                await db.execute(
+                    update(JobQueue)
+                    .where(JobQueue.id.in_(queued.scalar_subquery()), JobQueue.status == "queued")
+                    .values(**claim)
+                    .execution_options(synchronize_session=False)
+                )
+            else:
+                ids = (await db.execute(queued.with_for_update(skip_locked=True))).scalars().all()
+                if not ids:
+                    await db.rollback()
+                    return []
+                await db.execute(
+                    update(JobQueue).where(JobQueue.id.in_(ids)).values(**claim)
+                    .execution_options(synchronize_session=False)
+                )
+
+            result = await db.execute(
+                select(JobQueue, Job.executor)
+                .join(Job, Job.id == JobQueue.job_id)
+                .where(JobQueue.claim_token == token)
+                .order_by(JobQueue.id)
+            )
+            rows = [
+                {**{column.name: getattr(row, column.name) for column in JobQueue.__table__.columns}, "executor": executor}
+                for row, executor in result.all()
+            ]
+            await db.commit()
+        return rows
+
+    async def _execute(self, row: Dict[str, Any]) -> None:
+        """
+        执行一次认领的运行，结束后登记结果
+        """
+        loop = asyncio.get_running_loop()
+        start_time = datetime.now()
+        error = None
+        try:
+            target = function_registry.resolve(row["func"])
+            call_args = (row["job_id"], row["func"], row["args"], row["kwargs"], row["timeout"])
+            if inspect.iscoroutinefunction(target):
+                await run_job_async(*call_args)
+            elif row["executor"] == "process":
+                await self._run_in_process(call_args)
+            else:
+                await loop.run_in_executor(self._thread_pool, run_job, *call_args)
+        except Exception as e:
+            error = e
+        finally:
+            end_time = datetime.now()
+            if error is None:
+                status = "succeeded"
+            elif RunRecorder._is_timeout(error):
+                status = "timed_out"
+            else:
+                status = "failed"
+            scheduled_time = row["scheduled_time"] or row["enqueued_at"]
+            self._finished.append({
+                "queue_id": row["id"],
+                "job_id": row["job_id"],
+                "run_id": row["run_id"],
+                "status": status,
+                "scheduled_time": scheduled_time,
+                "submitted_time": row["enqueued_at"],
+                "start_time": start_time,
+                "end_time": end_time,
+                "queue_delay": (start_time - scheduled_time).total_seconds(),
+                "duration": (end_time - start_time).total_seconds(),
+                "error_message": str(error) if error is not None else None,
+            })
+            self._running.pop(row["id"], None)
+            self._wakeup.set()
+
+    def _get_process_pool(self, broken: Optional[ProcessPoolExecutor] = None) -> ProcessPoolExecutor:
+        """
+        获取进程池，broken 为已损坏的进程池时关闭并重建
+
+        同一进程池中的其他运行也会收到 BrokenProcessPool，只重建一次
+        """
+        if broken is not None and self._process_pool is broken:
+            logger.warning("进程池已损坏（子进程被强制结束），重建进程池")
+            broken.shutdown(wait=False)
+            self._process_pool = None
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(self.process_workers)
+        return self._process_pool
+
+    async def _run_in_process(self, call_args: tuple) -> None:
+        """
+        在进程池中执行一次运行
+
+        超时看门狗强制结束子进程后进程池不可再用，此时重建进程池；
+        子进程没有传回执行记录，按已用时间判断是超时还是子进程异常退出并补写日志
+        """
+        loop = asyncio.get_running_loop()
+        job_id, timeout = call_args[0], call_args[4]
+        pool = self._get_process_pool()
+        try:
+            future = loop.run_in_executor(pool, run_job_in_process, *call_args)
+        except BrokenProcessPool:
+            # 上一次运行结束后进程池才损坏
+            pool = self._get_process_pool(broken=pool)
+            future = loop.run_in_executor(pool, run_job_in_process, *call_args)
+
+        start_time = datetime.now()
+        start = time.monotonic()
+        try:
+            record = await future
+        except ProcessExecutionError as e:
+            record_execution(e.record)
+            raise
+        except BrokenProcessPool as e:
+            self._get_process_pool(broken=pool)
+            elapsed = time.monotonic() - start
+            error = JobTimeoutError(timeout) if timeout and elapsed >= timeout else e
+            record_execution(_make_record(job_id, start_time, elapsed, None, None, None, error))
+            raise error
+        record_execution(dict(record))
+
+    async def _flush_finished(self) -> None:
+        """
+        在一个事务中删除已结束的队列行并写入运行记录
+        """
+        if not self._finished:
+            return
+        finished, self._finished = self._finished, []
+        try:
+            async with self.session_factory() as db:
+                # 只登记仍由本进程认领的行，租约过期后已被重新入队的运行由新的认领者登记
+                result = await db.execute(
+                    select(JobQueue.id).where(
+                        JobQueue.id.in_([row["queue_id"] for row in finished]),
+                        JobQueue.claimed_by == self.worker_id,
+                    )
+                )
+                owned = set(result.scalars().all())
+                if owned:
+                    await db.execute(
+                        delete(JobQueue)
+                        .where(JobQueue.id.in_(owned), JobQueue.claimed_by == self.worker_id)
+                        .execution_options(synchronize_session=False)
+                    )
+                    await db.execute(insert(JobRun), [
+                        {key: value for key, value in row.items() if key != "queue_id"}
+                        for row in finished if row["queue_id"] in owned
+                    ])
+                await db.commit()
+        except Exception as e:
+            logger.error(f"登记运行结果失败({len(finished)} 条): {e}")
+            # 下次循环重试
+            self._finished = finished + self._finished
+
+    async def _heartbeat(self) -> None:
+        """
+        定期续约执行中的运行
+        """
+        while True:
+            await asyncio.sleep(self.lease_ttl / 3)
+            if not self._running:
+                continue
+            try:
+                async with self.session_factory() as db:
+                    await db.execute(
+                        update(JobQueue)
+                        .where(
+                            JobQueue.id.in_(list(self._running)),
+                            JobQueue.claimed_by == self.worker_id,
+                        )
+                        .values(lease_expires_at=datetime.now() + timedelta(seconds=self.lease_ttl))
+                        .execution_options(synchronize_session=False)
+                    )
+                    await db.commit()
+            except Exception as e:
+                logger.error(f"续约执行中的运行失败: {e}")
+
+    async def _requeue_expired(self) -> None:
+        """
+        回收租约已过期的运行：未超过最大认领次数的重新入队，否则按失败登记
+        """
+        now = datetime.now()
+        expired = and_(JobQueue.status == "running", JobQueue.lease_expires_at < now)
+        async with self.session_factory() as db:
+            # 先用一条 UPDATE 标记，多个工作进程同时回收时每行只会被一个进程处理
+            token = uuid.uuid4().hex
+            marked = await db.execute(
+                update(JobQueue)
+                .where(expired, JobQueue.attempts >= self.max_attempts)
+                .values(status="expired", claim_token=token)
+                .execution_options(synchronize_session=False)
+            )
+            failed = []
+            if marked.rowcount:
+                failed = (await db.execute(select(JobQueue).where(JobQueue.claim_token == token))).scalars().all()
+                await db.execute(
+                    delete(JobQueue).where(JobQueue.claim_token == token).execution_options(synchronize_session=False)
+                )
+                await db.execute(insert(JobRun), [
+                    {
+                        "job_id": row.job_id,
+                        "run_id": row.run_id,
+                        "status": "failed",
+                        "scheduled_time": row.scheduled_time,
+                        "submitted_time": row.enqueued_at,
+                        "start_time": row.claimed_at,
+                        "end_time": now,
+                        "error_message": f"工作进程 {row.claimed_by} 失联，已达到最大认领次数",
+                    }
+                    for row in failed
+                ])
+            result = await db.execute(
+                update(JobQueue)
+                .where(expired)
+                .values(status="queued", claimed_by=None, claim_token=None, lease_expires_at=None)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        if failed or result.rowcount:
+            logger.warning(f"回收过期的运行: 重新入队 {result.rowcount} 个，失败 {len(failed)} 个")
@@ -0,0 +1,456 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import _thread
+import asyncio
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import signal
+import threading
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows 下没有 resource 模块
+    resource = None
+
+from app.core.config import settings
+from app.models.job_log import JobLog
+from app.services.batch_writer import BatchWriter
+from app.services.function_registry import function_registry
+from app.services.run_recorder import run_recorder
+from app.services.runs import current_scheduled_run, manual_run_id, run_tracker
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 执行日志批量写入器
+job_log_writer = BatchWriter(
+    JobLog,
+    batch_size=settings.LOG_WRITER_BATCH_SIZE,
+    flush_interval=settings.LOG_WRITER_FLUSH_INTERVAL,
+    max_queue_size=settings.LOG_WRITER_QUEUE_SIZE,
+)
+
+# 协程任务的并发信号量
+_async_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _max_rss() -> Optional[int]:
+    """
+    当前进程的内存峰值(KB)
+    """
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class ExecutionRecord(dict):
+    """
+    子进程中执行成功时返回的执行记录，由主进程的事件监听器写入日志
+    """
+
+
+class ProcessExecutionError(Exception):
+    """
+    子进程中任务执行失败，携带执行记录回到主进程
+    """
+
+    def __init__(self, message: str, record: Dict[str, Any]) -> None:
+        super().__init__(message, record)
+        self.message = message
+        self.record = record
+
+    def __str__(self) -> str:
+        return self.message
+
+
+class JobTimeoutError(TimeoutError):
+    """
+    任务执行超时
+    """
+
+    def __init__(self, timeout: Optional[float]) -> None:
+        super().__init__(f"任务执行超时({timeout}秒)")
+        self.timeout = timeout
+
+
+class CancellationToken:
+    """
+    任务取消令牌
+
+    线程中的任务无法被强制终止，超时后令牌被取消，任务函数应定期检查
+    cancelled 或调用 raise_if_cancelled() 尽早退出
+    """
+
+    def __init__(self, timeout: Optional[float] = None) -> None:
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._finished = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def raise_if_cancelled(self) -> None:
+        if self._cancelled:
+            raise JobTimeoutError(self.timeout)
+
+    def cancel(self) -> bool:
+        """
+        取消令牌，任务已结束时返回 False
+        """
+        with self._lock:
+            if self._finished or self._cancelled:
+                return False
+            self._cancelled = True
+            return True
+
+    def finish(self) -> bool:
+        """
+        标记任务结束，已被取消时返回 False
+        """
+        with self._lock:
+            if self._cancelled:
+                return False
+            self._finished = True
+            return True
+
+
+# 当前任务的取消令牌，任务函数可通过 current_cancel_token() 获取
+_cancel_token: contextvars.ContextVar[Optional[CancellationToken]] = contextvars.ContextVar(
+    "job_cancel_token", default=None
+)
+
+
+def current_cancel_token() -> Optional[CancellationToken]:
+    """
+    获取当前任务的取消令牌，未设置超时时返回 None
+    """
+    return _cancel_token.get()
+
+
+@functools.lru_cache(maxsize=1024)
+def _accepts_cancel_token(func: Callable) -> bool:
+    """
+    任务函数是否声明了 cancel_token 参数
+    """
+    try:
+        return "cancel_token" in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+class _ProcessWatchdog:
+    """
+    子进程中的超时看门狗
+
+    超时后向主线程发送 SIGINT（KeyboardInterrupt），任务在 kill_grace 秒内仍未退出时
+    直接结束子进程，进程池在下次提交任务时重建。任务不在主线程中运行时不发送信号
+    """
+
+    def __init__(self, token: CancellationToken, timeout: float, kill_grace: float, interrupt: bool = True) -> None:
+        self.token = token
+        self.kill_grace = kill_grace
+        self.interrupt = interrupt
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._kill_timer: Optional[threading.Timer] = None
+        self._timer = threading.Timer(timeout, self._on_timeout)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timeout(self) -> None:
+        with self._lock:
+            if self._stopped or not self.token.cancel():
+                return
+            self._kill_timer = threading.Timer(self.kill_grace, os._exit, (1,))
+            self._kill_timer.daemon = True
+            self._kill_timer.start()
+        if not self.interrupt:
+            return
+        if hasattr(signal, "pthread_kill"):
+            # 真正的信号可以打断 sleep 等阻塞调用
+            signal.pthread_kill(threading.main_thread().ident, signal.SIGINT)
+        else:
+            _thread.interrupt_main()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped = True
+            self._timer.cancel()
+            if self._kill_timer is not None:
+                self._kill_timer.cancel()
+
+
+def _execute(
+    job_id: int,
+    func_path: str,
+    args: Optional[List],
+    kwargs: Optional[Dict],
+    cancel_token: Optional[CancellationToken] = None,
+) -> Tuple[Any, Dict[str, Any], Optional[Exception]]:
+    """
+    执行任务函数，返回结果、执行记录和异常
+    """
+    func = function_registry.resolve(func_path)
+    kwargs = dict(kwargs or {})
+    if cancel_token is not None:
+        _cancel_token.set(cancel_token)
+        if _accepts_cancel_token(func):
+            kwargs["cancel_token"] = cancel_token
+
+    start_time = datetime.now()
+    rss_start = _max_rss()
+    cpu_start = time.thread_time()
+    start = time.monotonic()
+
+    result = None
+    error = None
+    try:
+        result = func(*(args or []), **kwargs)
+    except Exception as e:
+        error = e
+    finally:
+        if cancel_token is not None:
+            _cancel_token.set(None)
+
+    duration = time.monotonic() - start
+    cpu_time = time.thread_time() - cpu_start
+    rss_end = _max_rss()
+    peak_rss_delta = rss_end - rss_start if rss_start is not None else None
+
+    record = _make_record(job_id, start_time, duration, cpu_time, peak_rss_delta, result, error)
+    return result, record, error
+
+
+def _make_record(
+    job_id: int,
+    start_time: datetime,
+    duration: float,
+    cpu_time: Optional[float],
+    peak_rss_delta: Optional[int],
+    result: Any,
+    error: Optional[BaseException],
+) -> Dict[str, Any]:
+    """
+    构造一条执行日志
+    """
+    output = str(result) if result is not None else None
+    return {
+        "job_id": job_id,
+        "status": _status(error),
+        "start_time": start_time,
+        "end_time": datetime.now(),
+        "duration": duration,
+        "cpu_time": cpu_time,
+        "peak_rss_delta": peak_rss_delta,
+        "result_size": len(output.encode("utf-8")) if output is not None else 0,
+        "error_message": str(error) if error else None,
+        "output": output,
+    }
+
+
+def _status(error: Optional[BaseException]) -> str:
+    if error is None:
+        return "success"
+    if isinstance(error, JobTimeoutError):
+        return "timeout"
+    return "failed"
+
+
+def _mark_started() -> None:
+    """
+    执行包装器开始运行任务函数时，标记运行记录和手动执行开始
+    """
+    run = current_scheduled_run()
+    if run is None:
+        return
+    run_recorder.mark_started(run)
+    run_id = manual_run_id(run[0])
+    if run_id is not None:
+        run_tracker.mark_running(run_id)
+
+
+def run_job(
+    job_id: int,
+    func_path: str,
+    args: Optional[List] = None,
+    kwargs: Optional[Dict] = None,
+    timeout: Optional[float] = None,
+    spec_hash: Optional[str] = None,
+) -> Any:
+    """
+    任务执行包装器
+
+    代替原始函数注册到调度器，记录开始/结束时间、墙钟耗时、CPU 时间、
+    内存峰值增量和结果大小，写入任务日志。
+
+    设置了超时时，到时立即写入超时日志并取消令牌；线程无法强制终止，
+    任务函数返回后按超时失败处理。spec_hash 只供启动时的任务同步比较，执行时忽略
+    """
+    _mark_started()
+    if not timeout:
+        result, record, error = _execute(job_id, func_path, args, kwargs)
+    else:
+        token = CancellationToken(timeout)
+        start_time = datetime.now()
+        start = time.monotonic()
+
+        def on_timeout() -> None:
+            if token.cancel():
+                error = JobTimeoutError(timeout)
+                logger.warning(f"任务 {job_id} {error}，已发出取消请求")
+                record_execution(_make_record(job_id, start_time, time.monotonic() - start, None, None, None, error))
+
+        timer = threading.Timer(timeout, on_timeout)
+        timer.daemon = True
+        timer.start()
+        try:
+            result, record, error = _execute(job_id, func_path, args, kwargs, cancel_token=token)
+        finally:
+            timer.cancel()
+        if not token.finish():
+            # 超时日志已由定时器写入
+            raise JobTimeoutError(timeout)
+
+    record_execution(record)
+    if error is not None:
+        raise error
+    return result
+
+
+def _get_async_semaphore() -> asyncio.Semaphore:
+    """
+    协程任务的并发信号量，在事件循环中首次使用时创建
+    """
+    global _async_semaphore
+    if _async_semaphore is None:
+        _async_semaphore = asyncio.Semaphore(settings.ASYNC_JOB_CONCURRENCY)
+    return _async_semaphore
+
+
+async def _wait_with_timeout(coro: Any, timeout: float) -> Any:
+    """
+    等待协程完成，超时后取消协程并抛出 JobTimeoutError
+
+    不使用 asyncio.wait_for，它无法区分超时和协程自身抛出的 asyncio.TimeoutError
+    """
+    task = asyncio.ensure_future(coro)
+    try:
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    if not done:
+        task.cancel()
+        try:
+            await task
+        except BaseException:
+            # 取消过程中协程的异常以超时为准
+            pass
+        raise JobTimeoutError(timeout)
+    return task.result()
+
+
+async def run_job_async(
+    job_id: int,
+    func_path: str,
+    args: Optional[List] = None,
+    kwargs: Optional[Dict] = None,
+    timeout: Optional[float] = None,
+    spec_hash: Optional[str] = None,
+) -> Any:
+    """
+    协程任务执行包装器
+
+    直接在事件循环中运行协程函数，并发数受 ASYNC_JOB_CONCURRENCY 限制，
+    超时后取消协程。协程共享事件循环线程，不记录 CPU 时间和内存峰值
+    """
+    func = function_registry.resolve(func_path)
+
+    async with _get_async_semaphore():
+        _mark_started()
+        start_time = datetime.now()
+        start = time.monotonic()
+
+        result = None
+        error = None
+        try:
+            if timeout:
+                result = await _wait_with_timeout(func(*(args or []), **(kwargs or {})), timeout)
+            else:
+                result = await func(*(args or []), **(kwargs or {}))
+            return result
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            record = _make_record(job_id, start_time, time.monotonic() - start, None, None, result, error)
+            try:
+                await job_log_writer.put(record)
+            except Exception as e:
+                logger.error(f"记录任务执行日志时出错: {e}")
+
+
+def run_job_in_process(
+    job_id: int,
+    func_path: str,
+    args: Optional[List] = None,
+    kwargs: Optional[Dict] = None,
+    timeout: Optional[float] = None,
+    spec_hash: Optional[str] = None,
+) -> ExecutionRecord:
+    """
+    进程池中的任务执行包装器
+
+    子进程无法使用主进程的日志写入器，执行记录随返回值或异常传回主进程。
+    超时由子进程中的看门狗处理，强制结束子进程会使同一进程池中正在运行的
+    其他任务一同失败
+    """
+    if not timeout:
+        _, record, error = _execute(job_id, func_path, args, kwargs)
+    else:
+        token = CancellationToken(timeout)
+        start_time = datetime.now()
+        start = time.monotonic()
+        in_main_thread = threading.current_thread() is threading.main_thread()
+        if in_main_thread:
+            # fork 出的子进程可能继承了主进程的 SIGINT 处理函数，恢复为抛出 KeyboardInterrupt
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+        watchdog = _ProcessWatchdog(token, timeout, settings.JOB_TIMEOUT_KILL_GRACE, interrupt=in_main_thread)
+        try:
+            _, record, error = _execute(job_id, func_path, args, kwargs, cancel_token=token)
+        except KeyboardInterrupt:
+            if not token.cancelled:
+                raise
+            error = JobTimeoutError(timeout)
+            record = _make_record(job_id, start_time, time.monotonic() - start, None, None, None, error)
+        finally:
+            watchdog.stop()
+    if error is not None:
+        raise ProcessExecutionError(str(error), record)
+    return ExecutionRecord(record)
+
+
+def record_process_execution(event) -> None:
+    """
+    调度器事件监听器，写入进程池任务传回的执行记录
+    """
+    if isinstance(event.exception, ProcessExecutionError):
+        record_execution(event.exception.record)
+    elif isinstance(getattr(event, "retval", None), ExecutionRecord):
+        record_execution(dict(event.retval))
+
+
+def record_execution(row: Dict[str, Any]) -> None:
+    """
+    从工作线程提交一条执行日志
+    """
+    try:
+        job_log_writer.put_threadsafe(row)
+    except Exception as e:
+        logger.error(f"记录任务执行日志时出错: {e}")
@@ -0,0 +1,40 @@
+from typing import Any
+import hashlib
+import json
+
+# 调度器任务中保存规格哈希的关键字参数名，执行包装器忽略该参数
+SPEC_HASH_KWARG = "spec_hash"
+
+# 规格哈希中触发器部分的长度
+TRIGGER_HASH_LENGTH = 16
+
+
+def _digest(value: Any) -> str:
+    data = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str, ensure_ascii=False)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=TRIGGER_HASH_LENGTH // 2).hexdigest()
+
+
+def job_spec_hash(job: Any) -> str:
+    """
+    任务调度规格的哈希
+
+    前半部分只由触发器决定，后半部分由函数、参数和执行选项决定，
+    同步时据此区分是否需要重新计算下次运行时间
+    """
+    trigger = _digest([job.trigger, job.trigger_args or {}])
+    rest = _digest([
+        job.func,
+        job.args or [],
+        job.kwargs or {},
+        job.name,
+        job.max_instances,
+        job.misfire_grace_time,
+        bool(job.coalesce),
+        job.executor or "thread",
+        job.timeout or None,
+    ])
+    return trigger + rest
+
+
+def trigger_changed(old_hash: str, new_hash: str) -> bool:
+    return old_hash[:TRIGGER_HASH_LENGTH] != new_hash[:TRIGGER_HASH_LENGTH]
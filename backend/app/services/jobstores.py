@@ -0,0 +1,231 @@
+from typing import Any, Dict, List, Optional, Tuple
+import heapq
+import itertools
+import logging
+import pickle
+import threading
+
+from apscheduler.job import Job
+from apscheduler.jobstores.base import BaseJobStore, ConflictingIdError, JobLookupError
+from apscheduler.util import datetime_to_utc_timestamp, utc_timestamp_to_datetime
+from sqlalchemy import Column, Float, LargeBinary, MetaData, Table, Unicode, create_engine, select
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindJobStore(BaseJobStore):
+    """
+    内存 + 异步回写的任务存储
+
+    任务保存在内存中，按下次运行时间维护一个小顶堆，调度器唤醒时只需取出到期的
+    堆顶元素；变更记录在脏表中，由后台线程按固定间隔批量写回数据库。表结构与
+    SQLAlchemyJobStore 相同，启动时从表中加载全部任务。
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        engine: Any = None,
+        tablename: str = "apscheduler_jobs",
+        flush_interval: float = 1.0,
+        pickle_protocol: int = pickle.HIGHEST_PROTOCOL,
+        engine_options: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        super().__init__()
+        self.flush_interval = flush_interval
+        self.pickle_protocol = pickle_protocol
+
+        if engine is not None:
+            self.engine = engine
+        elif url:
+            self.engine = create_engine(url, **(engine_options or {}))
+        else:
+            raise ValueError('Need either "engine" or "url" defined')
+
+        self.jobs_t = Table(
+            tablename, MetaData(),
+            Column("id", Unicode(191), primary_key=True),
+            Column("next_run_time", Float(25), index=True),
+            Column("job_state", LargeBinary, nullable=False),
+        )
+
+        self._jobs: Dict[str, Job] = {}
+        # 堆元素为 (时间戳, 序号, 任务ID)，序号与 _heap_index 不一致的元素已失效
+        self._heap: List[Tuple[float, int, str]] = []
+        self._heap_index: Dict[str, int] = {}
+        self._seq = itertools.count()
+
+        # 待写回的变更: 任务ID -> (时间戳, 任务状态)，None 表示删除
+        self._dirty: Dict[str, Optional[Tuple[Optional[float], Dict[str, Any]]]] = {}
+        self._clear_pending = False
+        self._dirty_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, scheduler, alias):
+        super().start(scheduler, alias)
+        self.jobs_t.create(self.engine, checkfirst=True)
+        self._load()
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._flush_loop, name=f"jobstore-{alias}-writer", daemon=True)
+        self._thread.start()
+
+    def shutdown(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.engine.dispose()
+
+    def lookup_job(self, job_id):
+        return self._jobs.get(job_id)
+
+    def get_due_jobs(self, now):
+        timestamp = datetime_to_utc_timestamp(now)
+        due = []
+        while self._heap and self._heap[0][0] <= timestamp:
+            entry = heapq.heappop(self._heap)
+            if self._heap_index.get(entry[2]) == entry[1]:
+                due.append(entry)
+
+        # 调度器随后会调用 update_job 写入新的运行时间，这里先放回堆中
+        for entry in due:
+            heapq.heappush(self._heap, entry)
+        return [self._jobs[job_id] for _, _, job_id in due]
+
+    def get_next_run_time(self):
+        while self._heap:
+            timestamp, seq, job_id = self._heap[0]
+            if self._heap_index.get(job_id) == seq:
+                return utc_timestamp_to_datetime(timestamp)
+            heapq.heappop(self._heap)
+        return None
+
+    def get_all_jobs(self):
+        jobs = sorted(
+            self._jobs.values(),
+            key=lambda job: (job.next_run_time is None, datetime_to_utc_timestamp(job.next_run_time) or 0, job.id),
+        )
+        return jobs
+
+    def add_job(self, job):
+        if job.id in self._jobs:
+            raise ConflictingIdError(job.id)
+        self._store(job)
+
+    def update_job(self, job):
+        if job.id not in self._jobs:
+            raise JobLookupError(job.id)
+        self._store(job)
+
+    def remove_job(self, job_id):
+        if job_id not in self._jobs:
+            raise JobLookupError(job_id)
+        del self._jobs[job_id]
+        self._heap_index.pop(job_id, None)
+        with self._dirty_lock:
+            self._dirty[job_id] = None
+
+    def remove_all_jobs(self):
+        self._jobs.clear()
+        self._heap.clear()
+        self._heap_index.clear()
+        with self._dirty_lock:
+            self._dirty.clear()
+            self._clear_pending = True
+
+    def _store(self, job: Job) -> None:
+        timestamp = datetime_to_utc_timestamp(job.next_run_time)
+        self._jobs[job.id] = job
+        if timestamp is None:
+            # 暂停的任务不进入堆
+            self._heap_index.pop(job.id, None)
+        else:
+            seq = next(self._seq)
+            self._heap_index[job.id] = seq
+            heapq.heappush(self._heap, (timestamp, seq, job.id))
+
+        # 记录状态快照，序列化留给回写线程
+        with self._dirty_lock:
+            self._dirty[job.id] = (timestamp, job.__getstate__())
+
+    def _load(self) -> None:
+        """
+        从数据库加载全部任务
+        """
+        with self.engine.begin() as connection:
+            rows = connection.execute(select(self.jobs_t.c.id, self.jobs_t.c.job_state)).all()
+
+        failed = []
+        for job_id, job_state in rows:
+            try:
+                job = self._reconstitute_job(job_state)
+            except BaseException:
+                self._logger.exception('Unable to restore job "%s" -- removing it', job_id)
+                failed.append(job_id)
+                continue
+            self._jobs[job.id] = job
+            timestamp = datetime_to_utc_timestamp(job.next_run_time)
+            if timestamp is not None:
+                seq = next(self._seq)
+                self._heap_index[job.id] = seq
+                self._heap.append((timestamp, seq, job.id))
+        heapq.heapify(self._heap)
+
+        if failed:
+            with self._dirty_lock:
+                for job_id in failed:
+                    self._dirty[job_id] = None
+
+    def _reconstitute_job(self, job_state: bytes) -> Job:
+        job_state = pickle.loads(job_state)
+        job_state["jobstore"] = self
+        job = Job.__new__(Job)
+        job.__setstate__(job_state)
+        job._scheduler = self._scheduler
+        job._jobstore_alias = self._alias
+        return job
+
+    def _flush_loop(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self) -> None:
+        """
+        将累积的变更在一个事务中写回数据库
+        """
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, {}
+            clear, self._clear_pending = self._clear_pending, False
+        if not dirty and not clear:
+            return
+
+        rows = []
+        for job_id, change in dirty.items():
+            if change is not None:
+                timestamp, state = change
+                rows.append({
+                    "id": job_id,
+                    "next_run_time": timestamp,
+                    "job_state": pickle.dumps(state, self.pickle_protocol),
+                })
+
+        try:
+            with self.engine.begin() as connection:
+                if clear:
+                    connection.execute(self.jobs_t.delete())
+                if dirty:
+                    # 先删后插，作为跨数据库的批量 upsert
+                    connection.execute(self.jobs_t.delete().where(self.jobs_t.c.id.in_(list(dirty))))
+                if rows:
+                    connection.execute(self.jobs_t.insert(), rows)
+        except Exception as e:
+            logger.error(f"任务存储回写失败，稍后重试: {e}")
+            # 放回脏表，保留期间产生的更新
+            with self._dirty_lock:
+                for job_id, change in dirty.items():
+                    self._dirty.setdefault(job_id, change)
+                self._clear_pending = self._clear_pending or clear
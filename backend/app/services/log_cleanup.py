@@ -0,0 +1,121 @@
+from typing import Any, Dict, Optional
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, delete, desc, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.models.job_log import JobLog
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+async def delete_logs_in_chunks(
+    db: AsyncSession,
+    *conditions: Any,
+    batch_size: Optional[int] = None,
+) -> int:
+    """
+    按条件分批删除任务日志，返回删除的行数
+
+    每批先取出一批ID，再执行 DELETE ... WHERE id IN (...) 并提交，
+    避免一次性加载全部日志，也不会在整个过程中长时间锁表
+    """
+    batch_size = batch_size or settings.LOG_DELETE_BATCH_SIZE
+    total = 0
+    while True:
+        result = await db.execute(
+            select(JobLog.id).where(*conditions).order_by(JobLog.id).limit(batch_size)
+        )
+        ids = result.scalars().all()
+        if not ids:
+            break
+
+        await db.execute(
+            delete(JobLog).where(JobLog.id.in_(ids)).execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        total += len(ids)
+
+        if len(ids) < batch_size:
+            break
+    return total
+
+
+async def delete_logs_keep_last(
+    db: AsyncSession,
+    keep_last: int,
+    job_id: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> int:
+    """
+    每个任务只保留最近 keep_last 条日志，返回删除的行数
+    """
+    if job_id is not None:
+        job_ids = [job_id]
+    else:
+        result = await db.execute(select(JobLog.job_id).distinct())
+        job_ids = result.scalars().all()
+
+    total = 0
+    for current_job_id in job_ids:
+        # 找到第 keep_last 条日志，比它更早的都删除
+        result = await db.execute(
+            select(JobLog.start_time, JobLog.id)
+            .where(JobLog.job_id == current_job_id)
+            .order_by(desc(JobLog.start_time), desc(JobLog.id))
+            .offset(keep_last - 1 if keep_last > 0 else 0)
+            .limit(1)
+        )
+        boundary = result.first()
+        if boundary is None:
+            continue
+
+        if keep_last > 0:
+            older = or_(
+                JobLog.start_time < boundary.start_time,
+                and_(JobLog.start_time == boundary.start_time, JobLog.id < boundary.id),
+            )
+            total += await delete_logs_in_chunks(
+                db, JobLog.job_id == current_job_id, older, batch_size=batch_size
+            )
+        else:
+            total += await delete_logs_in_chunks(
+                db, JobLog.job_id == current_job_id, batch_size=batch_size
+            )
+    return total
+
+
+async def purge_logs(
+    db: AsyncSession,
+    older_than_days: Optional[int] = None,
+    keep_last: Optional[int] = None,
+    job_id: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    按保留策略清理任务日志
+
+    先删除早于 older_than_days 天的日志，再对每个任务只保留最近 keep_last 条
+    """
+    deleted_by_age = 0
+    deleted_by_count = 0
+
+    if older_than_days is not None:
+        conditions = [JobLog.start_time < datetime.now() - timedelta(days=older_than_days)]
+        if job_id is not None:
+            conditions.append(JobLog.job_id == job_id)
+        deleted_by_age = await delete_logs_in_chunks(db, *conditions, batch_size=batch_size)
+
+    if keep_last is not None:
+        deleted_by_count = await delete_logs_keep_last(db, keep_last, job_id=job_id, batch_size=batch_size)
+
+    logger.info(f"已清理任务日志: 按时间 {deleted_by_age} 条，按数量 {deleted_by_count} 条")
+    return {
+        "deleted_by_age": deleted_by_age,
+        "deleted_by_count": deleted_by_count,
+        "total": deleted_by_age + deleted_by_count,
+    }
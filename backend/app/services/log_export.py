@@ -0,0 +1,114 @@
+from typing import Any, AsyncIterator, Callable, Optional
+import csv
+import io
+import logging
+import zlib
+from datetime import datetime
+
+from sqlalchemy.future import select
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.job_log import JobLog
+from app.utils.serialization import dumps, row_serializer
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 导出格式及对应的内容类型
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# 导出的字段，也是 CSV 的列顺序
+EXPORT_FIELDS = (
+    "id",
+    "job_id",
+    "status",
+    "start_time",
+    "end_time",
+    "duration",
+    "cpu_time",
+    "peak_rss_delta",
+    "result_size",
+    "error_message",
+    "output",
+)
+
+_serialize = row_serializer(EXPORT_FIELDS)
+
+
+def export_query() -> Select:
+    """
+    导出查询，只选择导出的列并按 id 排序，可继续添加筛选条件
+    """
+    return select(*(getattr(JobLog, name) for name in EXPORT_FIELDS)).order_by(JobLog.id)
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def stream_logs(
+    query: Select,
+    fmt: str = "ndjson",
+    compress: bool = False,
+    batch_size: Optional[int] = None,
+    session_factory: Callable = AsyncSessionLocal,
+) -> AsyncIterator[bytes]:
+    """
+    流式导出任务日志
+
+    使用服务端游标每次读取 batch_size 行，编码后立即发送，内存占用与总行数无关。
+    在独立的会话中执行，不依赖请求的数据库会话在响应发送期间保持打开。
+    compress 为真时输出 gzip 格式
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+    batch_size = batch_size or settings.LOG_EXPORT_BATCH_SIZE
+    # wbits=31 输出带 gzip 头的数据
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    buffer = writer = None
+    header = b""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        header = (",".join(EXPORT_FIELDS) + "\r\n").encode("utf-8")
+
+    def encode(rows) -> bytes:
+        if writer is None:
+            return b"".join(dumps(_serialize(row)) + b"\n" for row in rows)
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    def emit(data: bytes) -> bytes:
+        return compressor.compress(data) if compressor is not None else data
+
+    exported = 0
+    try:
+        data = emit(header)
+        if data:
+            yield data
+        async with session_factory() as db:
+            result = await db.stream(query.execution_options(yield_per=batch_size))
+            async for rows in result.partitions():
+                exported += len(rows)
+                data = emit(encode(rows))
+                if data:
+                    yield data
+        if compressor is not None:
+            yield compressor.flush()
+    except Exception as e:
+        # 响应已开始发送，只能中断连接
+        logger.error(f"导出任务日志时出错(已导出 {exported} 行): {e}")
+        raise
@@ -0,0 +1,214 @@
+from typing import Dict, List, Optional, Tuple
+import logging
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.job_log import JobLog, JobLogArchive
+from app.services.log_cleanup import delete_logs_in_chunks, delete_logs_keep_last
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 维护任务在调度器中的ID
+RETENTION_JOB_ID = "__log_retention__"
+
+# 归档时复制的列
+ARCHIVE_COLUMNS = [
+    "id", "job_id", "status", "start_time", "end_time", "duration", "cpu_time",
+    "peak_rss_delta", "result_size", "error_message", "output",
+]
+
+# 按月分区的分区表名，例如 joblog_p202401
+PARTITION_NAME_PATTERN = re.compile(r"^joblog_p(\d{4})(\d{2})$")
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    month = value.month - 1 + months
+    return value.replace(year=value.year + month // 12, month=month % 12 + 1)
+
+
+class LogRetentionManager:
+    """
+    任务日志保留管理器
+
+    按时间桶分批删除或归档过期日志。PostgreSQL 上如果 joblog 已是按 start_time
+    的范围分区表，则按月维护分区，直接删除整月分区。
+    """
+
+    def __init__(
+        self,
+        retention_days: int,
+        keep_last: Optional[int] = None,
+        archive: bool = False,
+        bucket_hours: int = 24,
+        partitions_ahead: int = 2,
+        batch_size: Optional[int] = None,
+    ) -> None:
+        self.retention_days = retention_days
+        self.keep_last = keep_last
+        self.archive = archive
+        self.bucket = timedelta(hours=bucket_hours)
+        self.partitions_ahead = partitions_ahead
+        self.batch_size = batch_size or settings.LOG_DELETE_BATCH_SIZE
+
+    async def run(self) -> Dict[str, int]:
+        """
+        执行一次日志保留清理
+        """
+        cutoff = datetime.now() - timedelta(days=self.retention_days)
+        stats = {"expired": 0, "dropped_partitions": 0, "trimmed": 0}
+
+        async with AsyncSessionLocal() as db:
+            if await self._is_partitioned(db):
+                stats["dropped_partitions"] = await self._drop_partitions(db, cutoff)
+                await self._ensure_partitions(db)
+            else:
+                stats["expired"] = await self._purge_buckets(db, cutoff)
+
+            if self.keep_last is not None:
+                stats["trimmed"] = await delete_logs_keep_last(db, self.keep_last, batch_size=self.batch_size)
+
+        logger.info(f"日志保留清理完成: {stats}")
+        return stats
+
+    async def _purge_buckets(self, db: AsyncSession, cutoff: datetime) -> int:
+        """
+        从最早的日志开始，按时间桶删除或归档早于 cutoff 的日志
+        """
+        result = await db.execute(select(func.min(JobLog.start_time)))
+        oldest = result.scalar()
+        if oldest is None:
+            return 0
+
+        total = 0
+        start = oldest
+        while start < cutoff:
+            end = min(start + self.bucket, cutoff)
+            conditions = (JobLog.start_time >= start, JobLog.start_time < end)
+            if self.archive:
+                total += await self._archive_in_chunks(db, *conditions)
+            else:
+                total += await delete_logs_in_chunks(db, *conditions, batch_size=self.batch_size)
+            start = end
+        return total
+
+    async def _archive_in_chunks(self, db: AsyncSession, *conditions) -> int:
+        """
+        分批把日志复制到归档表后删除，每批一个事务
+        """
+        columns = [getattr(JobLog, name) for name in ARCHIVE_COLUMNS]
+        total = 0
+        while True:
+            result = await db.execute(
+                select(JobLog.id).where(*conditions).order_by(JobLog.id).limit(self.batch_size)
+            )
+            ids = result.scalars().all()
+            if not ids:
+                break
+
+            await db.execute(
+                insert(JobLogArchive).from_select(ARCHIVE_COLUMNS, select(*columns).where(JobLog.id.in_(ids)))
+            )
+            await db.execute(
+                delete(JobLog).where(JobLog.id.in_(ids)).execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            total += len(ids)
+
+            if len(ids) < self.batch_size:
+                break
+        return total
+
+    async def _is_partitioned(self, db: AsyncSession) -> bool:
+        if db.bind.dialect.name != "postgresql":
+            return False
+        result = await db.execute(text(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = :table"
+        ), {"table": JobLog.__tablename__})
+        return result.first() is not None
+
+    async def _list_partitions(self, db: AsyncSession) -> List[Tuple[str, datetime]]:
+        """
+        列出按月命名的分区及其起始月份
+        """
+        result = await db.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table"
+        ), {"table": JobLog.__tablename__})
+
+        partitions = []
+        for name in result.scalars().all():
+            match = PARTITION_NAME_PATTERN.match(name)
+            if match:
+                partitions.append((name, datetime(int(match.group(1)), int(match.group(2)), 1)))
+        return partitions
+
+    async def _drop_partitions(self, db: AsyncSession, cutoff: datetime) -> int:
+        """
+        删除（或归档后删除）整个月都早于 cutoff 的分区
+        """
+        dropped = 0
+        for name, month in await self._list_partitions(db):
+            if _add_months(month, 1) > cutoff:
+                continue
+            await db.execute(text(f"ALTER TABLE {JobLog.__tablename__} DETACH PARTITION {name}"))
+            if self.archive:
+                column_list = ", ".join(ARCHIVE_COLUMNS)
+                await db.execute(text(
+                    f"INSERT INTO {JobLogArchive.__tablename__} ({column_list}) "
+                    f"SELECT {column_list} FROM {name}"
+                ))
+            await db.execute(text(f"DROP TABLE {name}"))
+            await db.commit()
+            dropped += 1
+            logger.info(f"已删除日志分区: {name}")
+        return dropped
+
+    async def _ensure_partitions(self, db: AsyncSession) -> None:
+        """
+        预先创建当前月及之后若干个月的分区
+        """
+        current = _month_start(datetime.now())
+        for offset in range(self.partitions_ahead + 1):
+            start = _add_months(current, offset)
+            end = _add_months(start, 1)
+            await db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {JobLog.__tablename__}_p{start:%Y%m} "
+                f"PARTITION OF {JobLog.__tablename__} "
+                f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+            ))
+        await db.commit()
+
+
+log_retention_manager = LogRetentionManager(
+    retention_days=settings.LOG_RETENTION_DAYS,
+    keep_last=settings.LOG_RETENTION_KEEP_LAST,
+    archive=settings.LOG_RETENTION_ARCHIVE,
+    bucket_hours=settings.LOG_RETENTION_BUCKET_HOURS,
+    partitions_ahead=settings.LOG_RETENTION_PARTITIONS_AHEAD,
+)
+
+
+async def run_log_retention() -> Dict[str, int]:
+    """
+    日志保留维护任务，由调度器定期执行
+    """
+    try:
+        return await log_retention_manager.run()
+    except Exception as e:
+        logger.error(f"日志保留清理失败: {e}")
+        raise
@@ -0,0 +1,269 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+import logging
+import threading
+import uuid
+from datetime import datetime
+
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED
+from sqlalchemy import bindparam, insert, update
+
+from app.core.config import settings
+from app.core.metrics import JOB_LAG, JOB_MISFIRES, JOB_RUN_DURATION, JOB_RUNS
+from app.db.session import AsyncSessionLocal
+from app.models.job_run import JobRun
+from app.services.batch_writer import BatchWriter
+from app.services.runs import execution_start_time, local_time, manual_run_id, run_tracker
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+class JobRunWriter(BatchWriter):
+    """
+    运行记录写入器
+
+    提交时插入一行，开始和结束时按运行ID更新。同一批次中同一运行的多次写入先合并，
+    插入合并为一条多行 INSERT，更新按更新的列分组后 executemany
+    """
+
+    def insert_threadsafe(self, row: Dict[str, Any]) -> None:
+        self.put_threadsafe({"op": "insert", "run_id": row["run_id"], "values": row})
+
+    def update_threadsafe(self, run_id: str, values: Dict[str, Any]) -> None:
+        self.put_threadsafe({"op": "update", "run_id": run_id, "values": values})
+
+    async def _flush(self, items: List[Dict[str, Any]]) -> None:
+        inserts: Dict[str, Dict[str, Any]] = {}
+        updates: Dict[str, Dict[str, Any]] = {}
+        for item in items:
+            run_id = item["run_id"]
+            if item["op"] == "insert":
+                inserts[run_id] = dict(item["values"])
+            elif run_id in inserts:
+                inserts[run_id].update(item["values"])
+            else:
+                updates.setdefault(run_id, {}).update(item["values"])
+
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for run_id, values in updates.items():
+            params = {f"b_{column}": value for column, value in values.items()}
+            params["b_run_id"] = run_id
+            groups.setdefault(tuple(sorted(values)), []).append(params)
+
+        table = JobRun.__table__
+        try:
+            async with AsyncSessionLocal() as session:
+                rows = await self._drop_orphans(session, list(inserts.values()))
+                if rows:
+                    await session.execute(insert(JobRun), rows)
+                for columns, params in groups.items():
+                    stmt = (
+                        update(table)
+                        .where(table.c.run_id == bindparam("b_run_id"))
+                        .values({column: bindparam(f"b_{column}") for column in columns})
+                    )
+                    await session.execute(stmt, params)
+                await session.commit()
+        except Exception as e:
+            logger.error(f"批量写入 {JobRun.__tablename__} 失败({len(inserts)} 行插入, {len(updates)} 行更新): {e}")
+
+
+# 运行记录批量写入器
+job_run_writer = JobRunWriter(
+    JobRun,
+    batch_size=settings.LOG_WRITER_BATCH_SIZE,
+    flush_interval=settings.LOG_WRITER_FLUSH_INTERVAL,
+    max_queue_size=settings.LOG_WRITER_QUEUE_SIZE,
+)
+
+# 记录运行状态的调度器事件
+RUN_RECORD_EVENTS = EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED
+
+
+def _queue_delay(start_time: Optional[datetime], scheduled_time: datetime) -> Optional[float]:
+    return (start_time - scheduled_time).total_seconds() if start_time else None
+
+
+class RunRecorder:
+    """
+    任务运行生命周期记录
+
+    queued: 提交到执行器（EVENT_JOB_SUBMITTED），插入一行
+    started: 执行包装器开始运行任务函数，更新该行
+    succeeded / failed / timed_out: 执行结束（EVENT_JOB_EXECUTED / EVENT_JOB_ERROR），更新该行
+    missed: 错过执行时间（EVENT_JOB_MISSED）
+
+    进行中的运行按 (调度器任务ID, 计划运行时间) 保存在内存中，每次运行分配运行ID，
+    手动执行沿用 RunTracker 的运行ID。进程池中的任务无法在主进程中标记开始，
+    结束前保持 queued，开始时间取自执行记录。
+    """
+
+    # 最多记住的提前结束的运行数
+    MAX_FINISHED_EARLY = 10000
+
+    def __init__(self) -> None:
+        # 工作进程中运行记录由队列行生成，关闭跟踪
+        self.enabled = True
+        self._runs: Dict[Tuple[str, datetime], Dict[str, Any]] = {}
+        # 线程池可能在提交事件分发前就开始运行，先记下开始时间
+        self._early_starts: Dict[Tuple[str, datetime], datetime] = {}
+        # 同理，提交事件分发前就已结束的运行，收到提交事件时忽略
+        self._finished_early: "OrderedDict[Tuple[str, datetime], None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def handle_event(self, event) -> None:
+        """
+        调度器事件监听器
+        """
+        try:
+            if event.code == EVENT_JOB_SUBMITTED:
+                self._submitted(event)
+            elif event.code == EVENT_JOB_MISSED:
+                self._finish(event, "missed")
+            elif event.code == EVENT_JOB_EXECUTED:
+                self._finish(event, "succeeded")
+            elif event.code == EVENT_JOB_ERROR:
+                status = "timed_out" if self._is_timeout(event.exception) else "failed"
+                self._finish(event, status)
+        except Exception as e:
+            logger.error(f"记录任务运行状态时出错: {e}")
+
+    def mark_started(self, key: Tuple[str, datetime]) -> None:
+        """
+        执行包装器开始运行任务函数时调用，key 为 (调度器任务ID, 计划运行时间)
+        """
+        if not self.enabled:
+            return
+        now = datetime.now()
+        with self._lock:
+            run = self._runs.get(key)
+            if run is None:
+                self._early_starts[key] = now
+                return
+            run["status"] = "started"
+            run["start_time"] = now
+        try:
+            job_run_writer.update_threadsafe(run["run_id"], {
+                "status": "started",
+                "start_time": now,
+                "queue_delay": _queue_delay(now, run["scheduled_time"]),
+            })
+        except Exception as e:
+            logger.error(f"记录任务运行状态时出错: {e}")
+
+    def _submitted(self, event) -> None:
+        job_id, run_id = self._resolve_ids(event.job_id)
+        if job_id is None:
+            return
+
+        now = datetime.now()
+        rows = []
+        with self._lock:
+            for scheduled in event.scheduled_run_times:
+                key = (event.job_id, scheduled)
+                if key in self._finished_early:
+                    del self._finished_early[key]
+                    continue
+                start_time = self._early_starts.pop(key, None)
+                run = {
+                    "job_id": job_id,
+                    "run_id": run_id or uuid.uuid4().hex,
+                    "status": "queued" if start_time is None else "started",
+                    "scheduled_time": local_time(scheduled),
+                    "submitted_time": now,
+                    "start_time": start_time,
+                }
+                self._runs[key] = run
+                rows.append({**run, "queue_delay": _queue_delay(start_time, run["scheduled_time"])})
+
+        for row in rows:
+            job_run_writer.insert_threadsafe(row)
+
+    def _finish(self, event, status: str) -> None:
+        key = (event.job_id, event.scheduled_run_time)
+        with self._lock:
+            run = self._runs.pop(key, None)
+
+        inserted = run is not None
+        if run is None:
+            # 提交事件尚未分发，没有排队记录，结束时插入完整的一行
+            job_id, run_id = self._resolve_ids(event.job_id)
+            if job_id is None:
+                return
+            with self._lock:
+                start_time = self._early_starts.pop(key, None)
+                self._finished_early[key] = None
+                while len(self._finished_early) > self.MAX_FINISHED_EARLY:
+                    self._finished_early.popitem(last=False)
+            run = {
+                "job_id": job_id,
+                "run_id": run_id or uuid.uuid4().hex,
+                "scheduled_time": local_time(event.scheduled_run_time),
+                "submitted_time": None,
+                "start_time": start_time,
+            }
+
+        end_time = datetime.now()
+        start_time = run["start_time"]
+        if start_time is None and status != "missed":
+            start_time = execution_start_time(event)
+
+        values = {
+            "status": status,
+            "start_time": start_time,
+            "end_time": end_time,
+            "queue_delay": _queue_delay(start_time, run["scheduled_time"]),
+            "duration": (end_time - start_time).total_seconds() if start_time else None,
+            "error_message": str(event.exception) if event.exception is not None else None,
+        }
+        row = {**run, **values}
+        self._observe(row)
+        try:
+            if inserted:
+                job_run_writer.update_threadsafe(run["run_id"], values)
+            else:
+                job_run_writer.insert_threadsafe(row)
+        except Exception as e:
+            logger.error(f"记录任务运行状态时出错: {e}")
+
+    @staticmethod
+    def _is_timeout(exception: Optional[BaseException]) -> bool:
+        """
+        只有执行包装器按任务超时抛出的异常视为超时，任务函数自身的超时异常按失败处理
+        """
+        # job_runner 导入了本模块，在这里导入避免循环导入
+        from app.services.job_runner import JobTimeoutError
+
+        if isinstance(exception, JobTimeoutError):
+            return True
+        # 进程池任务的超时随执行记录传回
+        record = getattr(exception, "record", None)
+        return isinstance(record, dict) and record.get("status") == "timeout"
+
+    @staticmethod
+    def _observe(row: Dict[str, Any]) -> None:
+        job_id = str(row["job_id"])
+        JOB_RUNS.inc(job_id, row["status"])
+        if row["status"] == "missed":
+            JOB_MISFIRES.inc(job_id)
+        if row["duration"] is not None:
+            JOB_RUN_DURATION.observe(row["duration"], job_id)
+        if row["queue_delay"] is not None:
+            JOB_LAG.observe(max(row["queue_delay"], 0.0))
+
+    @staticmethod
+    def _resolve_ids(scheduler_job_id: str) -> Tuple[Optional[int], Optional[str]]:
+        """
+        由调度器任务ID得到数据库任务ID和手动执行的运行ID，维护任务等返回 None
+        """
+        run_id = manual_run_id(scheduler_job_id)
+        if run_id is not None:
+            run = run_tracker.get(run_id)
+            return (run["job_id"], run_id) if run is not None else (None, None)
+        if scheduler_job_id.isdigit():
+            return int(scheduler_job_id), None
+        return None, None
+
+
+run_recorder = RunRecorder()
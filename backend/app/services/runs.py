@@ -0,0 +1,162 @@
+from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+from contextvars import ContextVar
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MISSED
+
+from app.core.config import settings
+
+# 手动执行在调度器中的任务ID前缀
+MANUAL_RUN_PREFIX = "__run__:"
+
+
+# 执行器正在运行的 (调度器任务ID, 计划运行时间)，执行器按计划运行时间逐个设置
+scheduled_run: "ContextVar[Optional[Tuple[str, datetime]]]" = ContextVar("scheduled_run", default=None)
+
+
+def manual_run_job_id(run_id: str) -> str:
+    return f"{MANUAL_RUN_PREFIX}{run_id}"
+
+
+def manual_run_id(scheduler_job_id: str) -> Optional[str]:
+    """
+    由调度器任务ID得到手动执行的运行ID，不是手动执行时返回 None
+    """
+    if scheduler_job_id.startswith(MANUAL_RUN_PREFIX):
+        return scheduler_job_id[len(MANUAL_RUN_PREFIX):]
+    return None
+
+
+def current_scheduled_run() -> Optional[Tuple[str, datetime]]:
+    """
+    执行包装器中调用，返回当前运行的 (调度器任务ID, 计划运行时间)，
+    不经过本模块执行器运行（如进程池子进程）时返回 None
+    """
+    return scheduled_run.get()
+
+
+def local_time(value: datetime) -> datetime:
+    """
+    调度器中的时间带时区，转换为与其他表一致的本地时间
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+def execution_start_time(event) -> Optional[datetime]:
+    """
+    从进程池任务传回的执行记录中取开始时间
+    """
+    record = getattr(event.exception, "record", None) or getattr(event, "retval", None)
+    if isinstance(record, dict):
+        return record.get("start_time")
+    return None
+
+
+class RunTracker:
+    """
+    手动执行记录
+
+    保存在内存中，按提交顺序只保留最近 maxsize 条。执行包装器开始运行任务函数时
+    标记 running，其余状态由调度器事件更新: queued -> running -> finished / failed，
+    错过执行时为 missed。进程池中的任务无法在主进程中标记开始，结束前保持 queued
+    """
+
+    def __init__(self, maxsize: int = 10000) -> None:
+        self.maxsize = maxsize
+        self._runs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # 运行ID -> 开始执行时的单调时钟，用于计算耗时
+        self._started: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job_id: int) -> str:
+        """
+        登记一次手动执行，返回运行ID
+        """
+        run_id = uuid.uuid4().hex
+        with self._lock:
+            self._runs[run_id] = {
+                "run_id": run_id,
+                "job_id": job_id,
+                "status": "queued",
+                "submitted_at": datetime.now(),
+                "started_at": None,
+                "finished_at": None,
+                "duration": None,
+                "error": None,
+            }
+            while len(self._runs) > self.maxsize:
+                old_id, _ = self._runs.popitem(last=False)
+                self._started.pop(old_id, None)
+        return run_id
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            run = self._runs.get(run_id)
+            return dict(run) if run is not None else None
+
+    def discard(self, run_id: str) -> None:
+        with self._lock:
+            self._runs.pop(run_id, None)
+            self._started.pop(run_id, None)
+
+    def mark_running(self, run_id: str) -> None:
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is None:
+                return
+            run["status"] = "running"
+            run["started_at"] = datetime.now()
+            self._started[run_id] = time.monotonic()
+
+    def mark_finished(
+        self, run_id: str, error: Optional[BaseException] = None, started_at: Optional[datetime] = None
+    ) -> None:
+        """
+        标记执行结束；未标记开始的运行（进程池）使用 started_at 作为开始时间
+        """
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is None:
+                return
+            run["status"] = "finished" if error is None else "failed"
+            run["finished_at"] = datetime.now()
+            run["error"] = str(error) if error is not None else None
+            started = self._started.pop(run_id, None)
+            if started is not None:
+                run["duration"] = time.monotonic() - started
+            elif run["started_at"] is None and started_at is not None:
+                run["started_at"] = started_at
+                run["duration"] = (run["finished_at"] - started_at).total_seconds()
+
+    def mark_missed(self, run_id: str) -> None:
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is not None:
+                run["status"] = "missed"
+                run["finished_at"] = datetime.now()
+
+    def handle_event(self, event) -> None:
+        """
+        调度器事件监听器，只处理手动执行的任务
+
+        提交事件只代表进入执行器，线程池满时仍在排队，因此不据此标记 running
+        """
+        run_id = manual_run_id(event.job_id)
+        if run_id is None:
+            return
+        if event.code in (EVENT_JOB_EXECUTED, EVENT_JOB_ERROR):
+            self.mark_finished(run_id, event.exception, execution_start_time(event))
+        elif event.code == EVENT_JOB_MISSED:
+            self.mark_missed(run_id)
+
+
+# 手动执行监听的调度器事件
+RUN_EVENTS = EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED
+
+run_tracker = RunTracker(maxsize=settings.JOB_RUN_HISTORY_SIZE)
@@ -1,32 +1,239 @@
-from typing import Dict, Any, Optional, List, Union
+from typing import Callable, Dict, Any, Optional, List, Tuple, Union
+import asyncio
+import inspect
 import logging
 import json
 from datetime import datetime
-import importlib
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.executors.pool import ThreadPoolExecutor, ProcessPoolExecutor
+from apscheduler.executors.asyncio import AsyncIOExecutor
+from apscheduler.executors.base import run_job as run_scheduled_job
+from apscheduler.executors.base_py3 import run_coroutine_job
+from apscheduler.util import iscoroutinefunction_partial
+from apscheduler.util import convert_to_datetime
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MISSED, JobExecutionEvent
+from concurrent.futures.process import BrokenProcessPool
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.core.config import settings
+from app.core.metrics import JOBSTORE_LATENCY, instrument, registry
+from app.db.session import AsyncSessionLocal, SQLALCHEMY_SYNC_DATABASE_URL
 from app.models.job import Job
-from app.models.job_log import JobLog
+from app.services.coordination import SYNC_LEASE, coordinator
+from app.services.function_registry import function_registry
+from app.services.job_queue import RUN_ID_KWARG, enqueue_job, job_queue_writer
+from app.services.job_runner import job_log_writer, record_process_execution, run_job, run_job_async, run_job_in_process
+from app.services.job_spec import SPEC_HASH_KWARG, job_spec_hash, trigger_changed
+from app.services.jobstores import WriteBehindJobStore
+from app.services.log_retention import RETENTION_JOB_ID, run_log_retention
+from app.services.run_recorder import RUN_RECORD_EVENTS, job_run_writer, run_recorder
+from app.services.runs import RUN_EVENTS, manual_run_job_id, run_tracker, scheduled_run
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+
+def _create_jobstore(name: str):
+    """
+    根据 APSCHEDULER_JOBSTORES 配置创建任务存储
+    """
+    name = name.strip()
+    table = settings.APSCHEDULER_JOBSTORE_TABLE
+    if name in ("", "default", "sqlite"):
+        return SQLAlchemyJobStore(url="sqlite:///jobs.sqlite", tablename=table)
+    if name == "database":
+        # 使用主数据库(MySQL/PostgreSQL)保存任务
+        return SQLAlchemyJobStore(
+            url=SQLALCHEMY_SYNC_DATABASE_URL,
+            tablename=table,
+            engine_options={"pool_pre_ping": settings.DB_POOL_PRE_PING, "pool_recycle": settings.DB_POOL_RECYCLE},
+        )
+    if name == "memory":
+        return MemoryJobStore()
+    if name == "writebehind":
+        # 内存中调度，变更异步批量写回主数据库
+        return WriteBehindJobStore(
+            url=SQLALCHEMY_SYNC_DATABASE_URL,
+            tablename=table,
+            flush_interval=settings.JOBSTORE_FLUSH_INTERVAL,
+            engine_options={"pool_pre_ping": settings.DB_POOL_PRE_PING, "pool_recycle": settings.DB_POOL_RECYCLE},
+        )
+    if "://" in name:
+        return SQLAlchemyJobStore(url=name, tablename=table)
+    raise ValueError(f"不支持的任务存储类型: {name}")
+
+
 # 创建调度器
 jobstores = {
-    'default': SQLAlchemyJobStore(url=f"sqlite:///jobs.sqlite")
+    'default': _create_jobstore(settings.APSCHEDULER_JOBSTORES),
+    # 手动执行的一次性任务，不需要持久化
+    'manual': MemoryJobStore(),
 }
 
+# 记录任务存储各操作的耗时
+JOBSTORE_OPERATIONS = (
+    "lookup_job", "get_due_jobs", "get_next_run_time", "get_all_jobs",
+    "add_job", "update_job", "remove_job",
+)
+for alias, store in jobstores.items():
+    instrument(store, JOBSTORE_OPERATIONS, JOBSTORE_LATENCY, alias)
+
+# 多节点部署时，共享任务存储中的到期任务只由负责的节点调度
+if coordinator.enabled:
+    coordinator.guard(jobstores['default'])
+
+
+def _executor_pool_sizes(value: str) -> Dict[str, int]:
+    """
+    解析 APSCHEDULER_EXECUTORS 配置中的线程池/进程池大小
+    """
+    value = value.strip()
+    if value in ("", "default"):
+        return {}
+    sizes = json.loads(value)
+    unknown = set(sizes) - {"thread", "process"}
+    if unknown:
+        raise ValueError(f"不支持的执行器配置: {', '.join(sorted(unknown))}")
+    return sizes
+
+
+def _run_scheduled_job(job, jobstore_alias, run_times, logger_name) -> List[JobExecutionEvent]:
+    """
+    逐个计划运行时间执行任务，执行期间设置当前运行，供执行包装器标记开始
+    """
+    events = []
+    for run_time in run_times:
+        token = scheduled_run.set((job.id, run_time))
+        try:
+            events.extend(run_scheduled_job(job, jobstore_alias, [run_time], logger_name))
+        finally:
+            scheduled_run.reset(token)
+    return events
+
+
+async def _run_scheduled_coroutine_job(job, jobstore_alias, run_times, logger_name) -> List[JobExecutionEvent]:
+    """
+    _run_scheduled_job 的协程版本
+    """
+    events = []
+    for run_time in run_times:
+        token = scheduled_run.set((job.id, run_time))
+        try:
+            events.extend(await run_coroutine_job(job, jobstore_alias, [run_time], logger_name))
+        finally:
+            scheduled_run.reset(token)
+    return events
+
+
+class JobThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    线程池执行器
+
+    在工作线程中设置当前运行，执行包装器据此标记运行开始
+    """
+
+    def _do_submit_job(self, job, run_times):
+        def callback(f):
+            exc = f.exception()
+            if exc is None:
+                self._run_job_success(job.id, f.result())
+            else:
+                self._run_job_error(job.id, exc, exc.__traceback__)
+
+        f = self._pool.submit(_run_scheduled_job, job, job._jobstore_alias, run_times, self._logger.name)
+        f.add_done_callback(callback)
+
+
+class JobAsyncIOExecutor(AsyncIOExecutor):
+    """
+    协程执行器
+
+    与 JobThreadPoolExecutor 相同，在执行任务的协程或线程中设置当前运行
+    """
+
+    def _do_submit_job(self, job, run_times):
+        def callback(f):
+            self._pending_futures.discard(f)
+            try:
+                events = f.result()
+            except BaseException as exc:
+                self._run_job_error(job.id, exc, exc.__traceback__)
+            else:
+                self._run_job_success(job.id, events)
+
+        if iscoroutinefunction_partial(job.func):
+            coro = _run_scheduled_coroutine_job(job, job._jobstore_alias, run_times, self._logger.name)
+            f = self._eventloop.create_task(coro)
+        else:
+            f = self._eventloop.run_in_executor(
+                None, _run_scheduled_job, job, job._jobstore_alias, run_times, self._logger.name
+            )
+
+        f.add_done_callback(callback)
+        self._pending_futures.add(f)
+
+
+class JobProcessPoolExecutor(ProcessPoolExecutor):
+    """
+    进程池执行器
+
+    子进程被强制结束（如超时看门狗）时 APScheduler 只记录错误日志而不分发任务事件，
+    这里补发 EVENT_JOB_ERROR，使运行记录能够结束
+    """
+
+    def _do_submit_job(self, job, run_times):
+        def callback(f):
+            exc = f.exception()
+            if exc is None:
+                self._run_job_success(job.id, f.result())
+            elif isinstance(exc, BrokenProcessPool):
+                self._logger.error('Error running job %s', job.id, exc_info=(exc.__class__, exc, exc.__traceback__))
+                events = [
+                    JobExecutionEvent(EVENT_JOB_ERROR, job.id, job._jobstore_alias, run_time,
+                                      exception=exc, traceback=str(exc))
+                    for run_time in run_times
+                ]
+                self._run_job_success(job.id, events)
+            else:
+                self._run_job_error(job.id, exc, exc.__traceback__)
+
+        try:
+            f = self._pool.submit(run_scheduled_job, job, job._jobstore_alias, run_times, self._logger.name)
+        except BrokenProcessPool:
+            self._logger.warning('Process pool is broken; replacing pool with a fresh instance')
+            self._pool = self._pool.__class__(self._pool._max_workers)
+            f = self._pool.submit(run_scheduled_job, job, job._jobstore_alias, run_times, self._logger.name)
+
+        f.add_done_callback(callback)
+
+
+pool_sizes = _executor_pool_sizes(settings.APSCHEDULER_EXECUTORS)
 executors = {
-    'default': ThreadPoolExecutor(20),
-    'processpool': ProcessPoolExecutor(5)
+    'default': JobThreadPoolExecutor(pool_sizes.get("thread", 20)),
+    'processpool': JobProcessPoolExecutor(pool_sizes.get("process", 5)),
+    'asyncio': JobAsyncIOExecutor(),
 }
 
+# 任务的执行器类型与调度器中执行器别名的对应关系
+EXECUTOR_ALIASES = {
+    "thread": "default",
+    "process": "processpool",
+    "asyncio": "asyncio",
+}
+
+EXECUTOR_TYPES = {alias: executor for executor, alias in EXECUTOR_ALIASES.items()}
+
+# 执行包装器，参数为 (任务ID, 函数路径, args, kwargs)，关键字参数为 timeout 和 spec_hash
+JOB_WRAPPERS = (run_job, run_job_async, run_job_in_process, enqueue_job)
+
+if settings.JOB_EXECUTION_MODE not in ("local", "queue"):
+    raise ValueError(f"不支持的任务执行模式: {settings.JOB_EXECUTION_MODE}")
+QUEUE_MODE = settings.JOB_EXECUTION_MODE == "queue"
+
 job_defaults = settings.APSCHEDULER_JOB_DEFAULTS
 
 scheduler = AsyncIOScheduler(
@@ -36,49 +243,68 @@ scheduler = AsyncIOScheduler(
 )
 
 
-async def log_job_execution(job_id: int, db: AsyncSession, func_result: Any = None, error: Exception = None) -> None:
+def _executor_stats() -> Dict[str, Tuple[int, int]]:
     """
-    记录任务执行日志
+    各执行器中执行中和排队中的任务实例数
     """
-    try:
-        # 查询任务
-        result = await db.execute(select(Job).where(Job.id == job_id))
-        job = result.scalars().first()
-        
-        if not job:
-            logger.error(f"任务不存在: {job_id}")
-            return
-        
-        # 创建日志记录
-        end_time = datetime.now()
-        job_log = JobLog(
-            job_id=job_id,
-            status="success" if error is None else "failed",
-            start_time=datetime.now(),  # 这里应该是任务开始时间，但为简化，使用当前时间
-            end_time=end_time,
-            duration=0,  # 这里应该计算实际持续时间
-            error_message=str(error) if error else None,
-            output=str(func_result) if func_result else None
-        )
-        
-        db.add(job_log)
-        await db.commit()
-        
-    except Exception as e:
-        logger.error(f"记录任务执行日志时出错: {e}")
+    stats = {}
+    for alias, executor in executors.items():
+        # 已提交但尚未结束的实例数
+        inflight = sum(getattr(executor, "_instances", {}).values())
+        pool = getattr(executor, "_pool", None)
+        max_workers = getattr(pool, "_max_workers", None)
+        if max_workers is None:
+            stats[alias] = (inflight, 0)
+        else:
+            stats[alias] = (min(inflight, max_workers), max(inflight - max_workers, 0))
+    return stats
+
+
+registry.gauge_callback(
+    "scheduler_executor_busy_workers", "Job instances running in each executor", ("executor",),
+    lambda: [((alias,), busy) for alias, (busy, _) in _executor_stats().items()],
+)
+registry.gauge_callback(
+    "scheduler_executor_queue_depth", "Job instances waiting for a worker in each executor", ("executor",),
+    lambda: [((alias,), queued) for alias, (_, queued) in _executor_stats().items()],
+)
+
+# 进程池任务的执行日志由主进程写入
+scheduler.add_listener(record_process_execution, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+if QUEUE_MODE:
+    # 队列模式下执行成功只代表已入队，运行状态由工作进程写入，这里只记录入队失败和错过执行
+    scheduler.add_listener(run_tracker.handle_event, EVENT_JOB_ERROR | EVENT_JOB_MISSED)
+    scheduler.add_listener(run_recorder.handle_event, EVENT_JOB_ERROR | EVENT_JOB_MISSED)
+else:
+    # 手动执行的状态跟踪
+    scheduler.add_listener(run_tracker.handle_event, RUN_EVENTS)
+    # 运行生命周期记录
+    scheduler.add_listener(run_recorder.handle_event, RUN_RECORD_EVENTS)
+
+
+def _resolve_executor(executor: Optional[str], target: Callable) -> Tuple[str, Callable]:
+    """
+    返回执行器别名和对应的执行包装器
+
+    协程函数总是在事件循环中直接运行，不占用线程或进程；队列模式下只在事件循环中入队，
+    由工作进程按任务的执行器类型执行
+    """
+    executor = executor or "thread"
+    if executor not in EXECUTOR_ALIASES:
+        raise ValueError(f"不支持的执行器类型: {executor}")
+    if QUEUE_MODE:
+        return "asyncio", enqueue_job
+    if inspect.iscoroutinefunction(target):
+        return "asyncio", run_job_async
+    alias = EXECUTOR_ALIASES[executor]
+    return alias, run_job_in_process if alias == "processpool" else run_job
 
 
 async def import_function(func_path: str) -> callable:
     """
-    导入函数
+    导入函数，结果由函数注册表缓存
     """
-    try:
-        module_path, func_name = func_path.rsplit('.', 1)
-        module = importlib.import_module(module_path)
-        return getattr(module, func_name)
-    except (ImportError, AttributeError) as e:
-        logger.error(f"导入函数失败: {e}")
-        raise ValueError(f"无法导入函数: {func_path}")
+    return function_registry.resolve(func_path)
 
 
 async def add_job(
@@ -93,25 +319,34 @@ async def add_job(
     max_instances: int = 1,
     misfire_grace_time: int = 60,
     coalesce: bool = False,
+    executor: str = "thread",
+    timeout: Optional[int] = None,
+    spec_hash: Optional[str] = None,
+    paused: bool = False,
 ) -> str:
     """
     添加任务
+
+    spec_hash 为任务记录的规格哈希，保存在包装器参数中供启动时同步比较；paused 为真时添加为暂停状态
     """
     try:
-        # 导入函数
-        func_obj = await import_function(func)
+        # 校验函数可以导入
+        target = await import_function(func)
+        alias, wrapper = _resolve_executor(executor, target)
         
-        # 添加任务
+        # 添加任务，由执行包装器调用实际函数并记录执行情况
         job = scheduler.add_job(
-            func_obj,
+            wrapper,
             trigger=trigger,
-            args=args or [],
-            kwargs=kwargs or {},
+            args=[job_id, func, args or [], kwargs or {}],
+            kwargs={"timeout": timeout or None, SPEC_HASH_KWARG: spec_hash},
             id=str(job_id),
-            name=job_name,
+            name=job_name or func,
             max_instances=max_instances,
             misfire_grace_time=misfire_grace_time,
             coalesce=coalesce,
+            executor=alias,
+            **({"next_run_time": None} if paused else {}),
             **trigger_args
         )
         
@@ -121,6 +356,107 @@ async def add_job(
         raise
 
 
+async def modify_job(
+    job_id: int,
+    func: Optional[str] = None,
+    trigger: Optional[str] = None,
+    trigger_args: Optional[Dict[str, Any]] = None,
+    args: Optional[List] = None,
+    kwargs: Optional[Dict] = None,
+    job_name: Optional[str] = None,
+    max_instances: Optional[int] = None,
+    misfire_grace_time: Optional[int] = None,
+    coalesce: Optional[bool] = None,
+    executor: Optional[str] = None,
+    timeout: Optional[int] = None,
+    spec_hash: Optional[str] = None,
+) -> None:
+    """
+    原地修改调度器中的任务，为 None 的参数保持不变
+
+    只有触发器变化时才重新计算下次运行时间
+    """
+    try:
+        job = scheduler.get_job(str(job_id))
+        if job is None:
+            raise ValueError(f"任务未在调度器中: {job_id}")
+
+        changes = {}
+        if func is not None or args is not None or kwargs is not None:
+            changes["args"] = [
+                job_id,
+                func if func is not None else _job_func_path(job),
+                args if args is not None else _job_args(job),
+                kwargs if kwargs is not None else _job_kwargs(job),
+            ]
+        if timeout is not None or spec_hash is not None:
+            changes["kwargs"] = dict(job.kwargs)
+            if timeout is not None:
+                # 超时由执行包装器处理，0 表示不限制
+                changes["kwargs"]["timeout"] = timeout or None
+            if spec_hash is not None:
+                changes["kwargs"][SPEC_HASH_KWARG] = spec_hash
+        if job_name is not None:
+            changes["name"] = job_name
+        if max_instances is not None:
+            changes["max_instances"] = max_instances
+        if misfire_grace_time is not None:
+            changes["misfire_grace_time"] = misfire_grace_time
+        if coalesce is not None:
+            changes["coalesce"] = bool(coalesce)
+        if func is not None or executor is not None:
+            # 函数或执行器变化时重新选择执行包装器
+            target = await import_function(func if func is not None else _job_func_path(job))
+            if executor is None:
+                executor = EXECUTOR_TYPES.get(job.executor)
+            changes["executor"], changes["func"] = _resolve_executor(executor, target)
+
+        if changes:
+            scheduler.modify_job(str(job_id), **changes)
+        if trigger is not None:
+            scheduler.reschedule_job(str(job_id), trigger=trigger, **(trigger_args or {}))
+    except Exception as e:
+        logger.error(f"修改任务失败: {e}")
+        raise
+
+
+async def run_job_now(job_id: int) -> str:
+    """
+    立即执行一次任务，返回运行ID
+
+    作为一次性任务提交给调度器，使用与原任务相同的执行器，不阻塞调用方
+    """
+    try:
+        job = scheduler.get_job(str(job_id))
+        if job is None:
+            raise ValueError(f"任务未在调度器中: {job_id}")
+
+        run_id = run_tracker.create(job_id)
+        kwargs = job.kwargs
+        if job.func is enqueue_job:
+            # 工作进程按运行ID登记结果，供 /jobs/runs/{run_id} 查询
+            kwargs = {**kwargs, RUN_ID_KWARG: run_id}
+        try:
+            scheduler.add_job(
+                job.func,
+                trigger="date",
+                args=job.args,
+                kwargs=kwargs,
+                id=manual_run_job_id(run_id),
+                name=f"{job.name} (手动执行)",
+                executor=job.executor,
+                jobstore="manual",
+                misfire_grace_time=None,
+            )
+        except Exception:
+            run_tracker.discard(run_id)
+            raise
+        return run_id
+    except Exception as e:
+        logger.error(f"手动执行任务失败: {e}")
+        raise
+
+
 async def remove_job(job_id: Union[str, int]) -> None:
     """
     移除任务
@@ -154,6 +490,21 @@ async def resume_job(job_id: Union[str, int]) -> None:
         raise
 
 
+def _job_func_path(job) -> str:
+    # 经执行包装器注册的任务，实际函数路径在包装器参数中
+    if job.func in JOB_WRAPPERS:
+        return job.args[1]
+    return job.func_ref
+
+
+def _job_args(job) -> List:
+    return job.args[2] if job.func in JOB_WRAPPERS else job.args
+
+
+def _job_kwargs(job) -> Dict:
+    return job.args[3] if job.func in JOB_WRAPPERS else job.kwargs
+
+
 async def get_job(job_id: Union[str, int]) -> Optional[Dict[str, Any]]:
     """
     获取任务信息
@@ -164,9 +515,9 @@ async def get_job(job_id: Union[str, int]) -> Optional[Dict[str, Any]]:
             return {
                 "id": job.id,
                 "name": job.name,
-                "func": job.func_ref.__name__,
-                "args": job.args,
-                "kwargs": job.kwargs,
+                "func": _job_func_path(job),
+                "args": _job_args(job),
+                "kwargs": _job_kwargs(job),
                 "trigger": str(job.trigger),
                 "next_run_time": job.next_run_time,
             }
@@ -182,13 +533,13 @@ async def get_jobs() -> List[Dict[str, Any]]:
     """
     try:
         jobs = []
-        for job in scheduler.get_jobs():
+        for job in scheduler.get_jobs(jobstore="default"):
             jobs.append({
                 "id": job.id,
                 "name": job.name,
-                "func": job.func_ref.__name__,
-                "args": job.args,
-                "kwargs": job.kwargs,
+                "func": _job_func_path(job),
+                "args": _job_args(job),
+                "kwargs": _job_kwargs(job),
                 "trigger": str(job.trigger),
                 "next_run_time": job.next_run_time,
             })
@@ -198,24 +549,203 @@ async def get_jobs() -> List[Dict[str, Any]]:
         raise
 
 
-def start_scheduler():
+def schedule_log_retention() -> None:
+    """
+    将日志保留清理注册为调度器中的维护任务
+    """
+    scheduler.add_job(
+        run_log_retention,
+        trigger="interval",
+        minutes=settings.LOG_RETENTION_INTERVAL_MINUTES,
+        id=RETENTION_JOB_ID,
+        name="日志保留清理",
+        executor="asyncio",
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True,
+    )
+
+
+async def apply_execution_mode() -> int:
+    """
+    切换执行模式后，把任务存储中已有任务的执行包装器改为当前模式，返回修改的任务数
+    """
+    jobs = [job for job in scheduler.get_jobs(jobstore="default") if job.func in JOB_WRAPPERS]
+    stale = [job for job in jobs if (job.func is enqueue_job) != QUEUE_MODE]
+    if not stale:
+        return 0
+
+    # 入队包装器不保留执行器类型，从任务表中读取
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Job.id, Job.executor).where(Job.id.in_([int(job.id) for job in stale])))
+        executor_types = dict(result.all())
+    modified = 0
+    for job in stale:
+        try:
+            target = function_registry.resolve(_job_func_path(job))
+            executor, func = _resolve_executor(executor_types.get(int(job.id)), target)
+            kwargs = {key: value for key, value in job.kwargs.items() if key != RUN_ID_KWARG}
+            scheduler.modify_job(job.id, func=func, executor=executor, kwargs=kwargs)
+            modified += 1
+        except Exception as e:
+            logger.error(f"切换任务 {job.id} 的执行模式失败: {e}")
+    logger.info(f"已将 {modified} 个任务切换为 {settings.JOB_EXECUTION_MODE} 执行模式")
+    return modified
+
+
+# 同步时读取的任务字段
+SYNC_COLUMNS = (
+    Job.id, Job.name, Job.func, Job.args, Job.kwargs, Job.trigger, Job.trigger_args,
+    Job.max_instances, Job.misfire_grace_time, Job.coalesce, Job.executor, Job.timeout, Job.status,
+)
+
+
+def _expired_date_job(row) -> bool:
+    """
+    一次性任务的运行时间已过，调度器中已执行并移除，不再重新添加
+    """
+    if row.trigger != "date" or not row.trigger_args or "run_date" not in row.trigger_args:
+        return False
+    try:
+        run_date = convert_to_datetime(row.trigger_args["run_date"], scheduler.timezone, "run_date")
+    except (TypeError, ValueError):
+        return False
+    return run_date < datetime.now(scheduler.timezone)
+
+
+async def reconcile_jobs(batch_size: int = 1000) -> Dict[str, int]:
+    """
+    同步任务表与调度器
+
+    分批流式读取任务记录，与调度器中任务参数里保存的规格哈希比较，只添加、修改、
+    暂停/恢复或移除有变化的任务；触发器未变化时不重新计算下次运行时间。返回各类操作的数量
+    """
+    counts = {"added": 0, "modified": 0, "rescheduled": 0, "paused": 0, "resumed": 0,
+              "removed": 0, "unchanged": 0, "failed": 0}
+    live = {job.id: job for job in scheduler.get_jobs(jobstore="default") if job.func in JOB_WRAPPERS}
+
+    async def apply(row) -> None:
+        scheduler_job = live.pop(str(row.id), None)
+        if row.status not in ("running", "paused"):
+            if scheduler_job is not None:
+                scheduler.remove_job(scheduler_job.id)
+                counts["removed"] += 1
+            return
+
+        spec_hash = job_spec_hash(row)
+        paused = row.status == "paused"
+        if scheduler_job is None:
+            if _expired_date_job(row):
+                counts["unchanged"] += 1
+                return
+            await add_job(
+                None, row.id, row.func, row.trigger, row.trigger_args or {},
+                args=row.args, kwargs=row.kwargs, job_name=row.name,
+                max_instances=row.max_instances, misfire_grace_time=row.misfire_grace_time,
+                coalesce=bool(row.coalesce), executor=row.executor, timeout=row.timeout,
+                spec_hash=spec_hash, paused=paused,
+            )
+            counts["added"] += 1
+            return
+
+        old_hash = scheduler_job.kwargs.get(SPEC_HASH_KWARG)
+        if old_hash != spec_hash:
+            # 没有规格哈希的旧任务按触发器的字符串形式判断是否变化
+            if old_hash is None:
+                reschedule = str(scheduler._create_trigger(row.trigger, dict(row.trigger_args or {}))) != str(scheduler_job.trigger)
+            else:
+                reschedule = trigger_changed(old_hash, spec_hash)
+            await modify_job(
+                row.id, func=row.func, args=row.args or [], kwargs=row.kwargs or {}, job_name=row.name,
+                max_instances=row.max_instances, misfire_grace_time=row.misfire_grace_time,
+                coalesce=bool(row.coalesce), executor=row.executor, timeout=row.timeout or 0,
+                trigger=row.trigger if reschedule else None,
+                trigger_args=(row.trigger_args or {}) if reschedule else None,
+                spec_hash=spec_hash,
+            )
+            counts["rescheduled" if reschedule else "modified"] += 1
+            if reschedule and paused:
+                # 重新调度会恢复任务
+                scheduler.pause_job(scheduler_job.id)
+                return
+        else:
+            counts["unchanged"] += 1
+
+        is_paused = scheduler_job.next_run_time is None
+        if paused and not is_paused:
+            scheduler.pause_job(scheduler_job.id)
+            counts["paused"] += 1
+        elif not paused and is_paused:
+            scheduler.resume_job(scheduler_job.id)
+            counts["resumed"] += 1
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(select(*SYNC_COLUMNS).execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            for row in rows:
+                try:
+                    await apply(row)
+                except Exception as e:
+                    counts["failed"] += 1
+                    logger.error(f"同步任务 {row.id} 失败: {e}")
+
+    # 任务表中已不存在的任务
+    for job_id in list(live):
+        try:
+            scheduler.remove_job(job_id)
+            counts["removed"] += 1
+        except Exception as e:
+            counts["failed"] += 1
+            logger.error(f"移除任务 {job_id} 失败: {e}")
+
+    logger.info("任务同步完成: " + ", ".join(f"{key} {value}" for key, value in counts.items()))
+    return counts
+
+
+async def start_scheduler():
     """
     启动调度器
     """
     try:
-        scheduler.start()
+        job_log_writer.start()
+        job_run_writer.start()
+        job_queue_writer.start()
+        await coordinator.start(wakeup=scheduler.wakeup)
+        scheduler.start(paused=True)
+        # 多节点共享任务存储时，同一时间只有一个节点切换执行方式并同步任务表
+        async with coordinator.exclusive(SYNC_LEASE, settings.JOB_SYNC_LEASE_TTL) as acquired:
+            if acquired:
+                await apply_execution_mode()
+                if settings.JOB_SYNC_ON_STARTUP:
+                    await reconcile_jobs(settings.JOB_SYNC_BATCH_SIZE)
+            else:
+                logger.info("其他节点正在同步任务，跳过启动同步")
+        scheduler.resume()
+        if settings.JOB_FUNCTION_WARMUP:
+            function_registry.warm(
+                _job_func_path(job) for job in scheduler.get_jobs() if job.func in JOB_WRAPPERS
+            )
+        if settings.LOG_RETENTION_ENABLED:
+            schedule_log_retention()
         logger.info("调度器已启动")
     except Exception as e:
         logger.error(f"启动调度器失败: {e}")
         raise
 
 
-def shutdown_scheduler():
+async def shutdown_scheduler():
     """
-    关闭调度器
+    关闭调度器，并写完尚未提交的执行日志和运行记录
     """
     try:
+        # 先释放调度租约，其他节点可以立即接管
+        await coordinator.stop()
         scheduler.shutdown()
+        # 让出事件循环，等待调度器关闭完成
+        await asyncio.sleep(0)
+        await job_queue_writer.stop()
+        await job_log_writer.stop()
+        await job_run_writer.stop()
         logger.info("调度器已关闭")
     except Exception as e:
         logger.error(f"关闭调度器失败: {e}")
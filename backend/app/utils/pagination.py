@@ -0,0 +1,27 @@
+from typing import Any, List
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    将排序键编码为不透明的游标
+    """
+    data = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    解码游标，返回排序键列表
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError("无效的游标")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("无效的游标")
+    return values
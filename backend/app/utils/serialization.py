@@ -0,0 +1,120 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union
+import functools
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from operator import attrgetter
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # 未安装 orjson 时使用标准库
+    orjson = None
+
+# 复制到返回的响应中时忽略的响应头，由响应自身重新计算
+_SKIP_HEADERS = ("content-length", "content-type")
+
+
+def _default(value: Any) -> Any:
+    """
+    orjson 和标准库都不能直接编码的类型
+    """
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump() if hasattr(value, "model_dump") else value.dict()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"无法序列化类型 {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    编码为 JSON 字节串，datetime 输出 ISO 8601 格式
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    使用 orjson 编码的 JSON 响应
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _schema_fields(schema: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    字段名到类型注解
+    """
+    fields = getattr(schema, "model_fields", None)
+    if fields is not None:
+        return {name: field.annotation for name, field in fields.items()}
+    # pydantic 1
+    return {name: field.outer_type_ for name, field in schema.__fields__.items()}
+
+
+def _is_bool(annotation: Any) -> bool:
+    if annotation is bool:
+        return True
+    # Optional[bool]
+    return getattr(annotation, "__origin__", None) is Union and bool in annotation.__args__
+
+
+@functools.lru_cache(maxsize=None)
+def row_serializer(schema: Union[Type[BaseModel], Tuple[str, ...]]) -> Callable[[Any], Dict[str, Any]]:
+    """
+    为模式或字段名元组生成一次行序列化函数
+
+    直接按字段名读取 ORM 对象的属性组成字典，不再逐行经过 pydantic 校验，
+    只应用于字段与模式一致的数据库行。模式中为 bool 而数据库中为整数的字段转换为 bool
+    """
+    if isinstance(schema, tuple):
+        names, bool_names = schema, ()
+    else:
+        fields = _schema_fields(schema)
+        names = tuple(fields)
+        bool_names = tuple(name for name, annotation in fields.items() if _is_bool(annotation))
+
+    getter = attrgetter(*names)
+    if len(names) == 1:
+        name = names[0]
+        getter = lambda row: (getattr(row, name),)
+
+    if not bool_names:
+        return lambda row: dict(zip(names, getter(row)))
+
+    def serialize(row: Any) -> Dict[str, Any]:
+        data = dict(zip(names, getter(row)))
+        for name in bool_names:
+            value = data[name]
+            if value is not None:
+                data[name] = bool(value)
+        return data
+
+    return serialize
+
+
+def serialize_rows(schema: Union[Type[BaseModel], Tuple[str, ...]], rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    serialize = row_serializer(schema)
+    return [serialize(row) for row in rows]
+
+
+def json_response(content: Any, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """
+    直接返回 JSON 响应，跳过 FastAPI 按 response_model 的校验和编码
+
+    response 为端点注入的响应对象，其中设置的响应头会复制到返回的响应中
+    """
+    headers = None
+    if response is not None:
+        headers = {key: value for key, value in response.headers.items() if key not in _SKIP_HEADERS}
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
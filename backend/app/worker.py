@@ -0,0 +1,49 @@
+"""
+任务队列工作进程
+
+队列模式(JOB_EXECUTION_MODE=queue)下认领并执行调度器写入队列表的运行，可以在多台机器上启动多个:
+
+    python -m app.worker --concurrency 20
+"""
+import argparse
+import asyncio
+import logging
+import signal
+
+from app.core.config import settings
+from app.services.job_queue import QueueWorker
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="APScheduler-Admin 任务队列工作进程")
+    parser.add_argument("--worker-id", default=None, help="工作进程ID，默认为 主机名:进程号")
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY, help="同时执行的运行数")
+    parser.add_argument("--processes", type=int, default=0, help="执行器为 process 的任务使用的进程数")
+    parser.add_argument("--poll-interval", type=float, default=settings.WORKER_POLL_INTERVAL, help="队列为空时的轮询间隔(秒)")
+    parser.add_argument("--log-level", default="INFO")
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace) -> None:
+    worker = QueueWorker(
+        worker_id=args.worker_id,
+        concurrency=args.concurrency,
+        poll_interval=args.poll_interval,
+        lease_ttl=settings.WORKER_LEASE_TTL,
+        max_attempts=settings.JOB_QUEUE_MAX_ATTEMPTS,
+        process_workers=args.processes,
+    )
+    # 收到 SIGINT/SIGTERM 后不再认领，等待执行中的运行结束后退出
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError:  # Windows
+            pass
+    await worker.run()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main(args))
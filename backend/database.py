@@ -1,4 +1,6 @@
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, Float, DateTime, ForeignKey, JSON, Text
+from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, ForeignKey, JSON, Text, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
@@ -7,11 +9,32 @@ import os
 # 数据库连接配置
 DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./apscheduler.db")
 
-# 创建数据库引擎
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {})
+# 同步驱动对应的异步驱动
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+}
 
-# 创建会话
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def async_database_url(url: str) -> str:
+    """
+    将连接字符串转换为异步驱动，已指定其他驱动时保持不变
+    """
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+# 创建异步数据库引擎，数据库访问不再阻塞事件循环
+engine = create_async_engine(async_database_url(DATABASE_URL))
+
+# 创建会话，提交后不过期对象，避免在异步会话中触发隐式加载
+AsyncSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=engine, class_=AsyncSession, expire_on_commit=False
+)
 
 # 创建基类
 Base = declarative_base()
@@ -68,24 +91,24 @@ class Setting(Base):
     key = Column(String, unique=True, index=True)
     value = Column(JSON)
 
+# 设置缓存的版本号行的键
+SETTINGS_VERSION_KEY = "_settings_version"
+
 # 创建数据库表
-def create_tables():
-    Base.metadata.create_all(bind=engine)
+async def create_tables():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
 
 # 获取数据库会话
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # 初始化数据库
-def init_db():
-    db = SessionLocal()
-    try:
+async def init_db():
+    async with AsyncSessionLocal() as db:
         # 检查是否已有用户
-        user_count = db.query(User).count()
+        user_count = await db.scalar(select(func.count()).select_from(User))
         if user_count == 0:
             # 创建默认管理员用户
             admin_user = User(
@@ -96,8 +119,8 @@ def init_db():
                 is_superuser=True
             )
             db.add(admin_user)
-            db.commit()
-            db.refresh(admin_user)
+            await db.commit()
+            await db.refresh(admin_user)
             
             # 创建示例任务
             test_job = Job(
@@ -123,7 +146,7 @@ def init_db():
                 user_id=admin_user.id
             )
             db.add(example_job)
-            db.commit()
+            await db.commit()
             
             # 创建示例日志
             success_log = Log(
@@ -171,6 +194,14 @@ def init_db():
             )
             db.add(max_instances_setting)
             
-            db.commit()
-    finally:
-        db.close()
+            await db.commit()
+        
+        # 创建设置缓存的版本号行，更新设置时锁定该行（包括已有的数据库）
+        version_id = await db.scalar(select(Setting.id).where(Setting.key == SETTINGS_VERSION_KEY))
+        if version_id is None:
+            db.add(Setting(key=SETTINGS_VERSION_KEY, value=0))
+            try:
+                await db.commit()
+            except IntegrityError:
+                # 其他进程同时创建
+                await db.rollback()
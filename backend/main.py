@@ -1,12 +1,16 @@
-from fastapi import FastAPI, Form, HTTPException, Depends, Header, Body, Query
+from fastapi import FastAPI, Form, HTTPException, Depends, Header, Body, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Tuple
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import delete as sql_delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 import json
 from datetime import datetime
 
-from database import get_db, User, Job, Log, Setting, create_tables, init_db
+from database import AsyncSessionLocal, get_db, User, Job, Log, create_tables, init_db
+from settings_store import settings_store
+from app.utils.serialization import FastJSONResponse, row_serializer
 
 # 定义登录请求模型
 class LoginRequest(BaseModel):
@@ -16,7 +20,9 @@ class LoginRequest(BaseModel):
 app = FastAPI(
     title="APScheduler管理系统",
     description="APScheduler管理系统API",
-    version="1.0.0"
+    version="1.0.0",
+    # 使用 orjson 编码响应，datetime 直接输出 ISO 8601 格式
+    default_response_class=FastJSONResponse,
 )
 
 # 配置CORS
@@ -26,13 +32,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 列表接口的总数放在响应头中，需要允许前端读取
+    expose_headers=["X-Total-Count"],
 )
 
+# 返回给前端的字段，序列化函数只生成一次
+job_to_dict = row_serializer(("id", "name", "func", "trigger", "args", "kwargs", "next_run_time", "status"))
+log_to_dict = row_serializer(("id", "job_id", "status", "message", "created_at", "start_time", "duration"))
+user_to_dict = row_serializer(("id", "username", "email", "is_active", "is_superuser"))
+
 # 初始化数据库
 @app.on_event("startup")
 async def startup_event():
-    create_tables()
-    init_db()
+    await create_tables()
+    await init_db()
+    # 预先加载设置缓存，任务默认参数可直接从内存读取
+    async with AsyncSessionLocal() as db:
+        await settings_store.get_all(db)
 
 # 验证token
 def verify_token(authorization: Optional[str] = Header(None)):
@@ -42,12 +58,82 @@ def verify_token(authorization: Optional[str] = Header(None)):
         return token
     return None
 
+# 列表总数的计算方式
+TOTAL_MODES = ("exact", "estimated", "none")
+
+async def estimate_count(db: AsyncSession, query) -> Optional[int]:
+    """
+    由查询计划估算行数，不扫描表；数据库不提供估算时返回 None
+    """
+    dialect = db.bind.dialect
+    if dialect.name == "postgresql":
+        prefix = "EXPLAIN (FORMAT JSON) "
+    elif dialect.name == "mysql":
+        prefix = "EXPLAIN "
+    else:
+        return None
+
+    # 只编译一次，参数按驱动的参数风格原样传给驱动，不内联到 SQL 中；IN 列表展开为单个参数
+    compiled = query.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    conn = await db.connection()
+    result = await conn.exec_driver_sql(prefix + str(compiled), params)
+
+    if dialect.name == "postgresql":
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    row = result.mappings().first()
+    if row is None or row["rows"] is None:
+        return None
+    return int(row["rows"] * (row.get("filtered") or 100) / 100)
+
+async def paginate(
+    db: AsyncSession, query, offset: int, limit: int, total_mode: str
+) -> Tuple[List[Any], Optional[int]]:
+    """
+    分页查询，按 total_mode 同时给出总数
+
+    exact: 在分页查询中用窗口函数 COUNT(*) OVER () 计算精确总数，只查询一次
+    estimated: 使用查询计划中的估算行数，SQLite 不提供估算时退回精确计数
+    none: 不计算总数
+    """
+    if total_mode not in TOTAL_MODES:
+        raise HTTPException(status_code=400, detail=f"无效的总数方式: {total_mode}")
+
+    if total_mode == "estimated":
+        total = await estimate_count(db, query)
+        if total is not None:
+            items = (await db.execute(query.offset(offset).limit(limit))).scalars().all()
+            return items, total
+        total_mode = "exact"
+
+    if total_mode == "none":
+        items = (await db.execute(query.offset(offset).limit(limit))).scalars().all()
+        return items, None
+
+    rows = (
+        await db.execute(query.add_columns(func.count().over().label("total_count")).offset(offset).limit(limit))
+    ).all()
+    if rows:
+        return [row[0] for row in rows], rows[0].total_count
+    # 页码超出范围时窗口函数没有返回行，单独计数
+    total = await db.scalar(select(func.count()).select_from(query.subquery())) if offset else 0
+    return [], total
+
+def set_total_header(response: Response, total: Optional[int]) -> None:
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+
 # 登录API - 支持JSON格式
 @app.post("/api/v1/auth/login")
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_db)):
     print(f"登录尝试: {login_data.username}, {login_data.password}")
     # 只允许用户名为admin，密码为admin的用户登录
-    user = db.query(User).filter(User.username == login_data.username).first()
+    user = (await db.execute(select(User).where(User.username == login_data.username))).scalars().first()
     if user and user.hashed_password == login_data.password:  # 实际应用中应该验证加密密码
         # 生成token，这里简化处理
         token = "mock_token"
@@ -66,9 +152,9 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
 
 # 登录API - 支持Form格式（保留兼容性）
 @app.post("/api/v1/auth/login-form")
-async def login_form(username: str = Form(...), password: str = Form(...), db: Session = Depends(get_db)):
+async def login_form(username: str = Form(...), password: str = Form(...), db: AsyncSession = Depends(get_db)):
     print(f"Form登录尝试: {username}, {password}")
-    user = db.query(User).filter(User.username == username).first()
+    user = (await db.execute(select(User).where(User.username == username))).scalars().first()
     if user and user.hashed_password == password:  # 实际应用中应该验证加密密码
         # 生成token，这里简化处理
         token = "mock_token"
@@ -87,11 +173,11 @@ async def login_form(username: str = Form(...), password: str = Form(...), db: S
 
 # 获取用户信息
 @app.get("/api/v1/users/me")
-async def get_user_info(token: str = Depends(verify_token), db: Session = Depends(get_db)):
+async def get_user_info(token: str = Depends(verify_token), db: AsyncSession = Depends(get_db)):
     if not token:
         raise HTTPException(status_code=401, detail="未授权")
     # 在实际应用中，应该从token中获取用户ID
-    user = db.query(User).filter(User.username == "admin").first()
+    user = (await db.execute(select(User).where(User.username == "admin"))).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="用户不存在")
     return {
@@ -116,70 +202,43 @@ async def get_jobs(
     limit: int = Query(10, description="每页数量"),
     offset: int = Query(0, description="偏移量"),
     status: Optional[str] = Query(None, description="任务状态"),
-    db: Session = Depends(get_db)
+    total_mode: str = Query("none", alias="total", description="总数: exact(精确)/estimated(估算)/none(不计算)"),
+    response: Response = None,
+    db: AsyncSession = Depends(get_db)
 ):
     if not token:
         raise HTTPException(status_code=401, detail="未授权")
     
     # 构建查询
-    query = db.query(Job)
+    query = select(Job)
     
     # 根据状态过滤任务
     if status:
-        query = query.filter(Job.status == status)
-    
-    # 获取总数
-    total = query.count()
-    
-    # 分页
-    jobs = query.offset(offset).limit(limit).all()
-    
-    # 转换为字典列表
-    job_list = []
-    for job in jobs:
-        job_dict = {
-            "id": job.id,
-            "name": job.name,
-            "func": job.func,
-            "trigger": job.trigger,
-            "args": job.args,
-            "kwargs": job.kwargs,
-            "next_run_time": job.next_run_time.isoformat() if job.next_run_time else None,
-            "status": job.status
-        }
-        job_list.append(job_dict)
+        query = query.where(Job.status == status)
+    
+    # 分页，总数放在 X-Total-Count 响应头中
+    jobs, total = await paginate(db, query, offset, limit, total_mode)
+    set_total_header(response, total)
     
-    # 直接返回数组
-    return job_list
+    # 直接返回数组，由预先生成的序列化函数转换
+    return [job_to_dict(job) for job in jobs]
 
 # 获取任务详情
 @app.get("/api/v1/jobs/{job_id}")
-async def get_job(job_id: int, token: str = Depends(verify_token), db: Session = Depends(get_db)):
+async def get_job(job_id: int, token: str = Depends(verify_token), db: AsyncSession = Depends(get_db)):
     if not token:
         raise HTTPException(status_code=401, detail="未授权")
     
     # 查找任务
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = (await db.execute(select(Job).where(Job.id == job_id))).scalars().first()
     if not job:
         raise HTTPException(status_code=404, detail="任务不存在")
     
-    # 转换为字典
-    job_dict = {
-        "id": job.id,
-        "name": job.name,
-        "func": job.func,
-        "trigger": job.trigger,
-        "args": job.args,
-        "kwargs": job.kwargs,
-        "next_run_time": job.next_run_time.isoformat() if job.next_run_time else None,
-        "status": job.status
-    }
-    
-    return job_dict
+    return job_to_dict(job)
 
 # 创建任务
 @app.post("/api/v1/jobs")
-async def create_job(token: str = Depends(verify_token), job_data: Dict[str, Any] = Body(...), db: Session = Depends(get_db)):
+async def create_job(token: str = Depends(verify_token), job_data: Dict[str, Any] = Body(...), db: AsyncSession = Depends(get_db)):
     if not token:
         raise HTTPException(status_code=401, detail="未授权")
     
@@ -197,31 +256,19 @@ async def create_job(token: str = Depends(verify_token), job_data: Dict[str, Any
     
     # 添加到数据库
     db.add(new_job)
-    db.commit()
-    db.refresh(new_job)
-    
-    # 转换为字典
-    job_dict = {
-        "id": new_job.id,
-        "name": new_job.name,
-        "func": new_job.func,
-        "trigger": new_job.trigger,
-        "args": new_job.args,
-        "kwargs": new_job.kwargs,
-        "next_run_time": new_job.next_run_time.isoformat() if new_job.next_run_time else None,
-        "status": new_job.status
-    }
+    await db.commit()
+    await db.refresh(new_job)
     
-    return job_dict
+    return job_to_dict(new_job)
 
 # 更新任务
 @app.put("/api/v1/jobs/{job_id}")
-async def update_job(job_id: int, token: str = Depends(verify_token), job_data: Dict[str, Any] = Body(...), db: Session = Depends(get_db)):
+async def update_job(job_id: int, token: str = Depends(verify_token), job_data: Dict[str, Any] = Body(...), db: AsyncSession = Depends(get_db)):
     if not token:
         raise HTTPException(status_code=401, detail="未授权")
     
     # 查找任务
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = (await db.execute(select(Job).where(Job.id == job_id))).scalars().first()
     if not job:
         raise HTTPException(status_code=404, detail="任务不存在")
     
@@ -240,43 +287,31 @@ async def update_job(job_id: int, token: str = Depends(verify_token), job_data:
         job.status = job_data["status"]
     
     # 保存到数据库
-    db.commit()
-    db.refresh(job)
-    
-    # 转换为字典
-    job_dict = {
-        "id": job.id,
-        "name": job.name,
-        "func": job.func,
-        "trigger": job.trigger,
-        "args": job.args,
-        "kwargs": job.kwargs,
-        "next_run_time": job.next_run_time.isoformat() if job.next_run_time else None,
-        "status": job.status
-    }
+    await db.commit()
+    await db.refresh(job)
     
-    return job_dict
+    return job_to_dict(job)
 
 # 删除任务
 @app.delete("/api/v1/jobs/{job_id}")
-async def delete_job(job_id: int, token: str = Depends(verify_token), db: Session = Depends(get_db)):
+async def delete_job(job_id: int, token: str = Depends(verify_token), db: AsyncSession = Depends(get_db)):
     if not token:
         raise HTTPException(status_code=401, detail="未授权")
     
-    # 查找任务
-    job = db.query(Job).filter(Job.id == job_id).first()
+    # 查找任务，预先加载日志，删除时由 ORM 解除日志与任务的关联
+    job = (await db.execute(select(Job).options(selectinload(Job.logs)).where(Job.id == job_id))).scalars().first()
     if not job:
         raise HTTPException(status_code=404, detail="任务不存在")
     
     # 删除任务
-    db.delete(job)
-    db.commit()
+    await db.delete(job)
+    await db.commit()
     
     return {"status": "success", "message": "任务已删除"}
 
 # 更新任务状态
 @app.post("/api/v1/jobs/{job_id}/status")
-async def update_job_status(job_id: int, token: str = Depends(verify_token), data: Dict[str, Any] = Body(...), db: Session = Depends(get_db)):
+async def update_job_status(job_id: int, token: str = Depends(verify_token), data: Dict[str, Any] = Body(...), db: AsyncSession = Depends(get_db)):
     if not token:
         raise HTTPException(status_code=401, detail="未授权")
     
@@ -286,7 +321,7 @@ async def update_job_status(job_id: int, token: str = Depends(verify_token), dat
         raise HTTPException(status_code=400, detail="缺少状态参数")
     
     # 查找任务
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = (await db.execute(select(Job).where(Job.id == job_id))).scalars().first()
     if not job:
         raise HTTPException(status_code=404, detail="任务不存在")
     
@@ -299,18 +334,18 @@ async def update_job_status(job_id: int, token: str = Depends(verify_token), dat
         raise HTTPException(status_code=400, detail="无效的状态值")
     
     # 保存到数据库
-    db.commit()
+    await db.commit()
     
     return {"success": True, "message": "任务状态已更新"}
 
 # 执行任务
 @app.post("/api/v1/jobs/{job_id}/execute")
-async def execute_job(job_id: int, token: str = Depends(verify_token), db: Session = Depends(get_db)):
+async def execute_job(job_id: int, token: str = Depends(verify_token), db: AsyncSession = Depends(get_db)):
     if not token:
         raise HTTPException(status_code=401, detail="未授权")
     
     # 查找任务
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = (await db.execute(select(Job).where(Job.id == job_id))).scalars().first()
     if not job:
         raise HTTPException(status_code=404, detail="任务不存在")
     
@@ -325,7 +360,7 @@ async def execute_job(job_id: int, token: str = Depends(verify_token), db: Sessi
         duration=0.5
     )
     db.add(log)
-    db.commit()
+    await db.commit()
     
     return {"success": True, "message": "任务已执行"}
 
@@ -337,140 +372,91 @@ async def get_logs(
     offset: int = Query(0, description="偏移量"),
     job_id: Optional[int] = Query(None, description="任务ID"),
     status: Optional[str] = Query(None, description="日志状态"),
-    db: Session = Depends(get_db)
+    total_mode: str = Query("none", alias="total", description="总数: exact(精确)/estimated(估算)/none(不计算)"),
+    response: Response = None,
+    db: AsyncSession = Depends(get_db)
 ):
     if not token:
         raise HTTPException(status_code=401, detail="未授权")
     
     # 构建查询
-    query = db.query(Log)
+    query = select(Log)
     
     # 根据任务ID和状态过滤日志
     if job_id:
-        query = query.filter(Log.job_id == job_id)
+        query = query.where(Log.job_id == job_id)
     if status:
-        query = query.filter(Log.status == status)
-    
-    # 获取总数
-    total = query.count()
-    
-    # 分页
-    logs = query.offset(offset).limit(limit).all()
-    
-    # 转换为字典列表
-    log_list = []
-    for log in logs:
-        log_dict = {
-            "id": log.id,
-            "job_id": log.job_id,
-            "status": log.status,
-            "message": log.message,
-            "created_at": log.created_at.isoformat(),
-            "start_time": log.start_time.isoformat() if log.start_time else None,
-            "duration": log.duration
-        }
-        log_list.append(log_dict)
+        query = query.where(Log.status == status)
+    
+    # 分页，总数放在 X-Total-Count 响应头中
+    logs, total = await paginate(db, query, offset, limit, total_mode)
+    set_total_header(response, total)
     
-    # 直接返回数组
-    return log_list
+    # 直接返回数组，由预先生成的序列化函数转换
+    return [log_to_dict(log) for log in logs]
 
 # 获取日志详情
 @app.get("/api/v1/logs/{log_id}")
-async def get_log(log_id: int, token: str = Depends(verify_token), db: Session = Depends(get_db)):
+async def get_log(log_id: int, token: str = Depends(verify_token), db: AsyncSession = Depends(get_db)):
     if not token:
         raise HTTPException(status_code=401, detail="未授权")
     
     # 查找日志
-    log = db.query(Log).filter(Log.id == log_id).first()
+    log = (await db.execute(select(Log).where(Log.id == log_id))).scalars().first()
     if not log:
         raise HTTPException(status_code=404, detail="日志不存在")
     
-    # 转换为字典
-    log_dict = {
-        "id": log.id,
-        "job_id": log.job_id,
-        "status": log.status,
-        "message": log.message,
-        "created_at": log.created_at.isoformat(),
-        "start_time": log.start_time.isoformat() if log.start_time else None,
-        "duration": log.duration
-    }
-    
-    return log_dict
+    return log_to_dict(log)
 
 # 删除日志
 @app.delete("/api/v1/logs/{log_id}")
-async def delete_log(log_id: int, token: str = Depends(verify_token), db: Session = Depends(get_db)):
+async def delete_log(log_id: int, token: str = Depends(verify_token), db: AsyncSession = Depends(get_db)):
     if not token:
         raise HTTPException(status_code=401, detail="未授权")
     
     # 查找日志
-    log = db.query(Log).filter(Log.id == log_id).first()
+    log = (await db.execute(select(Log).where(Log.id == log_id))).scalars().first()
     if not log:
         raise HTTPException(status_code=404, detail="日志不存在")
     
     # 删除日志
-    db.delete(log)
-    db.commit()
+    await db.delete(log)
+    await db.commit()
     
     return {"status": "success", "message": "日志已删除"}
 
 # 删除任务的所有日志
 @app.delete("/api/v1/logs/job/{job_id}")
-async def delete_job_logs(job_id: int, token: str = Depends(verify_token), db: Session = Depends(get_db)):
+async def delete_job_logs(job_id: int, token: str = Depends(verify_token), db: AsyncSession = Depends(get_db)):
     if not token:
         raise HTTPException(status_code=401, detail="未授权")
     
     # 删除任务的所有日志
-    db.query(Log).filter(Log.job_id == job_id).delete()
-    db.commit()
+    await db.execute(sql_delete(Log).where(Log.job_id == job_id))
+    await db.commit()
     
     return {"status": "success", "message": "任务日志已删除"}
 
 # 获取系统设置
 @app.get("/api/v1/settings")
-async def get_settings(token: str = Depends(verify_token), db: Session = Depends(get_db)):
+async def get_settings(token: str = Depends(verify_token), db: AsyncSession = Depends(get_db)):
     if not token:
         raise HTTPException(status_code=401, detail="未授权")
     
-    # 获取所有设置
-    settings = db.query(Setting).all()
-    
-    # 转换为字典
-    settings_dict = {}
-    for setting in settings:
-        settings_dict[setting.key] = setting.value
-    
-    return {"settings": settings_dict}
+    # 从缓存获取所有设置，其他进程更新后按版本号重新加载
+    return {"settings": await settings_store.get_all(db)}
 
 # 更新系统设置
 @app.put("/api/v1/settings")
-async def update_settings(token: str = Depends(verify_token), settings_data: Dict[str, Any] = Body(...), db: Session = Depends(get_db)):
+async def update_settings(token: str = Depends(verify_token), settings_data: Dict[str, Any] = Body(...), db: AsyncSession = Depends(get_db)):
     if not token:
         raise HTTPException(status_code=401, detail="未授权")
     
-    # 更新设置
-    for key, value in settings_data.get("settings", {}).items():
-        # 查找设置
-        setting = db.query(Setting).filter(Setting.key == key).first()
-        if setting:
-            # 更新设置
-            setting.value = value
-        else:
-            # 创建新设置
-            new_setting = Setting(key=key, value=value)
-            db.add(new_setting)
-    
-    # 保存到数据库
-    db.commit()
-    
-    # 获取更新后的设置
-    settings = db.query(Setting).all()
-    
-    # 转换为字典
-    settings_dict = {}
-    for setting in settings:
-        settings_dict[setting.key] = setting.value
+    # 在一个事务中批量写入，并更新缓存
+    try:
+        settings_dict = await settings_store.update(db, settings_data.get("settings", {}))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {"settings": settings_dict}
 
@@ -481,72 +467,51 @@ async def get_users(
     limit: int = Query(10, description="每页数量"),
     skip: int = Query(0, description="偏移量"),
     search: Optional[str] = Query(None, description="搜索关键词"),
-    db: Session = Depends(get_db)
+    total_mode: str = Query("none", alias="total", description="总数: exact(精确)/estimated(估算)/none(不计算)"),
+    response: Response = None,
+    db: AsyncSession = Depends(get_db)
 ):
     if not token:
         raise HTTPException(status_code=401, detail="未授权")
     
     # 构建查询
-    query = db.query(User)
+    query = select(User)
     
     # 根据搜索关键词过滤用户
     if search:
-        query = query.filter(
+        query = query.where(
             (User.username.ilike(f"%{search}%")) | 
             (User.email.ilike(f"%{search}%"))
         )
     
-    # 获取总数
-    total = query.count()
-    
-    # 分页
-    users = query.offset(skip).limit(limit).all()
-    
-    # 转换为字典列表
-    user_list = []
-    for user in users:
-        user_dict = {
-            "id": user.id,
-            "username": user.username,
-            "email": user.email,
-            "is_active": user.is_active,
-            "is_superuser": user.is_superuser
-        }
-        user_list.append(user_dict)
+    # 分页，总数放在 X-Total-Count 响应头中
+    users, total = await paginate(db, query, skip, limit, total_mode)
+    set_total_header(response, total)
     
-    # 直接返回数组
-    return user_list
+    # 直接返回数组，由预先生成的序列化函数转换
+    return [user_to_dict(user) for user in users]
 
 # 获取用户详情
 @app.get("/api/v1/users/{user_id}")
-async def get_user(user_id: int, token: str = Depends(verify_token), db: Session = Depends(get_db)):
+async def get_user(user_id: int, token: str = Depends(verify_token), db: AsyncSession = Depends(get_db)):
     if not token:
         raise HTTPException(status_code=401, detail="未授权")
     
     # 查找用户
-    user = db.query(User).filter(User.id == user_id).first()
+    user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="用户不存在")
     
-    # 转换为字典
-    user_dict = {
-        "id": user.id,
-        "username": user.username,
-        "email": user.email,
-        "is_active": user.is_active,
-        "is_superuser": user.is_superuser
-    }
-    
-    return user_dict
+    return user_to_dict(user)
 
 # 创建用户
 @app.post("/api/v1/users")
-async def create_user(token: str = Depends(verify_token), user_data: Dict[str, Any] = Body(...), db: Session = Depends(get_db)):
+async def create_user(token: str = Depends(verify_token), user_data: Dict[str, Any] = Body(...), db: AsyncSession = Depends(get_db)):
     if not token:
         raise HTTPException(status_code=401, detail="未授权")
     
     # 检查用户是否已存在
-    existing_user = db.query(User).filter(User.username == user_data.get("username")).first()
+    existing_user = (await db.execute(select(User).where(User.username == user_data.get("username")))).scalars().first()
     if existing_user:
         raise HTTPException(status_code=400, detail="用户名已存在")
     
@@ -561,35 +526,26 @@ async def create_user(token: str = Depends(verify_token), user_data: Dict[str, A
     
     # 添加到数据库
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    
-    # 转换为字典
-    user_dict = {
-        "id": new_user.id,
-        "username": new_user.username,
-        "email": new_user.email,
-        "is_active": new_user.is_active,
-        "is_superuser": new_user.is_superuser
-    }
+    await db.commit()
+    await db.refresh(new_user)
     
-    return user_dict
+    return user_to_dict(new_user)
 
 # 更新用户
 @app.put("/api/v1/users/{user_id}")
-async def update_user(user_id: int, token: str = Depends(verify_token), user_data: Dict[str, Any] = Body(...), db: Session = Depends(get_db)):
+async def update_user(user_id: int, token: str = Depends(verify_token), user_data: Dict[str, Any] = Body(...), db: AsyncSession = Depends(get_db)):
     if not token:
         raise HTTPException(status_code=401, detail="未授权")
     
     # 查找用户
-    user = db.query(User).filter(User.id == user_id).first()
+    user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="用户不存在")
     
     # 更新用户信息
     if "username" in user_data:
         # 检查用户名是否已存在
-        existing_user = db.query(User).filter(User.username == user_data["username"]).first()
+        existing_user = (await db.execute(select(User).where(User.username == user_data["username"]))).scalars().first()
         if existing_user and existing_user.id != user_id:
             raise HTTPException(status_code=400, detail="用户名已存在")
         user.username = user_data["username"]
@@ -607,34 +563,25 @@ async def update_user(user_id: int, token: str = Depends(verify_token), user_dat
         user.is_superuser = user_data["is_superuser"]
     
     # 保存到数据库
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
-    # 转换为字典
-    user_dict = {
-        "id": user.id,
-        "username": user.username,
-        "email": user.email,
-        "is_active": user.is_active,
-        "is_superuser": user.is_superuser
-    }
-    
-    return user_dict
+    return user_to_dict(user)
 
 # 删除用户
 @app.delete("/api/v1/users/{user_id}")
-async def delete_user(user_id: int, token: str = Depends(verify_token), db: Session = Depends(get_db)):
+async def delete_user(user_id: int, token: str = Depends(verify_token), db: AsyncSession = Depends(get_db)):
     if not token:
         raise HTTPException(status_code=401, detail="未授权")
     
-    # 查找用户
-    user = db.query(User).filter(User.id == user_id).first()
+    # 查找用户，预先加载任务，删除时由 ORM 解除任务与用户的关联
+    user = (await db.execute(select(User).options(selectinload(User.jobs)).where(User.id == user_id))).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="用户不存在")
     
     # 删除用户
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
     
     return {"status": "success", "message": "用户已删除"}
 
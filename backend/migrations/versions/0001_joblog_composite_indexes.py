@@ -0,0 +1,31 @@
+"""joblog composite indexes
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 日志列表按 (start_time, id) 倒序，并按 job_id、status、时间范围筛选
+    op.create_index('ix_joblog_job_id_start_time', 'joblog', ['job_id', 'start_time', 'id'])
+    op.create_index('ix_joblog_status_start_time', 'joblog', ['status', 'start_time', 'id'])
+    op.create_index('ix_joblog_start_time', 'joblog', ['start_time', 'id'])
+    # job_id 单列索引已被 ix_joblog_job_id_start_time 覆盖
+    op.drop_index('ix_joblog_job_id', table_name='joblog')
+
+
+def downgrade() -> None:
+    op.create_index('ix_joblog_job_id', 'joblog', ['job_id'])
+    op.drop_index('ix_joblog_start_time', table_name='joblog')
+    op.drop_index('ix_joblog_status_start_time', table_name='joblog')
+    op.drop_index('ix_joblog_job_id_start_time', table_name='joblog')
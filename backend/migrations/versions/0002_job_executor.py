@@ -0,0 +1,28 @@
+"""job executor
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 任务使用的执行器类型: thread, process, asyncio
+    op.add_column(
+        'job',
+        sa.Column('executor', sa.String(length=20), nullable=False, server_default='thread', comment='执行器类型'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('job', 'executor')
@@ -0,0 +1,47 @@
+"""jobrun table
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'jobrun',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=False, comment='任务ID'),
+        sa.Column('run_id', sa.String(length=32), nullable=True, comment='手动执行的运行ID'),
+        sa.Column('status', sa.String(length=20), nullable=False, comment='运行状态'),
+        sa.Column('scheduled_time', sa.DateTime(), nullable=True, comment='计划运行时间'),
+        sa.Column('submitted_time', sa.DateTime(), nullable=True, comment='提交到执行器的时间'),
+        sa.Column('start_time', sa.DateTime(), nullable=True, comment='开始时间'),
+        sa.Column('end_time', sa.DateTime(), nullable=True, comment='结束时间'),
+        sa.Column('queue_delay', sa.Float(), nullable=True, comment='排队延迟(秒)'),
+        sa.Column('duration', sa.Float(), nullable=True, comment='执行时长(秒)'),
+        sa.Column('error_message', sa.Text(), nullable=True, comment='错误信息'),
+        sa.ForeignKeyConstraint(['job_id'], ['job.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_jobrun_id', 'jobrun', ['id'])
+    op.create_index('ix_jobrun_run_id', 'jobrun', ['run_id'])
+    op.create_index('ix_jobrun_job_id_scheduled_time', 'jobrun', ['job_id', 'scheduled_time', 'id'])
+    op.create_index('ix_jobrun_status_scheduled_time', 'jobrun', ['status', 'scheduled_time', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobrun_status_scheduled_time', table_name='jobrun')
+    op.drop_index('ix_jobrun_job_id_scheduled_time', table_name='jobrun')
+    op.drop_index('ix_jobrun_run_id', table_name='jobrun')
+    op.drop_index('ix_jobrun_id', table_name='jobrun')
+    op.drop_table('jobrun')
@@ -0,0 +1,25 @@
+"""job timeout
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 任务执行超时(秒)，为空时不限制
+    op.add_column('job', sa.Column('timeout', sa.Integer(), nullable=True, comment='执行超时(秒)'))
+
+
+def downgrade() -> None:
+    op.drop_column('job', 'timeout')
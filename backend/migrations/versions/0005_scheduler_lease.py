@@ -0,0 +1,37 @@
+"""scheduler lease table
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'schedulerlease',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=150), nullable=False, comment='租约名称'),
+        sa.Column('holder', sa.String(length=100), nullable=False, comment='持有节点ID'),
+        sa.Column('acquired_at', sa.DateTime(), nullable=False, comment='当前节点取得租约的时间'),
+        sa.Column('expires_at', sa.DateTime(), nullable=False, comment='租约到期时间'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+    )
+    op.create_index('ix_schedulerlease_id', 'schedulerlease', ['id'])
+    op.create_index('ix_schedulerlease_expires_at', 'schedulerlease', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_schedulerlease_expires_at', table_name='schedulerlease')
+    op.drop_index('ix_schedulerlease_id', table_name='schedulerlease')
+    op.drop_table('schedulerlease')
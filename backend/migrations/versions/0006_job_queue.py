@@ -0,0 +1,51 @@
+"""job queue table
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'jobqueue',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=False, comment='任务ID'),
+        sa.Column('run_id', sa.String(length=32), nullable=True, comment='手动执行的运行ID'),
+        sa.Column('func', sa.String(length=255), nullable=False, comment='任务函数'),
+        sa.Column('args', sa.JSON(), nullable=True, comment='任务参数'),
+        sa.Column('kwargs', sa.JSON(), nullable=True, comment='任务关键字参数'),
+        sa.Column('timeout', sa.Integer(), nullable=True, comment='执行超时(秒)'),
+        sa.Column('status', sa.String(length=20), nullable=False, comment='队列状态: queued, running'),
+        sa.Column('scheduled_time', sa.DateTime(), nullable=True, comment='计划运行时间'),
+        sa.Column('enqueued_at', sa.DateTime(), nullable=False, comment='入队时间'),
+        sa.Column('attempts', sa.Integer(), nullable=False, comment='认领次数'),
+        sa.Column('claimed_by', sa.String(length=100), nullable=True, comment='认领的工作进程ID'),
+        sa.Column('claim_token', sa.String(length=32), nullable=True, comment='认领批次标识'),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True, comment='认领时间'),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True, comment='认领租约到期时间'),
+        sa.ForeignKeyConstraint(['job_id'], ['job.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_jobqueue_id', 'jobqueue', ['id'])
+    op.create_index('ix_jobqueue_run_id', 'jobqueue', ['run_id'])
+    op.create_index('ix_jobqueue_status_id', 'jobqueue', ['status', 'id'])
+    op.create_index('ix_jobqueue_status_lease_expires_at', 'jobqueue', ['status', 'lease_expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobqueue_status_lease_expires_at', table_name='jobqueue')
+    op.drop_index('ix_jobqueue_status_id', table_name='jobqueue')
+    op.drop_index('ix_jobqueue_run_id', table_name='jobqueue')
+    op.drop_index('ix_jobqueue_id', table_name='jobqueue')
+    op.drop_table('jobqueue')
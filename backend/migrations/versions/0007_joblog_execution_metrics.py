@@ -0,0 +1,29 @@
+"""joblog execution metrics
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 执行包装器记录的 CPU 时间、内存峰值增量和结果大小
+    op.add_column('joblog', sa.Column('cpu_time', sa.Float(), nullable=True, comment='CPU时间(秒)'))
+    op.add_column('joblog', sa.Column('peak_rss_delta', sa.Integer(), nullable=True, comment='内存峰值增量(KB)'))
+    op.add_column('joblog', sa.Column('result_size', sa.Integer(), nullable=True, comment='结果大小(字节)'))
+
+
+def downgrade() -> None:
+    op.drop_column('joblog', 'result_size')
+    op.drop_column('joblog', 'peak_rss_delta')
+    op.drop_column('joblog', 'cpu_time')
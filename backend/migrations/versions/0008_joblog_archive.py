@@ -0,0 +1,46 @@
+"""joblog archive table
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 16:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 日志保留策略开启归档时，过期日志移入该表
+    op.create_table(
+        'joblogarchive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=False, comment='任务ID'),
+        sa.Column('status', sa.String(length=20), nullable=True, comment='执行状态'),
+        sa.Column('start_time', sa.DateTime(), nullable=True, comment='开始时间'),
+        sa.Column('end_time', sa.DateTime(), nullable=True, comment='结束时间'),
+        sa.Column('duration', sa.Float(), nullable=True, comment='执行时长(秒)'),
+        sa.Column('cpu_time', sa.Float(), nullable=True, comment='CPU时间(秒)'),
+        sa.Column('peak_rss_delta', sa.Integer(), nullable=True, comment='内存峰值增量(KB)'),
+        sa.Column('result_size', sa.Integer(), nullable=True, comment='结果大小(字节)'),
+        sa.Column('error_message', sa.Text(), nullable=True, comment='错误信息'),
+        sa.Column('output', sa.Text(), nullable=True, comment='输出信息'),
+        sa.Column('archived_at', sa.DateTime(), nullable=True, comment='归档时间'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_joblogarchive_id', 'joblogarchive', ['id'])
+    op.create_index('ix_joblogarchive_job_id', 'joblogarchive', ['job_id'])
+    op.create_index('ix_joblogarchive_start_time', 'joblogarchive', ['start_time'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_joblogarchive_start_time', table_name='joblogarchive')
+    op.drop_index('ix_joblogarchive_job_id', table_name='joblogarchive')
+    op.drop_index('ix_joblogarchive_id', table_name='joblogarchive')
+    op.drop_table('joblogarchive')
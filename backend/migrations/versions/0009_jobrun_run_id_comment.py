@@ -0,0 +1,37 @@
+"""jobrun run_id for every run
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 运行记录在提交时插入、按运行ID更新，每次运行都分配运行ID
+    op.alter_column(
+        'jobrun', 'run_id',
+        existing_type=sa.String(length=32),
+        existing_nullable=True,
+        comment='运行ID，手动执行时与 /jobs/runs/{run_id} 相同',
+        existing_comment='手动执行的运行ID',
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'jobrun', 'run_id',
+        existing_type=sa.String(length=32),
+        existing_nullable=True,
+        comment='手动执行的运行ID',
+        existing_comment='运行ID，手动执行时与 /jobs/runs/{run_id} 相同',
+    )
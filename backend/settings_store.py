@@ -0,0 +1,153 @@
+from typing import Any, Dict, Optional
+import asyncio
+import os
+import time
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import SETTINGS_VERSION_KEY, Setting
+
+# 版本号行的键，每次更新设置时加一，其他进程据此判断缓存是否过期
+VERSION_KEY = SETTINGS_VERSION_KEY
+
+# 检查版本号的间隔(秒)，间隔内直接使用缓存
+SETTINGS_CACHE_TTL = float(os.environ.get("SETTINGS_CACHE_TTL", "1.0"))
+
+# 设置键与调度器任务默认参数的对应关系及默认值
+JOB_DEFAULT_KEYS = {
+    "job_misfire_grace_time": ("misfire_grace_time", 60),
+    "job_coalesce": ("coalesce", True),
+    "job_max_instances": ("max_instances", 3),
+}
+
+
+class SettingsStore:
+    """
+    系统设置缓存
+
+    所有设置保存在进程内存中，读取时每隔 check_interval 秒查询一次版本号行，
+    版本号变化（其他进程更新了设置）时才重新加载整张表。
+    更新在一个事务中批量完成：锁定版本号行并加一，一次查询已有的键，
+    已有的键批量更新，新键批量插入。版本号行由 init_db 创建，
+    不存在时由第一次更新插入，并发插入冲突时重试
+    """
+
+    def __init__(self, check_interval: float = SETTINGS_CACHE_TTL) -> None:
+        self.check_interval = check_interval
+        self._values: Dict[str, Any] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        # 在事件循环中首次使用时创建
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._version
+
+    async def get_all(self, db: AsyncSession) -> Dict[str, Any]:
+        """
+        获取所有设置
+        """
+        if self._version is None or time.monotonic() - self._checked_at >= self.check_interval:
+            async with self._get_lock():
+                # 等待锁期间其他请求可能已完成检查
+                if self._version is None or time.monotonic() - self._checked_at >= self.check_interval:
+                    await self._refresh(db)
+        return dict(self._values)
+
+    async def get(self, db: AsyncSession, key: str, default: Any = None) -> Any:
+        return (await self.get_all(db)).get(key, default)
+
+    async def update(self, db: AsyncSession, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        批量写入设置，返回更新后的所有设置
+        """
+        if VERSION_KEY in values:
+            raise ValueError(f"{VERSION_KEY} 为保留的设置键")
+        if not values:
+            return await self.get_all(db)
+
+        async with self._get_lock():
+            try:
+                version = await self._write(db, values)
+            except IntegrityError:
+                # 其他进程同时插入了版本号行或同一个新键，重试时已能锁定版本号行
+                await db.rollback()
+                version = await self._write(db, values)
+
+            if self._version is not None and version == self._version + 1:
+                # 缓存是上一个版本，直接合并本次更新
+                self._values.update(values)
+                self._version = version
+                self._checked_at = time.monotonic()
+            else:
+                # 期间其他进程也更新过设置，重新加载
+                await self._refresh(db)
+        return dict(self._values)
+
+    async def _write(self, db: AsyncSession, values: Dict[str, Any]) -> int:
+        """
+        在一个事务中写入设置并增加版本号，返回新版本号
+        """
+        try:
+            # 锁定版本号行，同时更新设置的请求依次执行
+            version_row = (
+                await db.execute(select(Setting).where(Setting.key == VERSION_KEY).with_for_update())
+            ).scalars().first()
+            version = (version_row.value if version_row is not None else 0) + 1
+
+            existing = dict(
+                (await db.execute(select(Setting.key, Setting.id).where(Setting.key.in_(list(values))))).all()
+            )
+            updates = [{"id": existing[key], "value": value} for key, value in values.items() if key in existing]
+            inserts = [{"key": key, "value": value} for key, value in values.items() if key not in existing]
+            if updates:
+                await db.execute(update(Setting), updates)
+            if inserts:
+                await db.execute(insert(Setting), inserts)
+
+            if version_row is not None:
+                await db.execute(update(Setting).where(Setting.key == VERSION_KEY).values(value=version))
+            else:
+                await db.execute(insert(Setting).values(key=VERSION_KEY, value=version))
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        return version
+
+    def job_defaults(self) -> Dict[str, Any]:
+        """
+        由缓存的设置得到调度器的任务默认参数，不访问数据库
+
+        需要先通过 get_all() 加载过一次设置，未加载时返回默认值
+        """
+        return {
+            name: self._values.get(key, default)
+            for key, (name, default) in JOB_DEFAULT_KEYS.items()
+        }
+
+    def invalidate(self) -> None:
+        """
+        下次读取时重新检查版本号
+        """
+        self._checked_at = 0.0
+
+    async def _refresh(self, db: AsyncSession) -> None:
+        version = await db.scalar(select(Setting.value).where(Setting.key == VERSION_KEY))
+        version = version or 0
+        if version != self._version:
+            rows = (await db.execute(select(Setting.key, Setting.value).where(Setting.key != VERSION_KEY))).all()
+            self._values = {key: value for key, value in rows}
+            self._version = version
+        self._checked_at = time.monotonic()
+
+
+settings_store = SettingsStore()
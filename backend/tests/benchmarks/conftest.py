@@ -0,0 +1,26 @@
+"""
+基准测试的辅助函数
+
+基准测试默认不运行，使用 pytest -m benchmark -s 运行并输出结果
+"""
+import time
+from typing import Callable, Dict
+
+
+def report(title: str, results: Dict[str, str]) -> None:
+    """
+    输出一组基准测试结果
+    """
+    width = max(len(name) for name in results)
+    print(f"\n{title}")
+    for name, value in results.items():
+        print(f"  {name:<{width}}  {value}")
+
+
+def timed(func: Callable[[], object]) -> float:
+    """
+    执行一次，返回耗时(秒)
+    """
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
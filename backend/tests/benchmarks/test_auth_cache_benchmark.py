@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.api_v1.endpoints import users
+from app.core import deps
+from app.core.auth_cache import PrincipalCache
+from app.models.user import User
+from app.utils.security import create_access_token
+from tests.benchmarks.conftest import report
+from tests.conftest import run
+
+pytestmark = pytest.mark.benchmark
+
+REQUESTS = 2000
+CONCURRENCY = 20
+
+
+async def _create_user(session_factory):
+    async with session_factory() as session:
+        user = User(username="alice", email="alice@example.com", hashed_password="x", is_active=True)
+        session.add(user)
+        await session.commit()
+        return user.id
+
+
+async def _throughput(app, token):
+    headers = {"Authorization": f"Bearer {token}"}
+    queue = asyncio.Queue()
+    for _ in range(REQUESTS):
+        queue.put_nowait(None)
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                response = await client.get("/users/me", headers=headers)
+                assert response.status_code == 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+        return REQUESTS / (time.perf_counter() - start)
+
+
+def test_authenticated_request_throughput(db, monkeypatch):
+    token = create_access_token(run(_create_user(db)))
+    app = FastAPI()
+    app.include_router(users.router, prefix="/users")
+
+    results = {}
+    for name, cache in (("不缓存", PrincipalCache(ttl=0)), ("缓存", PrincipalCache(maxsize=10000, ttl=60))):
+        monkeypatch.setattr(deps, "principal_cache", cache)
+        results[name] = run(_throughput(app, token))
+
+    report(f"GET /users/me，{CONCURRENCY} 个并发客户端", {
+        name: f"{value:8.0f} 请求/秒" for name, value in results.items()
+    })
+    assert results["缓存"] > results["不缓存"]
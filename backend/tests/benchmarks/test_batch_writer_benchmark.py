@@ -0,0 +1,47 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy.future import select
+
+from app.models.job import Job
+from app.models.job_log import JobLog
+from app.services.batch_writer import BatchWriter
+from tests.benchmarks.conftest import report, timed
+from tests.conftest import create_job, run
+
+pytestmark = pytest.mark.benchmark
+
+ROWS = 2000
+
+
+def _log(job_id):
+    now = datetime.now()
+    return {"job_id": job_id, "status": "success", "start_time": now, "end_time": now, "duration": 0.01}
+
+
+async def _commit_per_run(session_factory, job_id):
+    # 原来的写法: 每次执行查询任务，再单独插入并提交一条日志
+    for _ in range(ROWS):
+        async with session_factory() as session:
+            job = (await session.execute(select(Job).where(Job.id == job_id))).scalars().first()
+            session.add(JobLog(**_log(job.id)))
+            await session.commit()
+
+
+async def _batched(job_id):
+    writer = BatchWriter(JobLog, batch_size=500, flush_interval=1.0)
+    for _ in range(ROWS):
+        await writer.put(_log(job_id))
+    await writer.stop()
+
+
+def test_log_write_throughput(db):
+    job_id = run(create_job(db))
+    per_run = timed(lambda: run(_commit_per_run(db, job_id)))
+    batched = timed(lambda: run(_batched(job_id)))
+
+    report(f"写入 {ROWS} 条执行日志", {
+        "每次提交": f"{ROWS / per_run:10.0f} 行/秒",
+        "批量写入": f"{ROWS / batched:10.0f} 行/秒",
+    })
+    assert batched < per_run
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+import pytest
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from pytz import utc
+from sqlalchemy import func, select
+
+from app.models.job_log import JobLog
+from app.services import job_runner
+from app.services.job_runner import job_log_writer, run_job, run_job_async
+from app.services.scheduler import JobAsyncIOExecutor, JobThreadPoolExecutor
+from tests.benchmarks.conftest import report
+from tests.conftest import create_job, run
+
+pytestmark = pytest.mark.benchmark
+
+JOBS = 1000
+# 模拟 I/O 等待的时长(秒)
+IO_WAIT = 0.05
+THREAD_POOL_SIZE = 20
+
+
+def blocking_io():
+    time.sleep(IO_WAIT)
+
+
+async def async_io():
+    await asyncio.sleep(IO_WAIT)
+
+
+async def _run_all(job_id, executor, wrapper, func_name):
+    # 与调度器相同：到期任务经执行器运行包装器，日志进入批量写入器
+    scheduler = AsyncIOScheduler(timezone=utc, executors={"default": executor})
+    completed = []
+    lock = threading.Lock()
+
+    def on_event(event):
+        with lock:
+            completed.append(event.code)
+
+    scheduler.add_listener(on_event, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+    now = datetime.now(utc)
+    for i in range(JOBS):
+        scheduler.add_job(
+            wrapper, "date", run_date=now, id=str(i), misfire_grace_time=None,
+            args=[job_id, f"{__name__}.{func_name}"],
+        )
+
+    job_log_writer.start()
+    start = time.perf_counter()
+    scheduler.start()
+    while len(completed) < JOBS:
+        await asyncio.sleep(0.005)
+    elapsed = time.perf_counter() - start
+    scheduler.shutdown(wait=False)
+    await job_log_writer.stop()
+    assert completed == [EVENT_JOB_EXECUTED] * JOBS
+    return elapsed
+
+
+def test_coroutine_vs_thread_pool(db, monkeypatch):
+    job_id = run(create_job(db))
+    # 信号量绑定在创建它的事件循环上
+    monkeypatch.setattr(job_runner, "_async_semaphore", None)
+
+    thread_time = run(_run_all(job_id, JobThreadPoolExecutor(THREAD_POOL_SIZE), run_job, "blocking_io"))
+    coroutine_time = run(_run_all(job_id, JobAsyncIOExecutor(), run_job_async, "async_io"))
+
+    report(f"{JOBS} 个 I/O 任务（每个等待 {IO_WAIT * 1000:.0f} ms）", {
+        f"线程池({THREAD_POOL_SIZE})": f"{thread_time:8.2f} 秒  {JOBS / thread_time:8.0f} 个/秒",
+        "协程": f"{coroutine_time:8.2f} 秒  {JOBS / coroutine_time:8.0f} 个/秒",
+    })
+    assert coroutine_time < thread_time
+    assert run(_log_count(db)) == 2 * JOBS
+
+
+async def _log_count(session_factory):
+    async with session_factory() as session:
+        return await session.scalar(select(func.count()).select_from(JobLog))
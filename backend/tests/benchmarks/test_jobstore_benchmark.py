@@ -0,0 +1,87 @@
+import pickle
+import statistics
+import time
+from datetime import timedelta
+
+import pytest
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.util import datetime_to_utc_timestamp
+from pytz import utc
+
+from app.services.jobstores import WriteBehindJobStore
+from tests.benchmarks.conftest import report, timed
+from tests.test_jobstores import NOW, make_job
+
+pytestmark = pytest.mark.benchmark
+
+JOBS = 50000
+OPERATIONS = 2000
+DUE = 100
+WAKEUPS = 20
+
+
+def _preload(store, scheduler):
+    jobs = [make_job(scheduler, f"job-{i}", NOW + timedelta(seconds=i)) for i in range(JOBS)]
+    if isinstance(store, SQLAlchemyJobStore):
+        # 逐条 add_job 每次提交一个事务，直接批量插入相同格式的行
+        with store.engine.begin() as connection:
+            connection.execute(store.jobs_t.insert(), [{
+                "id": job.id,
+                "next_run_time": datetime_to_utc_timestamp(job.next_run_time),
+                "job_state": pickle.dumps(job.__getstate__(), store.pickle_protocol),
+            } for job in jobs])
+    else:
+        for job in jobs:
+            store.add_job(job)
+        if isinstance(store, WriteBehindJobStore):
+            store.flush()
+
+
+def _wakeup(store):
+    # 调度器每次唤醒时的存储访问
+    start = time.perf_counter()
+    due = store.get_due_jobs(NOW + timedelta(seconds=DUE - 1))
+    store.get_next_run_time()
+    elapsed = time.perf_counter() - start
+    assert len(due) == DUE
+    return elapsed
+
+
+def _measure(store, scheduler):
+    _preload(store, scheduler)
+    wakeup = statistics.median(_wakeup(store) for _ in range(WAKEUPS))
+
+    added = [make_job(scheduler, f"new-{i}", NOW + timedelta(seconds=JOBS + i)) for i in range(OPERATIONS)]
+    add = timed(lambda: [store.add_job(job) for job in added])
+    modified = [make_job(scheduler, f"job-{i}", NOW + timedelta(seconds=JOBS + i)) for i in range(DUE, DUE + OPERATIONS)]
+    modify = timed(lambda: [store.update_job(job) for job in modified])
+    # 回写存储的持久化在后台线程中完成，单独计时
+    flush = timed(store.flush) if isinstance(store, WriteBehindJobStore) else None
+    return wakeup, add, modify, flush
+
+
+@pytest.mark.parametrize("name", ["sqlalchemy", "memory", "writebehind"])
+def test_jobstore_wakeup_and_throughput(tmp_path, name):
+    scheduler = BackgroundScheduler(timezone=utc)
+    url = f"sqlite:///{tmp_path}/jobs.db"
+    store = {
+        "sqlalchemy": lambda: SQLAlchemyJobStore(url=url),
+        "memory": MemoryJobStore,
+        "writebehind": lambda: WriteBehindJobStore(url=url, flush_interval=3600),
+    }[name]()
+    store.start(scheduler, "default")
+    try:
+        wakeup, add, modify, flush = _measure(store, scheduler)
+    finally:
+        store.shutdown()
+
+    results = {
+        "唤醒延迟": f"{wakeup * 1000:10.2f} ms",
+        "添加": f"{OPERATIONS / add:10.0f} 个/秒",
+        "修改": f"{OPERATIONS / modify:10.0f} 个/秒",
+    }
+    if flush is not None:
+        results["回写"] = f"{flush * 1000:10.2f} ms ({2 * OPERATIONS} 个变更)"
+    report(f"{name}: {JOBS} 个任务，{DUE} 个到期", results)
@@ -0,0 +1,105 @@
+import asyncio
+import time
+from contextlib import contextmanager
+
+import aiosqlite
+import httpx
+import pytest
+
+import database
+import main
+from tests.benchmarks.conftest import report
+
+pytestmark = pytest.mark.benchmark
+
+AUTH = {"Authorization": "Bearer mock_token"}
+JOBS = 200
+REQUESTS = 400
+CLIENTS = (1, 4, 16)
+# 模拟网络数据库每次调用的往返时间(秒)
+DB_LATENCY = 0.001
+
+
+@contextmanager
+def _db_latency(blocking: bool):
+    """
+    给每次数据库驱动调用加上往返时间
+
+    blocking=False 时在 aiosqlite 的驱动线程中等待，与 asyncpg/aiomysql 等待网络相同；
+    blocking=True 时在事件循环线程中等待，相当于在协程中使用同步会话
+    """
+    original = aiosqlite.core.Connection._execute
+
+    async def execute(self, fn, *args, **kwargs):
+        if blocking:
+            time.sleep(DB_LATENCY)
+            return await original(self, fn, *args, **kwargs)
+
+        def delayed():
+            time.sleep(DB_LATENCY)
+            return fn(*args, **kwargs)
+
+        return await original(self, delayed)
+
+    aiosqlite.core.Connection._execute = execute
+    try:
+        yield
+    finally:
+        aiosqlite.core.Connection._execute = original
+
+
+async def _throughput(client, clients, job_ids):
+    """
+    clients 个客户端各自顺序发送请求，共 REQUESTS 个，返回每秒请求数
+    """
+    queue = asyncio.Queue()
+    for i in range(REQUESTS):
+        queue.put_nowait(i)
+
+    async def worker():
+        while not queue.empty():
+            i = queue.get_nowait()
+            if i % 2:
+                response = await client.get(f"/api/v1/jobs/{job_ids[i % len(job_ids)]}", headers=AUTH)
+            else:
+                response = await client.get("/api/v1/jobs", params={"limit": 20}, headers=AUTH)
+            assert response.status_code == 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    return REQUESTS / (time.perf_counter() - start)
+
+
+async def _run_load():
+    # 与 TestClient 相同，先执行启动事件建表并写入初始数据
+    await main.startup_event()
+    results = {}
+    try:
+        async with httpx.AsyncClient(app=main.app, base_url="http://test") as client:
+            job_ids = []
+            for i in range(JOBS):
+                response = await client.post("/api/v1/jobs", json={"name": f"load-{i}"}, headers=AUTH)
+                assert response.status_code == 200
+                job_ids.append(response.json()["id"])
+
+            # 预热连接池
+            await _throughput(client, max(CLIENTS), job_ids)
+            for name, blocking in (("异步会话", False), ("阻塞事件循环", True)):
+                with _db_latency(blocking):
+                    for clients in CLIENTS:
+                        results[(name, clients)] = await _throughput(client, clients, job_ids)
+    finally:
+        await database.engine.dispose()
+    return results
+
+
+def test_throughput_scales_with_clients():
+    results = asyncio.run(_run_load())
+
+    report(f"旧版 API 读请求（{REQUESTS} 个，任务列表和任务详情各半，数据库往返 {DB_LATENCY * 1000:.0f} ms）", {
+        f"{name} {clients:>2} 个客户端": f"{value:8.0f} 请求/秒  {value / results[(name, 1)]:5.2f}x"
+        for (name, clients), value in results.items()
+    })
+    # 等待数据库时事件循环继续处理其他请求，吞吐量随客户端数增长；阻塞时不增长
+    assert results[("异步会话", max(CLIENTS))] > results[("异步会话", 1)] * 2
+    assert results[("异步会话", max(CLIENTS))] > results[("阻塞事件循环", max(CLIENTS))] * 2
@@ -0,0 +1,65 @@
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import desc, insert
+from sqlalchemy.future import select
+
+from app.models.job_log import JobLog
+from app.utils.pagination import encode_cursor
+from tests.benchmarks.conftest import report
+from tests.conftest import create_job, run
+
+pytestmark = pytest.mark.benchmark
+
+ROWS = 100000
+PAGE_SIZE = 100
+DEPTHS = (1000, 10000, 50000, 90000)
+REPEAT = 5
+
+
+async def _seed(session_factory):
+    job_id = await create_job(session_factory)
+    start = datetime(2024, 1, 1)
+    async with session_factory() as session:
+        for offset in range(0, ROWS, 10000):
+            await session.execute(insert(JobLog), [
+                {"job_id": job_id, "status": "success", "start_time": start + timedelta(seconds=i // 3)}
+                for i in range(offset, offset + 10000)
+            ])
+        await session.commit()
+
+
+async def _cursor_at(session_factory, depth):
+    # 前一页最后一行的排序键
+    async with session_factory() as session:
+        row = (await session.execute(
+            select(JobLog.start_time, JobLog.id)
+            .order_by(desc(JobLog.start_time), desc(JobLog.id))
+            .offset(depth - 1).limit(1)
+        )).first()
+    return encode_cursor(row.start_time, row.id)
+
+
+def _latency(client, params):
+    samples = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        response = client.get("/api/v1/logs/", params=params)
+        samples.append(time.perf_counter() - start)
+        assert response.status_code == 200
+    return statistics.median(samples), response.json()
+
+
+def test_deep_page_latency(client, db):
+    run(_seed(db))
+    results = {}
+    for depth in DEPTHS:
+        offset_time, offset_page = _latency(client, {"skip": depth, "limit": PAGE_SIZE})
+        cursor = run(_cursor_at(db, depth))
+        keyset_time, keyset_page = _latency(client, {"after": cursor, "limit": PAGE_SIZE})
+        assert [log["id"] for log in keyset_page] == [log["id"] for log in offset_page]
+        results[f"第 {depth} 行"] = f"OFFSET {offset_time * 1000:8.2f} ms    游标 {keyset_time * 1000:8.2f} ms"
+
+    report(f"{ROWS} 条日志中按页读取 {PAGE_SIZE} 条的延迟(中位数)", results)
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy.future import select
+
+from app.models.job_log import JobLog
+from app.schemas.job_log import JobLog as JobLogSchema
+from app.utils.serialization import FastJSONResponse, serialize_rows
+from tests.benchmarks.conftest import report
+from tests.conftest import create_job, run
+
+pytestmark = pytest.mark.benchmark
+
+ROWS = 1000
+REPEAT = 20
+
+
+async def _load_logs(session_factory):
+    job_id = await create_job(session_factory)
+    start = datetime(2024, 1, 1)
+    async with session_factory() as session:
+        session.add_all([
+            JobLog(
+                job_id=job_id, status="success", start_time=start + timedelta(seconds=i),
+                end_time=start + timedelta(seconds=i, milliseconds=250), duration=0.25, cpu_time=0.1,
+                peak_rss_delta=128, result_size=16, output=f"result {i}",
+            )
+            for i in range(ROWS)
+        ])
+        await session.commit()
+    async with session_factory() as session:
+        return (await session.execute(select(JobLog).order_by(JobLog.id))).scalars().all()
+
+
+def _median_ms(func) -> float:
+    samples = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def test_serialization_cost_per_1k_rows(db):
+    logs = run(_load_logs(db))
+    assert len(logs) == ROWS
+    field = create_response_field(name="Response_read_job_logs", type_=List[JobLogSchema])
+    loop = asyncio.new_event_loop()
+
+    def response_model():
+        # FastAPI 按 response_model 校验每一行后由 JSONResponse 使用标准库编码
+        content = loop.run_until_complete(serialize_response(field=field, response_content=logs))
+        return JSONResponse(content).body
+
+    def manual_dicts():
+        # 旧版 main.py：逐行手工构造字典、调用 isoformat，标准库编码
+        content = [
+            {
+                "id": log.id, "job_id": log.job_id, "status": log.status,
+                "start_time": log.start_time.isoformat() if log.start_time else None,
+                "end_time": log.end_time.isoformat() if log.end_time else None,
+                "duration": log.duration, "cpu_time": log.cpu_time, "peak_rss_delta": log.peak_rss_delta,
+                "result_size": log.result_size, "error_message": log.error_message, "output": log.output,
+            }
+            for log in logs
+        ]
+        return json.dumps(content).encode("utf-8")
+
+    def fast_path():
+        return FastJSONResponse(serialize_rows(JobLogSchema, logs)).body
+
+    try:
+        # 三种方式输出相同的数据
+        expected = json.loads(response_model())
+        assert json.loads(manual_dicts()) == expected
+        assert json.loads(fast_path()) == expected
+
+        results = {
+            "response_model + json": _median_ms(response_model),
+            "手工字典 + json": _median_ms(manual_dicts),
+            "row_serializer + orjson": _median_ms(fast_path),
+            "  其中 row_serializer": _median_ms(lambda: serialize_rows(JobLogSchema, logs)),
+            "  其中 pydantic 校验": _median_ms(
+                lambda: loop.run_until_complete(serialize_response(field=field, response_content=logs))
+            ),
+        }
+    finally:
+        loop.close()
+
+    report(f"序列化 {ROWS} 行任务日志（中位数，{REPEAT} 次）", {
+        name: f"{value:8.2f} ms" for name, value in results.items()
+    })
+    assert results["row_serializer + orjson"] < results["response_model + json"]
+    assert results["row_serializer + orjson"] < results["手工字典 + json"]
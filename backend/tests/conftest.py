@@ -0,0 +1,133 @@
+"""
+测试夹具
+
+测试使用临时的 SQLite 数据库（aiosqlite），在导入应用模块之前替换 app.db.session 中的
+引擎和会话工厂。使用 NullPool，每个测试可以在自己的事件循环中运行（asyncio.run）。
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+
+# 应用配置中的必填项，测试不连接这些数据库
+for key, value in {
+    "SECRET_KEY": "test-secret",
+    "MYSQL_SERVER": "localhost",
+    "MYSQL_USER": "test",
+    "MYSQL_PASSWORD": "test",
+    "MYSQL_DB": "test",
+    "MYSQL_PORT": "3306",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_DB": "test",
+    "POSTGRES_PORT": "5432",
+    "FIRST_SUPERUSER": "admin",
+    "FIRST_SUPERUSER_PASSWORD": "admin",
+    "FIRST_SUPERUSER_EMAIL": "admin@example.com",
+    "APSCHEDULER_JOBSTORES": "memory",
+    "APSCHEDULER_EXECUTORS": "default",
+    "APSCHEDULER_JOB_DEFAULTS": "{}",
+}.items():
+    os.environ.setdefault(key, value)
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+import app.db.session as db_session
+
+TEST_DIR = tempfile.mkdtemp(prefix="apscheduler-admin-tests-")
+TEST_DATABASE_PATH = os.path.join(TEST_DIR, "test.db")
+# 旧版 main.py 使用的数据库
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(TEST_DIR, 'legacy.db')}")
+
+db_session.async_engine = create_async_engine(f"sqlite+aiosqlite:///{TEST_DATABASE_PATH}", poolclass=NullPool)
+db_session.AsyncSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=db_session.async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+db_session.SQLALCHEMY_SYNC_DATABASE_URL = f"sqlite:///{TEST_DATABASE_PATH}"
+
+from app.db.base import Base  # noqa: E402
+
+
+def run(coro):
+    """
+    在新的事件循环中运行协程
+    """
+    return asyncio.run(coro)
+
+
+async def _reset_schema() -> None:
+    async with db_session.async_engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+
+
+@pytest.fixture
+def db():
+    """
+    重建所有表，返回会话工厂
+    """
+    run(_reset_schema())
+    return db_session.AsyncSessionLocal
+
+
+@pytest.fixture
+def sync_database_url():
+    return db_session.SQLALCHEMY_SYNC_DATABASE_URL
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+async def create_job(session_factory, **values):
+    """
+    创建一个任务，返回任务ID
+    """
+    from app.models.job import Job
+
+    values.setdefault("name", "test")
+    values.setdefault("func", "tests.conftest.run")
+    values.setdefault("trigger", "interval")
+    values.setdefault("trigger_args", {"seconds": 60})
+    async with session_factory() as session:
+        job = Job(**values)
+        session.add(job)
+        await session.commit()
+        return job.id
+
+
+@pytest.fixture
+def client(db):
+    """
+    挂载任务和日志接口的测试客户端，跳过登录
+    """
+    from fastapi import APIRouter, FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api.api_v1.endpoints import job_logs, jobs
+    from app.core import deps
+    from app.models.user import User
+
+    async def get_db():
+        async with db() as session:
+            yield session
+
+    admin = User(id=1, username="admin", email="admin@example.com", is_active=True, is_superuser=True)
+    api_router = APIRouter()
+    api_router.include_router(jobs.router, prefix="/jobs")
+    api_router.include_router(job_logs.router, prefix="/logs")
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api/v1")
+    app.dependency_overrides[deps.get_db] = get_db
+    app.dependency_overrides[deps.get_current_user] = lambda: admin
+    app.dependency_overrides[deps.get_current_active_superuser] = lambda: admin
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,100 @@
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import auth_cache, deps
+from app.core.auth_cache import PrincipalCache
+from app.models.user import User
+from app.utils.security import create_access_token
+from tests.conftest import run
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(auth_cache.time, "monotonic", clock)
+    return clock
+
+
+def test_ttl_expiry(clock):
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    cache.set("token", 1, {"id": 1})
+    clock.now += 59
+    assert cache.get("token") == {"id": 1}
+    clock.now += 1
+    assert cache.get("token") is None
+    # 过期的条目已移除
+    assert "token" not in cache._entries and 1 not in cache._tokens_by_user
+
+
+def test_token_expiry_before_ttl(clock):
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    cache.set("token", 1, {"id": 1}, token_exp=time.time() + 10)
+    clock.now += 11
+    assert cache.get("token") is None
+
+
+def test_invalidate_user(clock):
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    cache.set("a1", 1, {"id": 1})
+    cache.set("a2", 1, {"id": 1})
+    cache.set("b1", 2, {"id": 2})
+    cache.invalidate_user(1)
+    assert cache.get("a1") is None and cache.get("a2") is None
+    assert cache.get("b1") == {"id": 2}
+    cache.invalidate_user(3)
+
+
+def test_lru_eviction(clock):
+    cache = PrincipalCache(maxsize=2, ttl=60)
+    cache.set("a", 1, {"id": 1})
+    cache.set("b", 2, {"id": 2})
+    # 访问 a 后 b 成为最久未使用
+    assert cache.get("a") is not None
+    cache.set("c", 3, {"id": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert 2 not in cache._tokens_by_user
+
+
+@pytest.mark.parametrize("maxsize, ttl", [(0, 60), (10, 0)])
+def test_disabled(clock, maxsize, ttl):
+    cache = PrincipalCache(maxsize=maxsize, ttl=ttl)
+    assert not cache.enabled
+    cache.set("token", 1, {"id": 1})
+    assert cache.get("token") is None
+
+
+def test_get_current_user_uses_cache(db, monkeypatch):
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    monkeypatch.setattr(deps, "principal_cache", cache)
+
+    async def main():
+        async with db() as session:
+            user = User(username="alice", email="alice@example.com", hashed_password="x", is_active=True)
+            session.add(user)
+            await session.commit()
+            token = create_access_token(user.id)
+
+            first = await deps.get_current_user(db=session, token=token)
+            # 命中缓存时不访问数据库
+            cached = await deps.get_current_user(db=None, token=token)
+            assert cached.id == first.id and cached.username == "alice"
+
+            cache.invalidate_user(user.id)
+            user.is_active = False
+            await session.commit()
+            with pytest.raises(HTTPException) as exc_info:
+                await deps.get_current_user(db=session, token=token)
+            return exc_info.value.status_code
+
+    assert run(main()) == 400
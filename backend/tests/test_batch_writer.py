@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from app.models.job_log import JobLog
+from app.services.batch_writer import BatchWriter
+from tests.conftest import create_job, run
+
+
+def _log(job_id, status="success"):
+    return {"job_id": job_id, "status": status, "start_time": datetime(2024, 1, 1), "output": "ok"}
+
+
+async def _count(session_factory, *criteria):
+    async with session_factory() as session:
+        return await session.scalar(select(func.count()).select_from(JobLog).where(*criteria))
+
+
+def test_flush_when_batch_full(db):
+    async def main():
+        job_id = await create_job(db)
+        writer = BatchWriter(JobLog, batch_size=3, flush_interval=60)
+        for _ in range(3):
+            await writer.put(_log(job_id))
+        # 批量已满，不等待刷新间隔
+        for _ in range(100):
+            if await _count(db) == 3:
+                break
+            await asyncio.sleep(0.01)
+        written = await _count(db)
+        await writer.stop()
+        return written
+
+    assert run(main()) == 3
+
+
+def test_stop_flushes_remaining_rows(db):
+    async def main():
+        job_id = await create_job(db)
+        writer = BatchWriter(JobLog, batch_size=100, flush_interval=60)
+        for _ in range(5):
+            await writer.put(_log(job_id))
+        await writer.stop()
+        assert not writer.running
+        return await _count(db)
+
+    assert run(main()) == 5
+
+
+def test_put_threadsafe_from_worker_thread(db):
+    async def main():
+        job_id = await create_job(db)
+        writer = BatchWriter(JobLog, batch_size=100, flush_interval=0.05)
+        writer.start()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, lambda: [writer.put_threadsafe(_log(job_id)) for _ in range(10)])
+        await writer.stop()
+        return await _count(db)
+
+    assert run(main()) == 10
+
+
+def test_drop_orphans(db):
+    async def main():
+        job_id = await create_job(db)
+        writer = BatchWriter(JobLog, batch_size=100, flush_interval=60)
+        await writer.put(_log(job_id))
+        # 任务已删除的日志被丢弃，同一批中的其他行正常写入
+        await writer.put(_log(job_id + 1000, status="failed"))
+        await writer.put(_log(job_id))
+        await writer.stop()
+        return await _count(db), await _count(db, JobLog.job_id != job_id)
+
+    assert run(main()) == (2, 0)
@@ -0,0 +1,167 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.coordination import SchedulerCoordinator
+from tests.conftest import run
+
+LEASE_TTL = 0.6
+RENEW_INTERVAL = 0.2
+JOB_IDS = [str(i) for i in range(500)]
+
+
+def coordinators(db, mode):
+    return [
+        SchedulerCoordinator(mode, node_id, LEASE_TTL, RENEW_INTERVAL, session_factory=db)
+        for node_id in ("a", "b")
+    ]
+
+
+async def settle(*nodes):
+    # 节点登记满一个续约周期后才参与分片
+    for node in nodes:
+        await node.heartbeat()
+    await asyncio.sleep(RENEW_INTERVAL + 0.05)
+    for node in nodes:
+        await node.heartbeat()
+
+
+class StubJobStore:
+    def __init__(self, next_run_time):
+        self.jobs = [SimpleNamespace(id=job_id) for job_id in JOB_IDS]
+        self.next_run_time = next_run_time
+
+    def get_due_jobs(self, now):
+        return list(self.jobs)
+
+    def get_next_run_time(self):
+        return self.next_run_time
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        SchedulerCoordinator("cluster")
+    with pytest.raises(ValueError):
+        SchedulerCoordinator("leader", lease_ttl=1, renew_interval=1)
+
+
+def test_disabled_coordination_owns_everything(db):
+    node = SchedulerCoordinator("none", "a", session_factory=db)
+    assert node.active and node.owns("1")
+
+    async def main():
+        async with node.exclusive("sync", 10) as acquired:
+            return acquired
+
+    assert run(main()) is True
+
+
+def test_leader_is_exclusive_and_fails_over(db):
+    a, b = coordinators(db, "leader")
+
+    async def main():
+        await a.heartbeat()
+        await b.heartbeat()
+        assert a.active and not b.active
+        assert all(a.owns(job_id) for job_id in JOB_IDS)
+        assert not any(b.owns(job_id) for job_id in JOB_IDS)
+
+        # 主节点续约后仍然持有租约
+        await a.heartbeat()
+        await b.heartbeat()
+        assert a.active and not b.active
+
+        # 主节点停止续约，租约到期后本地即停止调度，另一个节点接管
+        await asyncio.sleep(LEASE_TTL + 0.05)
+        assert not a.active
+        await b.heartbeat()
+        await a.heartbeat()
+        assert b.active and not a.active
+
+    run(main())
+
+
+def test_leader_release_on_stop(db):
+    a, b = coordinators(db, "leader")
+
+    async def main():
+        await a.start()
+        await b.heartbeat()
+        assert a.active and not b.active
+        await a.stop()
+        assert not a.active
+        # 释放后不必等待租约到期
+        await b.heartbeat()
+        assert b.active
+
+    run(main())
+
+
+def test_shards_are_disjoint_and_complete(db):
+    a, b = coordinators(db, "shard")
+
+    async def main():
+        await a.heartbeat()
+        await b.heartbeat()
+        # 刚登记的节点还不参与分片
+        assert not a.active and not b.active
+
+        await settle(a, b)
+        assert a.members == b.members == ["a", "b"]
+        owned_a = {job_id for job_id in JOB_IDS if a.owns(job_id)}
+        owned_b = {job_id for job_id in JOB_IDS if b.owns(job_id)}
+        assert owned_a and owned_b
+        assert not owned_a & owned_b
+        assert owned_a | owned_b == set(JOB_IDS)
+
+        # b 停止续约，a 继续续约，b 的登记到期后 a 接管全部任务
+        for _ in range(4):
+            await asyncio.sleep(RENEW_INTERVAL)
+            await a.heartbeat()
+        assert not b.active
+        assert a.members == ["a"]
+        assert all(a.owns(job_id) for job_id in JOB_IDS)
+        assert not any(b.owns(job_id) for job_id in JOB_IDS)
+
+    run(main())
+
+
+def test_guard_filters_due_jobs(db):
+    a, b = coordinators(db, "shard")
+    future = datetime.now(timezone.utc) + timedelta(minutes=1)
+    store_a, store_b = StubJobStore(future), StubJobStore(future)
+    a.guard(store_a)
+    b.guard(store_b)
+    now = datetime.now(timezone.utc)
+
+    # 未取得租约时不调度
+    assert store_a.get_due_jobs(now) == []
+    assert store_a.get_next_run_time() is None
+
+    run(settle(a, b))
+    due_a = {job.id for job in store_a.get_due_jobs(now)}
+    due_b = {job.id for job in store_b.get_due_jobs(now)}
+    assert not due_a & due_b
+    assert due_a | due_b == set(JOB_IDS)
+    assert store_a.get_next_run_time() == future
+
+    # 已到期的最早任务可能属于其他节点，稍后再检查而不是立即唤醒
+    store_a.next_run_time = now - timedelta(seconds=5)
+    next_run_time = store_a.get_next_run_time()
+    assert now < next_run_time <= datetime.now(timezone.utc) + timedelta(seconds=a.OVERDUE_POLL_INTERVAL)
+
+
+def test_exclusive_lease(db):
+    a, b = coordinators(db, "shard")
+
+    async def main():
+        async with a.exclusive("sync", 10) as acquired_a:
+            async with b.exclusive("sync", 10) as acquired_b:
+                assert acquired_a and not acquired_b
+        # 持有节点结束后立即释放
+        async with b.exclusive("sync", 10) as acquired_b:
+            assert acquired_b
+
+    run(main())
@@ -0,0 +1,50 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from pytz import utc
+
+from app.services import job_queue
+from app.services.job_queue import enqueue_job
+from app.services.runs import local_time
+from app.services.scheduler import JobAsyncIOExecutor
+from tests.conftest import run
+
+
+def test_enqueue_job_stores_scheduled_run_time(monkeypatch):
+    rows = []
+
+    async def put(row):
+        rows.append(row)
+
+    monkeypatch.setattr(job_queue.job_queue_writer, "put", put)
+    # 错过的计划时间仍在宽限期内，入队时间晚于计划时间
+    run_date = datetime.now(utc) - timedelta(seconds=30)
+
+    async def scenario():
+        scheduler = AsyncIOScheduler(timezone=utc, executors={"default": JobAsyncIOExecutor()})
+        scheduler.add_job(enqueue_job, "date", run_date=run_date, misfire_grace_time=None, args=[1, "tests.noop"])
+        scheduler.start()
+        try:
+            for _ in range(500):
+                if rows:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            scheduler.shutdown(wait=False)
+
+    run(scenario())
+    assert len(rows) == 1
+    assert rows[0]["scheduled_time"] == local_time(run_date)
+    assert (rows[0]["enqueued_at"] - rows[0]["scheduled_time"]).total_seconds() >= 30
+
+
+def test_enqueue_job_outside_scheduler_uses_now(monkeypatch):
+    rows = []
+
+    async def put(row):
+        rows.append(row)
+
+    monkeypatch.setattr(job_queue.job_queue_writer, "put", put)
+    run(enqueue_job(1, "tests.noop"))
+    assert rows[0]["scheduled_time"] == rows[0]["enqueued_at"]
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from app.services import job_runner
+from app.services.job_runner import JobTimeoutError, run_job_async
+from tests.conftest import run
+
+running = 0
+max_running = 0
+
+
+async def add(a, b):
+    return a + b
+
+
+async def fail():
+    raise RuntimeError("boom")
+
+
+async def sleep(seconds):
+    await asyncio.sleep(seconds)
+    return "done"
+
+
+async def raise_asyncio_timeout():
+    raise asyncio.TimeoutError()
+
+
+async def track():
+    global running, max_running
+    running += 1
+    max_running = max(max_running, running)
+    await asyncio.sleep(0.01)
+    running -= 1
+
+
+@pytest.fixture
+def records(monkeypatch):
+    records = []
+
+    async def put(row):
+        records.append(row)
+
+    monkeypatch.setattr(job_runner.job_log_writer, "put", put)
+    # 信号量绑定在创建它的事件循环上，每个测试重新创建
+    monkeypatch.setattr(job_runner, "_async_semaphore", None)
+    return records
+
+
+def test_success(records):
+    assert run(run_job_async(1, "tests.test_job_runner.add", [1, 2])) == 3
+    (record,) = records
+    assert record["job_id"] == 1 and record["status"] == "success"
+    assert record["output"] == "3" and record["result_size"] == 1
+    assert record["end_time"] >= record["start_time"]
+
+
+def test_failure(records):
+    with pytest.raises(RuntimeError):
+        run(run_job_async(1, "tests.test_job_runner.fail"))
+    (record,) = records
+    assert record["status"] == "failed" and record["error_message"] == "boom"
+
+
+def test_timeout(records):
+    with pytest.raises(JobTimeoutError):
+        run(run_job_async(1, "tests.test_job_runner.sleep", [10], timeout=0.05))
+    (record,) = records
+    assert record["status"] == "timeout"
+    assert record["duration"] < 5
+
+
+def test_asyncio_timeout_from_job_is_a_failure(records):
+    # 协程自身抛出的 asyncio.TimeoutError 不算执行超时
+    with pytest.raises(asyncio.TimeoutError) as exc_info:
+        run(run_job_async(1, "tests.test_job_runner.raise_asyncio_timeout", timeout=10))
+    assert not isinstance(exc_info.value, JobTimeoutError)
+    assert records[0]["status"] == "failed"
+
+
+def test_concurrency_limit(records, monkeypatch):
+    monkeypatch.setattr(job_runner.settings, "ASYNC_JOB_CONCURRENCY", 3)
+
+    async def main():
+        await asyncio.gather(*(run_job_async(i, "tests.test_job_runner.track") for i in range(10)))
+
+    run(main())
+    assert max_running == 3
+    assert len(records) == 10
@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import and_, desc, or_, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.future import select
+
+from app.api.api_v1.endpoints.job_logs import _apply_log_filters
+from app.db import session as db_session
+from app.models.job_log import JobLog
+from tests.conftest import run
+
+
+def _keyset_query(**filters):
+    # 与日志列表的 after 游标分页相同
+    start_time, log_id = datetime(2024, 1, 1), 100
+    return _apply_log_filters(select(JobLog), **filters).where(JobLog.start_time <= start_time, or_(
+        JobLog.start_time < start_time,
+        and_(JobLog.start_time == start_time, JobLog.id < log_id),
+    )).order_by(desc(JobLog.start_time), desc(JobLog.id)).limit(100)
+
+
+def _query_plan(query):
+    sql = str(query.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+
+    async def main():
+        async with db_session.async_engine.connect() as connection:
+            await connection.execute(text("ANALYZE"))
+            rows = (await connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))).all()
+        return " | ".join(row[-1] for row in rows)
+
+    return run(main())
+
+
+@pytest.mark.parametrize(
+    "filters, index",
+    [
+        ({"job_id": 1}, "ix_joblog_job_id_start_time"),
+        ({"status": "failed"}, "ix_joblog_status_start_time"),
+        ({"start_date": datetime(2023, 1, 1), "end_date": datetime(2023, 12, 31)}, "ix_joblog_start_time"),
+        ({}, "ix_joblog_start_time"),
+    ],
+)
+def test_log_listing_uses_composite_index(db, filters, index):
+    plan = _query_plan(_keyset_query(**filters))
+    assert index in plan, plan
+    # 从游标位置开始按范围扫描索引
+    assert "start_time<" in plan, plan
+    # 按索引顺序读取，不需要额外排序
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.api.api_v1.endpoints import jobs as jobs_endpoint
+from app.models.job import Job
+from tests.conftest import create_job, run
+
+
+async def _job_names(session_factory):
+    async with session_factory() as session:
+        return dict((await session.execute(select(Job.id, Job.name))).all())
+
+
+async def _job_statuses(session_factory):
+    async with session_factory() as session:
+        return dict((await session.execute(select(Job.id, Job.status))).all())
+
+
+@pytest.fixture
+def synced(monkeypatch, db):
+    synced = []
+
+    async def sync(session, job, changed):
+        # 同步调度器时数据库中的更新已经提交
+        synced.append((job.id, changed, (await _job_names(db))[job.id]))
+        if job.name == "broken":
+            raise ValueError("无法添加到调度器")
+
+    monkeypatch.setattr(jobs_endpoint, "_sync_scheduled_job", sync)
+    return synced
+
+
+def test_bulk_update_syncs_scheduler_after_commit(client, db, synced):
+    job_ids = run(_create_jobs(db))
+    response = client.put("/api/v1/jobs/bulk", json=[
+        {"id": job_ids[0], "name": "renamed"},
+        {"id": job_ids[1], "name": "broken"},
+        {"id": 999, "name": "missing"},
+    ])
+    assert response.status_code == 200
+    assert [(r["id"], r["success"]) for r in response.json()] == [(job_ids[0], True), (job_ids[1], False), (999, False)]
+    assert synced == [(job_ids[0], {"name"}, "renamed"), (job_ids[1], {"name"}, "broken")]
+    statuses = run(_job_statuses(db))
+    assert statuses[job_ids[0]] == "running" and statuses[job_ids[1]] == "error"
+
+
+def test_bulk_update_commit_failure_leaves_scheduler_unchanged(client, db, synced, monkeypatch):
+    job_ids = run(_create_jobs(db))
+
+    async def commit(self):
+        raise RuntimeError("提交失败")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(AsyncSession, "commit", commit)
+        with pytest.raises(RuntimeError):
+            client.put("/api/v1/jobs/bulk", json=[{"id": job_ids[0], "name": "renamed"}])
+
+    assert synced == []
+    assert run(_job_names(db))[job_ids[0]] == "job-0"
+
+
+async def _create_jobs(session_factory):
+    return [await create_job(session_factory, name=f"job-{i}", status="running") for i in range(2)]
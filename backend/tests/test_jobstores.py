@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+
+import pytest
+from apscheduler.job import Job
+from apscheduler.jobstores.base import ConflictingIdError, JobLookupError
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+from pytz import utc
+
+from app.services.jobstores import WriteBehindJobStore
+
+NOW = datetime(2024, 1, 1, tzinfo=utc)
+
+
+def noop():
+    pass
+
+
+@pytest.fixture
+def scheduler():
+    return BackgroundScheduler(timezone=utc)
+
+
+@pytest.fixture
+def store_factory(tmp_path, scheduler):
+    stores = []
+
+    def factory():
+        # 回写间隔足够长，由测试显式调用 flush
+        store = WriteBehindJobStore(url=f"sqlite:///{tmp_path}/jobs.db", flush_interval=3600)
+        store.start(scheduler, "default")
+        stores.append(store)
+        return store
+
+    yield factory
+    for store in stores:
+        store.shutdown()
+
+
+def make_job(scheduler, job_id, next_run_time):
+    return Job(
+        scheduler,
+        id=job_id,
+        func=noop,
+        trigger=IntervalTrigger(seconds=60, timezone=utc),
+        executor="default",
+        args=(),
+        kwargs={},
+        name=job_id,
+        misfire_grace_time=60,
+        coalesce=True,
+        max_instances=1,
+        next_run_time=next_run_time,
+    )
+
+
+def _rows(store):
+    with store.engine.begin() as connection:
+        return dict(connection.execute(store.jobs_t.select().with_only_columns(
+            store.jobs_t.c.id, store.jobs_t.c.next_run_time,
+        )).all())
+
+
+def test_flush_and_reload(scheduler, store_factory):
+    store = store_factory()
+    store.add_job(make_job(scheduler, "a", NOW + timedelta(minutes=1)))
+    store.add_job(make_job(scheduler, "b", NOW + timedelta(minutes=2)))
+    store.add_job(make_job(scheduler, "c", NOW + timedelta(minutes=3)))
+    # 回写前数据库中没有任务
+    assert _rows(store) == {}
+
+    store.flush()
+    assert set(_rows(store)) == {"a", "b", "c"}
+
+    store.update_job(make_job(scheduler, "b", NOW + timedelta(minutes=5)))
+    store.update_job(make_job(scheduler, "c", None))
+    store.remove_job("a")
+    store.flush()
+
+    reloaded = store_factory()
+    assert [job.id for job in reloaded.get_all_jobs()] == ["b", "c"]
+    assert reloaded.lookup_job("b").next_run_time == NOW + timedelta(minutes=5)
+    # 暂停的任务不会到期
+    assert reloaded.lookup_job("c").next_run_time is None
+    assert reloaded.get_next_run_time() == NOW + timedelta(minutes=5)
+    assert reloaded.lookup_job("b").func is noop
+
+
+def test_shutdown_flushes_pending_changes(scheduler, store_factory):
+    store = store_factory()
+    store.add_job(make_job(scheduler, "a", NOW))
+    store.shutdown()
+    assert [job.id for job in store_factory().get_all_jobs()] == ["a"]
+
+
+def test_remove_all_jobs(scheduler, store_factory):
+    store = store_factory()
+    store.add_job(make_job(scheduler, "a", NOW))
+    store.flush()
+    store.remove_all_jobs()
+    store.add_job(make_job(scheduler, "b", NOW))
+    store.flush()
+    assert set(_rows(store)) == {"b"}
+
+
+def test_due_jobs_in_run_time_order(scheduler, store_factory):
+    store = store_factory()
+    store.add_job(make_job(scheduler, "late", NOW + timedelta(minutes=10)))
+    store.add_job(make_job(scheduler, "second", NOW + timedelta(minutes=2)))
+    store.add_job(make_job(scheduler, "first", NOW + timedelta(minutes=1)))
+    store.add_job(make_job(scheduler, "paused", None))
+
+    assert store.get_next_run_time() == NOW + timedelta(minutes=1)
+    due = store.get_due_jobs(NOW + timedelta(minutes=5))
+    assert [job.id for job in due] == ["first", "second"]
+    # 到期任务在调度器更新之前仍然留在堆中
+    assert store.get_next_run_time() == NOW + timedelta(minutes=1)
+
+    # 更新后旧的堆元素失效
+    store.update_job(make_job(scheduler, "first", NOW + timedelta(minutes=20)))
+    store.remove_job("second")
+    assert store.get_next_run_time() == NOW + timedelta(minutes=10)
+    assert [job.id for job in store.get_due_jobs(NOW + timedelta(minutes=30))] == ["late", "first"]
+
+
+def test_conflicts_and_missing_jobs(scheduler, store_factory):
+    store = store_factory()
+    store.add_job(make_job(scheduler, "a", NOW))
+    with pytest.raises(ConflictingIdError):
+        store.add_job(make_job(scheduler, "a", NOW))
+    with pytest.raises(JobLookupError):
+        store.update_job(make_job(scheduler, "b", NOW))
+    with pytest.raises(JobLookupError):
+        store.remove_job("b")
@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import aiomysql
+from sqlalchemy.dialects.postgresql import asyncpg
+
+import main
+from tests.conftest import run
+
+AUTH = {"Authorization": "Bearer mock_token"}
+
+
+@pytest.fixture(scope="module")
+def client():
+    # 启动事件中建表并写入初始数据
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_login(client):
+    response = client.post("/api/v1/auth/login", json={"username": "admin", "password": "admin"})
+    assert response.status_code == 200
+    assert response.json()["user"] == {
+        "id": 1, "username": "admin", "email": "admin@example.com", "is_active": True, "is_superuser": True,
+    }
+    response = client.post("/api/v1/auth/login", json={"username": "admin", "password": "wrong"})
+    assert response.status_code == 401
+
+
+def test_requires_token(client):
+    assert client.get("/api/v1/jobs").status_code == 401
+
+
+def test_job_crud(client):
+    response = client.post("/api/v1/jobs", json={"name": "backup", "func": "backup"}, headers=AUTH)
+    assert response.status_code == 200
+    job = response.json()
+    assert job["name"] == "backup" and job["status"] == "running"
+
+    response = client.put(f"/api/v1/jobs/{job['id']}", json={"status": "paused"}, headers=AUTH)
+    assert response.json()["status"] == "paused"
+    assert client.get(f"/api/v1/jobs/{job['id']}", headers=AUTH).json()["status"] == "paused"
+
+    assert client.post(f"/api/v1/jobs/{job['id']}/execute", headers=AUTH).status_code == 200
+    assert client.delete(f"/api/v1/jobs/{job['id']}", headers=AUTH).status_code == 200
+    assert client.get(f"/api/v1/jobs/{job['id']}", headers=AUTH).status_code == 404
+
+
+def test_list_total(client):
+    response = client.get("/api/v1/jobs", params={"limit": 1, "total": "exact"}, headers=AUTH)
+    assert len(response.json()) == 1
+    total = int(response.headers["x-total-count"])
+    assert total >= 2
+
+    # 页码超出范围时仍然返回总数
+    response = client.get("/api/v1/jobs", params={"offset": 100, "total": "exact"}, headers=AUTH)
+    assert response.json() == [] and int(response.headers["x-total-count"]) == total
+    # SQLite 没有估算行数，退回精确计数
+    response = client.get("/api/v1/jobs", params={"total": "estimated"}, headers=AUTH)
+    assert int(response.headers["x-total-count"]) == total
+    assert "x-total-count" not in client.get("/api/v1/jobs", headers=AUTH).headers
+    assert client.get("/api/v1/jobs", params={"total": "all"}, headers=AUTH).status_code == 400
+
+
+class _ExplainSession:
+    """
+    记录交给驱动的 EXPLAIN 语句和参数
+    """
+
+    def __init__(self, dialect, result):
+        self.bind = SimpleNamespace(dialect=dialect)
+        self.result = result
+        self.calls = []
+
+    async def connection(self):
+        return self
+
+    async def exec_driver_sql(self, statement, parameters):
+        self.calls.append((statement, parameters))
+        return self.result
+
+
+@pytest.mark.parametrize("dialect, prefix, result, expected", [
+    (asyncpg.dialect(), "EXPLAIN (FORMAT JSON) ",
+     SimpleNamespace(scalar=lambda: '[{"Plan": {"Plan Rows": 42}}]'), 42),
+    (aiomysql.dialect(), "EXPLAIN ",
+     SimpleNamespace(mappings=lambda: SimpleNamespace(first=lambda: {"rows": 200, "filtered": 50.0})), 100),
+])
+def test_estimate_count_binds_parameters(dialect, prefix, result, expected):
+    query = select(main.Job).where(main.Job.name.contains("it's 100%"), main.Job.id.in_([1, 2]))
+    db = _ExplainSession(dialect, result)
+
+    assert run(main.estimate_count(db, query)) == expected
+    (statement, parameters), = db.calls
+    assert statement.startswith(prefix)
+    # 参数交给驱动绑定，不内联到 SQL 中
+    assert "it's" not in statement
+    assert parameters == ("it's 100%", 1, 2)
+
+
+def test_settings(client):
+    settings = client.get("/api/v1/settings", headers=AUTH).json()["settings"]
+    assert settings["job_max_instances"] == 3
+    assert "_settings_version" not in settings
+
+    response = client.put("/api/v1/settings", json={"settings": {"job_max_instances": 5, "theme": "dark"}}, headers=AUTH)
+    assert response.json()["settings"]["job_max_instances"] == 5
+    settings = client.get("/api/v1/settings", headers=AUTH).json()["settings"]
+    assert settings["job_max_instances"] == 5 and settings["theme"] == "dark"
+
+    response = client.put("/api/v1/settings", json={"settings": {"_settings_version": 1}}, headers=AUTH)
+    assert response.status_code == 400
+
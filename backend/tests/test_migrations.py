@@ -0,0 +1,58 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import MetaData, create_engine
+
+from app.db.base import Base
+
+VERSIONS_DIR = Path(__file__).resolve().parent.parent / "migrations" / "versions"
+
+
+def _load_revision(filename):
+    spec = importlib.util.spec_from_file_location(filename, VERSIONS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize("filename, table", [("0008_joblog_archive.py", "joblogarchive")])
+def test_created_table_matches_model(tmp_path, filename, table):
+    engine = create_engine(f"sqlite:///{tmp_path}/migration.db")
+    revision = _load_revision(filename)
+    metadata = MetaData()
+    Base.metadata.tables[table].to_metadata(metadata)
+
+    with engine.begin() as connection:
+        context = MigrationContext.configure(connection, opts={"compare_type": True})
+        with Operations.context(context):
+            revision.upgrade()
+        assert compare_metadata(context, metadata) == []
+
+        with Operations.context(context):
+            revision.downgrade()
+        assert not engine.dialect.has_table(connection, table)
+
+
+def test_joblog_metric_columns_match_model(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/migration.db")
+    revision = _load_revision("0007_joblog_execution_metrics.py")
+    metadata = MetaData()
+    for table in ("user", "job", "joblog"):
+        Base.metadata.tables[table].to_metadata(metadata)
+
+    with engine.begin() as connection:
+        metadata.create_all(connection)
+        context = MigrationContext.configure(connection, opts={"compare_type": True})
+        # 降级得到添加这三列之前的日志表，再升级
+        with Operations.context(context):
+            revision.downgrade()
+        columns = {column["name"] for column in engine.dialect.get_columns(connection, "joblog")}
+        assert not columns & {"cpu_time", "peak_rss_delta", "result_size"}
+
+        with Operations.context(context):
+            revision.upgrade()
+        assert compare_metadata(context, metadata) == []
@@ -0,0 +1,85 @@
+from datetime import datetime
+
+import pytest
+
+from app.models.job_log import JobLog
+from app.utils.pagination import decode_cursor, encode_cursor
+from tests.conftest import create_job, run
+
+
+def test_cursor_round_trip():
+    start_time = datetime(2024, 1, 2, 3, 4, 5, 678000)
+    cursor = encode_cursor(start_time, 42)
+    # 游标可以直接放在查询参数中
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+    assert decode_cursor(cursor, 2) == [start_time.isoformat(), 42]
+    assert decode_cursor(encode_cursor("a", None, 1.5), 3) == ["a", None, 1.5]
+
+
+@pytest.mark.parametrize("cursor", ["", "!!!", "bm90IGpzb24", encode_cursor(1), encode_cursor(1, 2, 3)])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 2)
+
+
+def _seed_logs(db, count):
+    async def main():
+        job_id = await create_job(db)
+        other_job_id = await create_job(db, name="other")
+        async with db() as session:
+            # 每两条日志的开始时间相同，按 id 区分先后
+            session.add_all(
+                JobLog(job_id=job_id, status="success", start_time=datetime(2024, 1, 1, 0, 0, i // 2))
+                for i in range(count)
+            )
+            session.add(JobLog(job_id=other_job_id, status="success", start_time=datetime(2024, 1, 1)))
+            await session.commit()
+        return job_id
+
+    return run(main())
+
+
+def test_log_keyset_pages(client, db):
+    job_id = _seed_logs(db, 7)
+    url = f"/api/v1/logs/?job_id={job_id}&limit=3"
+
+    first = client.get(url)
+    assert first.status_code == 200
+    ids = [log["id"] for log in first.json()]
+    pages = [ids]
+    response = first
+    while "x-next-cursor" in response.headers:
+        response = client.get(url, params={"after": response.headers["x-next-cursor"]})
+        assert response.status_code == 200
+        pages.append([log["id"] for log in response.json()])
+
+    all_ids = [log_id for page in pages for log_id in page]
+    assert all_ids == list(range(7, 0, -1))
+    assert [len(page) for page in pages] == [3, 3, 1]
+
+    # 从第二页向前翻回到第一页
+    second = client.get(url, params={"after": first.headers["x-next-cursor"]})
+    previous = client.get(url, params={"before": second.headers["x-prev-cursor"]})
+    assert [log["id"] for log in previous.json()] == ids
+
+
+def test_log_invalid_cursor(client, db):
+    assert client.get("/api/v1/logs/", params={"after": "invalid"}).status_code == 400
+    cursor = encode_cursor(datetime(2024, 1, 1), 1)
+    assert client.get("/api/v1/logs/", params={"after": cursor, "before": cursor}).status_code == 400
+
+
+def test_job_keyset_pages(client, db):
+    async def seed():
+        return [await create_job(db, name=f"job-{i}") for i in range(5)]
+
+    job_ids = run(seed())
+    first = client.get("/api/v1/jobs/", params={"limit": 2})
+    second = client.get("/api/v1/jobs/", params={"limit": 2, "after": first.headers["x-next-cursor"]})
+    third = client.get("/api/v1/jobs/", params={"limit": 2, "after": second.headers["x-next-cursor"]})
+    pages = [[job["id"] for job in page.json()] for page in (first, second, third)]
+    assert pages == [job_ids[:2], job_ids[2:4], job_ids[4:]]
+    assert "x-next-cursor" not in third.headers
+
+    previous = client.get("/api/v1/jobs/", params={"limit": 2, "before": third.headers["x-prev-cursor"]})
+    assert [job["id"] for job in previous.json()] == job_ids[2:4]
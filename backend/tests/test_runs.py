@@ -0,0 +1,183 @@
+import asyncio
+import threading
+from datetime import datetime
+
+from apscheduler.events import EVENT_JOB_EXECUTED, JobExecutionEvent
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from pytz import utc
+from sqlalchemy import select
+
+from app.models.job_run import JobRun
+from app.services.job_runner import job_log_writer, run_job
+from app.services.run_recorder import RUN_RECORD_EVENTS, JobRunWriter, job_run_writer, run_recorder
+from app.services.runs import RUN_EVENTS, manual_run_job_id, run_tracker
+from app.services.scheduler import JobThreadPoolExecutor
+from tests.conftest import create_job, run
+
+started = threading.Event()
+release = threading.Event()
+
+
+def wait_for_release():
+    started.set()
+    release.wait(5)
+
+
+async def _wait_for(predicate, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_manual_run_queued_until_wrapper_starts(db):
+    job_id = run(create_job(db))
+    started.clear()
+    release.clear()
+
+    async def scenario():
+        # 单个工作线程，第二次执行提交后只能排队
+        scheduler = AsyncIOScheduler(timezone=utc, executors={"default": JobThreadPoolExecutor(1)})
+        scheduler.add_listener(run_tracker.handle_event, RUN_EVENTS)
+        run_ids = [run_tracker.create(job_id) for _ in range(2)]
+        now = datetime.now(utc)
+        for run_id in run_ids:
+            scheduler.add_job(
+                run_job, "date", run_date=now, id=manual_run_job_id(run_id), misfire_grace_time=None,
+                args=[job_id, f"{__name__}.wait_for_release"],
+            )
+
+        job_log_writer.start()
+        scheduler.start()
+        try:
+            await _wait_for(started.is_set)
+            # 等提交事件分发完
+            await asyncio.sleep(0.1)
+            statuses = sorted(run_tracker.get(run_id)["status"] for run_id in run_ids)
+            release.set()
+            await _wait_for(lambda: all(run_tracker.get(run_id)["status"] == "finished" for run_id in run_ids))
+        finally:
+            release.set()
+            scheduler.shutdown(wait=False)
+            await job_log_writer.stop()
+        return statuses, [run_tracker.get(run_id) for run_id in run_ids]
+
+    statuses, runs = run(scenario())
+    assert statuses == ["queued", "running"]
+    for finished in runs:
+        assert finished["started_at"] is not None
+        assert finished["duration"] is not None
+
+
+def test_process_run_start_time_from_execution_record():
+    run_id = run_tracker.create(1)
+    start_time = datetime.now()
+    event = JobExecutionEvent(
+        EVENT_JOB_EXECUTED, manual_run_job_id(run_id), "manual", datetime.now(utc),
+        retval={"start_time": start_time},
+    )
+    run_tracker.handle_event(event)
+
+    finished = run_tracker.get(run_id)
+    assert finished["status"] == "finished"
+    assert finished["started_at"] == start_time
+    assert finished["duration"] >= 0
+
+
+async def _job_runs(session_factory):
+    async with session_factory() as session:
+        return (await session.execute(select(JobRun).order_by(JobRun.id))).scalars().all()
+
+
+def test_job_run_writer_merges_and_updates(db):
+    job_id = run(create_job(db))
+    scheduled = datetime(2024, 1, 1)
+
+    async def main():
+        writer = JobRunWriter(JobRun)
+        # 同一批次中的插入和更新合并为一行
+        await writer._flush([
+            {"op": "insert", "run_id": "a", "values": {
+                "job_id": job_id, "run_id": "a", "status": "queued", "scheduled_time": scheduled,
+            }},
+            {"op": "update", "run_id": "a", "values": {"status": "started", "start_time": scheduled}},
+            {"op": "insert", "run_id": "b", "values": {
+                "job_id": job_id, "run_id": "b", "status": "queued", "scheduled_time": scheduled,
+            }},
+        ])
+        # 之后批次中的更新按列分组执行
+        await writer._flush([
+            {"op": "update", "run_id": "a", "values": {"status": "succeeded", "duration": 1.5}},
+            {"op": "update", "run_id": "b", "values": {"status": "started"}},
+        ])
+        return await _job_runs(db)
+
+    runs = {row.run_id: row for row in run(main())}
+    assert len(runs) == 2
+    assert (runs["a"].status, runs["a"].start_time, runs["a"].duration) == ("succeeded", scheduled, 1.5)
+    assert (runs["b"].status, runs["b"].start_time) == ("started", None)
+
+
+def test_runs_persisted_on_submit_start_and_finish(db, monkeypatch):
+    job_ids = [run(create_job(db)) for _ in range(2)]
+    started.clear()
+    release.clear()
+    monkeypatch.setattr(job_run_writer, "flush_interval", 0.01)
+
+    async def statuses():
+        return sorted(row.status for row in await _job_runs(db))
+
+    async def scenario():
+        scheduler = AsyncIOScheduler(timezone=utc, executors={"default": JobThreadPoolExecutor(1)})
+        scheduler.add_listener(run_recorder.handle_event, RUN_RECORD_EVENTS)
+        now = datetime.now(utc)
+        for job_id in job_ids:
+            scheduler.add_job(
+                run_job, "date", run_date=now, id=str(job_id), misfire_grace_time=None,
+                args=[job_id, f"{__name__}.wait_for_release"],
+            )
+
+        job_log_writer.start()
+        job_run_writer.start()
+        scheduler.start()
+        try:
+            await _wait_for(started.is_set)
+            # 一个运行已开始，另一个在线程池中排队，两行都已写入
+            await asyncio.sleep(0.2)
+            in_flight = await statuses()
+            release.set()
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + 5
+            while await statuses() != ["succeeded", "succeeded"]:
+                assert loop.time() < deadline
+                await asyncio.sleep(0.02)
+        finally:
+            release.set()
+            scheduler.shutdown(wait=False)
+            await job_log_writer.stop()
+            await job_run_writer.stop()
+        return in_flight, await _job_runs(db)
+
+    in_flight, rows = run(scenario())
+    assert in_flight == ["queued", "started"]
+    assert len({row.run_id for row in rows}) == 2
+    for row in rows:
+        assert row.submitted_time is not None
+        assert row.start_time is not None and row.end_time is not None
+        assert row.queue_delay is not None and row.duration is not None
+
+
+def test_read_active_runs(client, db):
+    job_id = run(create_job(db))
+
+    async def insert_runs():
+        async with db() as session:
+            for run_id, status in (("a", "queued"), ("b", "started"), ("c", "succeeded")):
+                session.add(JobRun(job_id=job_id, run_id=run_id, status=status, scheduled_time=datetime(2024, 1, 1)))
+            await session.commit()
+
+    run(insert_runs())
+    response = client.get("/api/v1/jobs/runs/active", params={"job_id": job_id})
+    assert response.status_code == 200
+    assert [(row["run_id"], row["status"]) for row in response.json()] == [("a", "queued"), ("b", "started")]
@@ -0,0 +1,123 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+from starlette.responses import Response
+
+from app.models.job import Job
+from app.models.job_log import JobLog
+from app.schemas.job import Job as JobSchema
+from app.schemas.job_log import JobLog as JobLogSchema
+from app.utils import serialization
+from app.utils.serialization import FastJSONResponse, dumps, json_response, row_serializer, serialize_rows
+from tests.conftest import create_job, run
+
+
+def _dump(model: BaseModel):
+    return model.model_dump() if hasattr(model, "model_dump") else model.dict()
+
+
+def _validated(schema, row):
+    # 与 FastAPI 按 response_model 校验的结果比较
+    fields = getattr(schema, "model_fields", None) or schema.__fields__
+    return _dump(schema(**{name: getattr(row, name) for name in fields}))
+
+
+def _load_rows(db):
+    async def main():
+        job_id = await create_job(db, coalesce=1, args=[1, "a"], kwargs={"x": None}, timeout=30)
+        await create_job(db, coalesce=0, created_by=1)
+        async with db() as session:
+            session.add(JobLog(job_id=job_id, status="failed", start_time=datetime(2024, 1, 1, 8, 30), error_message="boom"))
+            await session.commit()
+            jobs = (await session.execute(Job.__table__.select())).all()
+            logs = (await session.execute(JobLog.__table__.select())).all()
+        return jobs, logs
+
+    return run(main())
+
+
+def test_row_serializer_matches_schema(db):
+    jobs, logs = _load_rows(db)
+    # created_by 为空的任务不符合模式，只比较有值的行
+    job = next(row for row in jobs if row.created_by is not None)
+    assert row_serializer(JobSchema)(job) == _validated(JobSchema, job)
+    assert serialize_rows(JobLogSchema, logs) == [_validated(JobLogSchema, log) for log in logs]
+
+
+def test_bool_fields_are_coerced(db):
+    jobs, _ = _load_rows(db)
+    serialize = row_serializer(JobSchema)
+    assert [serialize(job)["coalesce"] for job in jobs] == [True, False]
+    assert serialize(SimpleNamespace(**{**serialize(jobs[0]), "coalesce": None}))["coalesce"] is None
+
+
+def test_tuple_serializer():
+    row = SimpleNamespace(id=1, name="a", status="running")
+    assert row_serializer(("id", "name"))(row) == {"id": 1, "name": "a"}
+    assert row_serializer(("status",))(row) == {"status": "running"}
+    # 生成的函数被缓存
+    assert row_serializer(("id", "name")) is row_serializer(("id", "name"))
+
+
+class Item(BaseModel):
+    name: str
+
+
+CONTENT = {
+    "time": datetime(2024, 1, 2, 3, 4, 5),
+    "amount": Decimal("1.5"),
+    "tags": {"a"},
+    "item": Item(name="x"),
+    "text": "中文",
+    1: None,
+}
+EXPECTED = {
+    "time": "2024-01-02T03:04:05",
+    "amount": 1.5,
+    "tags": ["a"],
+    "item": {"name": "x"},
+    "text": "中文",
+    "1": None,
+}
+
+
+def test_dumps():
+    assert json.loads(dumps(CONTENT)) == EXPECTED
+    with pytest.raises(TypeError):
+        dumps({"value": object()})
+
+
+def test_dumps_without_orjson(monkeypatch):
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert json.loads(dumps(CONTENT)) == EXPECTED
+
+
+def test_fast_json_response():
+    response = FastJSONResponse(CONTENT)
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == EXPECTED
+
+
+def test_json_response_copies_headers():
+    injected = Response()
+    injected.headers["X-Next-Cursor"] = "abc"
+    response = json_response([1, 2], injected, status_code=201)
+    assert response.status_code == 201
+    assert response.headers["x-next-cursor"] == "abc"
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["content-length"] == str(len(response.body))
+
+
+def test_endpoint_output(client, db):
+    async def seed():
+        return await create_job(db, coalesce=1, next_run_time=datetime(2024, 1, 1, 12), created_by=1)
+
+    job_id = run(seed())
+    job = client.get("/api/v1/jobs/", params={"limit": 10}).json()[0]
+    assert job["id"] == job_id
+    assert job["coalesce"] is True
+    assert job["next_run_time"] == "2024-01-01T12:00:00"